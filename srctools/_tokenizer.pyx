@@ -3,9 +3,14 @@
 """Cython version of the Tokenizer class."""
 cimport cython
 from cpython.mem cimport PyMem_Malloc, PyMem_Realloc, PyMem_Free
+from cpython.buffer cimport (
+    PyObject_CheckBuffer, PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE,
+)
+from libc.string cimport memchr
 
 cdef extern from *:
     unicode PyUnicode_FromStringAndSize(const char *u, Py_ssize_t size)
+    unicode PyUnicode_DecodeUTF8(const char *s, Py_ssize_t size, const char *errors)
     unicode PyUnicode_FromKindAndData(int kind, const void *buffer, Py_ssize_t size)
 
 # On Python 3.6+, convert stuff to PathLike.
@@ -55,6 +60,15 @@ cdef:
 DEF BARE_DISALLOWED = tuple('"\'{};:[]()\n\t ')
 
 
+cdef _check_buffer_encoding(str encoding):
+    """Check this encoding can be read directly from buffers."""
+    if encoding.casefold().replace('-', '').replace('_', '') not in ('utf8', 'ascii'):
+        raise ValueError(
+            'Binary data can only be parsed as UTF-8 or ASCII, '
+            f'not "{encoding}"' '!'
+        )
+
+
 # noinspection PyMissingTypeHints
 @cython.final  # No point in inheriting from this.
 cdef class Tokenizer:
@@ -69,6 +83,10 @@ cdef class Tokenizer:
           If disabled these are parsed as BRACK_OPEN, STRING, BRACK_CLOSE.
         * allow_escapes controls whether \\n-style escapes are expanded.
         * allow_star_comments if enabled allows /* */ comments.
+
+    Data can also be bytes, or another buffer like a memoryview or mmap, if
+    encoding is set to 'utf8' or 'ascii'. This is scanned directly, only
+    decoding the values of the tokens produced.
     """
     cdef str cur_chunk
     cdef object chunk_iter
@@ -77,7 +95,13 @@ cdef class Tokenizer:
 
     cdef public str filename
 
-    cdef int char_index # Position inside cur_chunk
+    cdef Py_ssize_t char_index # Position inside cur_chunk or byte_data
+
+    # If parsing a buffer, it's held here instead of cur_chunk.
+    cdef bint is_bytes
+    cdef Py_buffer byte_view
+    cdef const unsigned char *byte_data
+    cdef Py_ssize_t byte_len
 
     cdef public int line_num
     cdef public bint string_bracket
@@ -97,9 +121,12 @@ cdef class Tokenizer:
         self.val_buffer = <Py_UCS4 *>PyMem_Malloc(32 * sizeof(Py_UCS4))
         self.buf_size = 32
         self.buf_pos = 0
+        self.is_bytes = False
 
     def __dealloc__(self):
         PyMem_Free(self.val_buffer)
+        if self.is_bytes:
+            PyBuffer_Release(&self.byte_view)
 
     def __init__(
         self,
@@ -109,27 +136,49 @@ cdef class Tokenizer:
         bint string_bracket=False,
         bint allow_escapes=True,
         bint allow_star_comments=False,
+        str encoding=None,
     ):
-        # Early warning for this particular error.
-        if isinstance(data, bytes) or isinstance(data, bytearray):
-            raise TypeError(
-                'Cannot parse binary data! Decode to the desired encoding, '
-                'or wrap in io.TextIOWrapper() to decode gradually.'
-            )
+        if self.is_bytes:
+            PyBuffer_Release(&self.byte_view)
+            self.is_bytes = False
+
+        # We initially add one, so it'll be 0 next.
+        self.char_index = -1
 
         # For direct strings, we can immediately assign that as our chunk,
         # and then set the iterable to an empty iterator.
         if isinstance(data, str):
             self.cur_chunk = data
             self.chunk_iter = EMPTY_ITER
+        elif PyObject_CheckBuffer(data):
+            # Early warning for this particular error.
+            if encoding is None:
+                raise TypeError(
+                    'Cannot parse binary data! Pass an encoding for UTF-8 '
+                    'data, decode to the desired encoding, or wrap in '
+                    'io.TextIOWrapper() to decode gradually.'
+                )
+            _check_buffer_encoding(encoding)
+            # Read directly from the buffer, only decoding the token values.
+            # UTF-8 never uses ASCII bytes in multibyte sequences, so we
+            # can find all the syntax characters without decoding.
+            PyObject_GetBuffer(data, &self.byte_view, PyBUF_SIMPLE)
+            self.is_bytes = True
+            self.byte_data = <const unsigned char *>self.byte_view.buf
+            self.byte_len = self.byte_view.len
+            self.cur_chunk = ''
+            self.chunk_iter = EMPTY_ITER
+            # Skip the UTF-8 Byte Order Mark.
+            if (
+                self.byte_len >= 3 and self.byte_data[0] == 0xEF
+                and self.byte_data[1] == 0xBB and self.byte_data[2] == 0xBF
+            ):
+                self.char_index = 2
         else:
             # The first next_char() call will pull out a chunk.
             self.cur_chunk = ''
             # This checks that it is indeed iterable.
             self.chunk_iter = iter(data)
-
-        # We initially add one, so it'll be 0 next.
-        self.char_index = -1
         
         self.buf_reset()
 
@@ -213,12 +262,48 @@ cdef class Tokenizer:
 
     cdef object buf_get_text(self):
         """Decode the buffer, and return the text."""
-        # Convert the buffer directly to a string. 4 = UCS4 mode.
-        out = PyUnicode_FromKindAndData(4, self.val_buffer, self.buf_pos)
+        cdef char *byte_buf
+        cdef unsigned int i
+        if self.is_bytes:
+            # The buffer holds UTF-8 bytes, narrow and decode them.
+            byte_buf = <char *>PyMem_Malloc(self.buf_pos + 1)
+            if byte_buf == NULL:
+                raise MemoryError
+            try:
+                for i in range(self.buf_pos):
+                    byte_buf[i] = <char>self.val_buffer[i]
+                out = self._decode(byte_buf, self.buf_pos)
+            finally:
+                PyMem_Free(byte_buf)
+        else:
+            # Convert the buffer directly to a string. 4 = UCS4 mode.
+            out = PyUnicode_FromKindAndData(4, self.val_buffer, self.buf_pos)
         # Don't bother resizing or clearing, the next append will overwrite.
         self.buf_pos = 0
         return out
 
+    cdef str _decode(self, const char *data, Py_ssize_t size):
+        """Decode a section of UTF-8 text."""
+        try:
+            return PyUnicode_DecodeUTF8(data, size, NULL)
+        except UnicodeDecodeError as exc:
+            raise self._error("Could not decode file!") from exc
+
+    cdef str _byte_slice(self, Py_ssize_t start, Py_ssize_t end):
+        """Decode byte_data[start:end]."""
+        return self._decode(<const char *>self.byte_data + start, end - start)
+
+    cdef void _count_lines(self, Py_ssize_t start, Py_ssize_t end):
+        """Add the number of newlines in byte_data[start:end] to line_num."""
+        cdef const unsigned char *pos = self.byte_data + start
+        cdef const unsigned char *stop = self.byte_data + end
+        while pos < stop:
+            pos = <const unsigned char *>memchr(pos, c'\n', stop - pos)
+            if pos == NULL:
+                break
+            self.line_num += 1
+            pos += 1
+
     # We check all the getitem[] accesses, so don't have Cython recheck.
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -228,6 +313,11 @@ cdef class Tokenizer:
         cdef object chunk_obj
 
         self.char_index += 1
+        if self.is_bytes:
+            if self.char_index < self.byte_len:
+                return self.byte_data[self.char_index]
+            return -1
+
         if self.char_index < len(self.cur_chunk):
             return self.cur_chunk[self.char_index]
 
@@ -282,6 +372,8 @@ cdef class Tokenizer:
             Py_UCS4 escape_char
             Py_UCS4 peek_char
             int start_line
+            Py_ssize_t start
+            const unsigned char *found
 
         if self.pushback_tok is not None:
             output = self.pushback_tok, self.pushback_val
@@ -311,6 +403,13 @@ cdef class Tokenizer:
 
             elif next_char in ' \t':
                 # Ignore whitespace..
+                if self.is_bytes:
+                    # Skip the rest of the run directly.
+                    while self.char_index + 1 < self.byte_len and (
+                        self.byte_data[self.char_index + 1] == c' ' or
+                        self.byte_data[self.char_index + 1] == c'\t'
+                    ):
+                        self.char_index += 1
                 continue
 
             # Comments
@@ -348,6 +447,18 @@ cdef class Tokenizer:
                             '/**/-style comments are not allowed!'
                         )
                 elif next_char == '/':
+                    if self.is_bytes:
+                        # Jump straight to the end of line.
+                        start = self.char_index + 1
+                        found = <const unsigned char *>memchr(
+                            self.byte_data + start, c'\n',
+                            self.byte_len - start,
+                        )
+                        if found == NULL:
+                            self.char_index = self.byte_len - 1
+                        else:
+                            self.char_index = (found - self.byte_data) - 1
+                        continue
                     # Skip to end of line
                     while True:
                         next_char = self._next_char()
@@ -368,10 +479,27 @@ cdef class Tokenizer:
 
             # Strings
             elif next_char == '"':
+                if self.is_bytes:
+                    # If there's no escapes, we can decode the string
+                    # directly from the buffer.
+                    start = self.char_index + 1
+                    found = <const unsigned char *>memchr(
+                        self.byte_data + start, c'"',
+                        self.byte_len - start,
+                    )
+                    if found != NULL and (not self.allow_escapes or memchr(
+                        self.byte_data + start, c'\\',
+                        found - self.byte_data - start,
+                    ) == NULL):
+                        self.char_index = found - self.byte_data
+                        self._count_lines(start, self.char_index)
+                        return STRING, self._byte_slice(start, self.char_index)
                 self.buf_reset()
                 while True:
                     next_char = self._next_char()
-                    if next_char == -1:
+                    # Py_UCS4 is unsigned, so the cast is needed for this to
+                    # match when it isn't compiled into a switch.
+                    if next_char == <Py_UCS4>-1:
                         raise self._error('Unterminated string!')
                     elif next_char == '"':
                         return STRING, self.buf_get_text()
@@ -380,7 +508,7 @@ cdef class Tokenizer:
                     elif next_char == '\\' and self.allow_escapes:
                         # Escape text
                         escape_char = self._next_char()
-                        if escape_char == -1:
+                        if escape_char == <Py_UCS4>-1:
                             raise self._error('Unterminated string!')
 
                         if escape_char == 'n':
@@ -457,6 +585,20 @@ cdef class Tokenizer:
             else: # Not-in can't be in a switch, so we need to nest this.
                 # Bare names
                 if next_char not in BARE_DISALLOWED:
+                    if self.is_bytes:
+                        # Find the end, then decode it all at once.
+                        start = self.char_index
+                        while True:
+                            self.char_index += 1
+                            if self.char_index >= self.byte_len:
+                                break
+                            peek_char = self.byte_data[self.char_index]
+                            if peek_char in BARE_DISALLOWED:
+                                break
+                        # Produce the ending char next. If it's not allowed,
+                        # that'll error on next call.
+                        self.char_index -= 1
+                        return STRING, self._byte_slice(start, self.char_index + 1)
                     self.buf_reset()
                     self.buf_add_char(next_char)
                     while True:
@@ -1,4 +1,5 @@
 """Common code for handling binary formats."""
+import os
 from binascii import crc32
 from struct import unpack, calcsize, Struct
 from typing import IO, List, Hashable, Dict, Tuple, Union
@@ -67,6 +68,67 @@ def checksum(data: bytes, prior=0) -> int:
 
 EMPTY_CHECKSUM = checksum(b'')  # Checksum of empty bytes - 0.
 
+# Size of blocks used when copying between files.
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+def copy_range(src: IO[bytes], dest: IO[bytes], offset: int, length: int) -> None:
+    """Copy a section of one file to the current position in another.
+
+    Where the OS supports it (copy_file_range() or sendfile()), the copy is
+    done entirely by the kernel. Otherwise this falls back to regular block
+    copies.
+    """
+    dest.flush()
+    dest_pos = dest.tell()
+    try:
+        copied = _kernel_copy(src.fileno(), dest.fileno(), offset, dest_pos, length)
+    except (AttributeError, OSError, ValueError):
+        # No file descriptor, BytesIO for example.
+        copied = 0
+
+    src.seek(offset + copied)
+    dest.seek(dest_pos + copied)
+    remaining = length - copied
+    while remaining > 0:
+        block = src.read(min(remaining, COPY_BLOCK_SIZE))
+        if not block:
+            raise ValueError('Fell off end of file!')
+        dest.write(block)
+        remaining -= len(block)
+
+
+def _kernel_copy(src: int, dest: int, src_off: int, dest_off: int, length: int) -> int:
+    """Copy between file descriptors using OS functions, if available.
+
+    This returns the number of bytes successfully copied.
+    """
+    copied = 0
+    try:
+        if hasattr(os, 'copy_file_range'):
+            while copied < length:
+                count = os.copy_file_range(
+                    src, dest,
+                    length - copied,
+                    src_off + copied,
+                    dest_off + copied,
+                )
+                if count == 0:
+                    break
+                copied += count
+        elif hasattr(os, 'sendfile'):
+            # This writes to the current position.
+            os.lseek(dest, dest_off, os.SEEK_SET)
+            while copied < length:
+                count = os.sendfile(dest, src, src_off + copied, length - copied)
+                if count == 0:
+                    break
+                copied += count
+    except OSError:
+        # Not supported for these files, the caller finishes the copy.
+        pass
+    return copied
+
 
 class DeferredWrites:
     """Several formats expect offsets to be written pointing to latter locations.
@@ -2,6 +2,11 @@
 
 """
 import contextlib
+import io
+import mmap
+import os
+import sys
+from array import array
 
 from io import BytesIO
 from enum import Enum, Flag
@@ -12,17 +17,20 @@ from zipfile import ZipFile
 from srctools import AtomicWriter, Vec, conv_int
 from srctools.fgd import FGD, EntityDef, EntityTypes
 from srctools.vmf import VMF, Entity, Output
-from srctools.binformat import struct_read, DeferredWrites
+from srctools.binformat import struct_read, DeferredWrites, copy_range, COPY_BLOCK_SIZE
 from srctools.property_parser import Property
 import struct
 
-from typing import List, Dict, Iterator, Union, Optional, BinaryIO, Tuple
+from typing import (
+    List, Dict, Iterator, Union, Optional, BinaryIO, Tuple,
+    Iterable, Set, Any,
+)
 
 
 __all__ = [
     'BSP_LUMPS', 'VERSIONS',
     'BSP', 'Lump',
-    'StaticProp', 'StaticPropFlags',
+    'StaticProp', 'StaticPropFlags', 'StaticPropTable',
 ]
 
 
@@ -165,6 +173,11 @@ class BSP_LUMPS(Enum):
     DISP_MULTIBLEND = 63
 
 LUMP_COUNT = max(lump.value for lump in BSP_LUMPS) + 1  # 64 normally
+HEADER_SIZE = (
+    struct.calcsize(HEADER_1) +
+    struct.calcsize(HEADER_LUMP) * LUMP_COUNT +
+    struct.calcsize(HEADER_2)
+)
 
 # Special-case the packfile lump, put it at the end.
 # This way the BSP can be opened by generic zip programs.
@@ -202,21 +215,58 @@ class StaticPropFlags(Flag):
 
 
 class BSP:
-    """A BSP file."""
-    def __init__(self, filename: str, version: VERSIONS=None):
+    """A BSP file.
+
+    If lazy is true, the file is memory-mapped and lumps are only read when
+    their data is first accessed. Unchanged lumps are then copied straight
+    from the mapping when saving. In this mode, call close() (or use the BSP
+    as a context manager) to release the file once done.
+    """
+    def __init__(self, filename: str, version: VERSIONS=None, lazy: bool=False):
         self.filename = filename
         self.map_revision = -1  # The map's revision count
         self.lumps = {}  # type: Dict[BSP_LUMPS, Lump]
         self.game_lumps = {}  # type: Dict[bytes, GameLump]
         self.header_off = 0
         self.version = version  # type: Optional[Union[VERSIONS, int]]
+        self.lazy = lazy
+        # Shared by all lumps, holds the mapping when lazily loading.
+        self._source = _LumpSource()
+        # The size and modification time of the file when last read or
+        # written, and the game lump directory it contains. These allow
+        # detecting if in-place saves are possible.
+        self._file_stat = None  # type: Optional[Tuple[int, int]]
+        self._game_lump_dir = []  # type: List[tuple]
 
         self.read()
 
+    def __enter__(self) -> 'BSP':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory-mapped file, if loaded lazily.
+
+        Lumps which have not been read yet can no longer be accessed.
+        Temporary files given to set_data_file() are also closed.
+        """
+        self._source.close()
+        for lump in itertools.chain(self.lumps.values(), self.game_lumps.values()):
+            lump._close_file()
+
     def read(self) -> None:
         """Load all data."""
         self.lumps.clear()
         self.game_lumps.clear()
+        # Any previous lumps are now invalid, so release the old mapping
+        # and start a fresh one.
+        self._source.close()
+        self._source = source = _LumpSource()
+
+        if self.lazy:
+            source.open(self.filename)
 
         with open(self.filename, mode='br') as file:
             # BSP files start with 'VBSP', then a version number.
@@ -247,10 +297,13 @@ class BSP:
             [self.map_revision] = struct_read(HEADER_2, file)
 
             for lump in self.lumps.values():
-                # Now read in each lump.
+                # Now read in each lump, or just record where it is.
                 offset, length = lump_offsets[lump.type]
-                file.seek(offset)
-                lump.data = file.read(length)
+                if self.lazy:
+                    lump._set_location(source, offset, length)
+                else:
+                    file.seek(offset)
+                    lump._set_location(source, offset, length, file.read(length))
 
             game_lump = self.lumps[BSP_LUMPS.GAME_LUMP]
 
@@ -269,86 +322,301 @@ class BSP:
                 ) = GameLump.ST.unpack_from(game_lump.data, lump_offset)  # type: bytes, int, int, int, int
                 lump_offset += GameLump.ST.size
 
-                file.seek(file_off)
-
                 # The lump ID is backward..
                 game_lump_id = game_lump_id[::-1]
 
-                self.game_lumps[game_lump_id] = GameLump(
+                self.game_lumps[game_lump_id] = glump = GameLump(
                     game_lump_id,
                     flags,
                     glump_version,
-                    file.read(file_len),
+                    b'',
                 )
-            # This is not valid any longer.
-            game_lump.data = b''
-
-    def save(self, filename=None) -> None:
-        """Write the BSP back into the given file."""
-
+                if self.lazy:
+                    glump._set_location(source, file_off, file_len)
+                else:
+                    file.seek(file_off)
+                    glump._set_location(source, file_off, file_len, file.read(file_len))
+            # This is not valid any longer. Leave the location alone, so we
+            # know where the directory is.
+            game_lump._data = b''
+
+        self._file_stat = _stat_file(self.filename)
+        self._game_lump_dir = self._game_lump_state()
+
+    def _game_lump_state(self) -> List[tuple]:
+        """Produce the values which are stored in the game lump directory."""
+        return [
+            (glump.id, glump.flags, glump.version, glump._location)
+            for glump in self.game_lumps.values()
+        ]
+
+    def save(self, filename=None, in_place: bool=False) -> None:
+        """Write the BSP back into the given file.
+
+        Lumps which were never loaded are copied straight from the original.
+        If in_place is true and the BSP is being written back to its own file,
+        only the header and modified lumps are written where the lump sizes
+        allow that. This is much faster, but not atomic - if interrupted the
+        file will be corrupt.
+        """
+        filename = filename or self.filename
         game_lumps = list(self.game_lumps.values())  # Lock iteration order.
+        # If we're overwriting our own file, lazy lumps need to be pointed
+        # at their new positions afterward.
+        overwrite = _is_same_path(filename, self.filename)
+        locations = []  # type: List[Tuple[_LazyData, int, int]]
 
-        with AtomicWriter(filename or self.filename, is_bytes=True) as file:  # type: BinaryIO
-            # Needed to allow writing out the header before we know the position
-            # data will be.
-            defer = DeferredWrites(file)
+        if in_place and overwrite and self._save_in_place():
+            return
 
-            if isinstance(self.version, VERSIONS):
-                version = self.version.value
-            else:
-                version = self.version
-
-            file.write(struct.pack(HEADER_1, BSP_MAGIC, version))
-
-            # Write headers.
-            for lump_name in BSP_LUMPS:
-                lump = self.lumps[lump_name]
-                defer.defer(lump_name, '<ii')
-                file.write(struct.pack(
-                    HEADER_LUMP,
-                    0,  # offset
-                    0,  # length
-                    lump.version,
-                    bytes(lump.ident),
-                ))
+        try:
+            with AtomicWriter(filename, is_bytes=True) as file:  # type: BinaryIO
+                # Needed to allow writing out the header before we know the position
+                # data will be.
+                defer = DeferredWrites(file)
 
-            # After lump headers, the map revision...
-            file.write(struct.pack(HEADER_2, self.map_revision))
-
-            # Then each lump.
-            for lump_name in LUMP_WRITE_ORDER:
-                # Write out the actual data.
-                lump = self.lumps[lump_name]
-                if lump_name is BSP_LUMPS.GAME_LUMP:
-                    # Construct this right here.
-                    lump_start = file.tell()
-                    file.write(struct.pack('<i', len(game_lumps)))
-                    for game_lump in game_lumps:
-                        file.write(struct.pack(
-                            '<4s HH',
-                            game_lump.id[::-1],
-                            game_lump.flags,
-                            game_lump.version,
-                        ))
-                        defer.defer(game_lump.id, '<i', write=True)
-                        file.write(struct.pack('<i', len(game_lump.data)))
-
-                    # Now write data.
-                    for game_lump in game_lumps:
-                        defer.set_data(game_lump.id, file.tell())
-                        file.write(game_lump.data)
-                    # Length of the game lump is current - start.
-                    defer.set_data(
-                        lump_name,
-                        lump_start,
-                        file.tell() - lump_start,
-                    )
+                if isinstance(self.version, VERSIONS):
+                    version = self.version.value
                 else:
-                    # Normal lump.
-                    defer.set_data(lump_name, file.tell(), len(lump.data))
-                    file.write(lump.data)
-            # Apply all the deferred writes.
-            defer.write()
+                    version = self.version
+
+                file.write(struct.pack(HEADER_1, BSP_MAGIC, version))
+
+                # Write headers.
+                for lump_name in BSP_LUMPS:
+                    lump = self.lumps[lump_name]
+                    defer.defer(lump_name, '<ii')
+                    file.write(struct.pack(
+                        HEADER_LUMP,
+                        0,  # offset
+                        0,  # length
+                        lump.version,
+                        bytes(lump.ident),
+                    ))
+
+                # After lump headers, the map revision...
+                file.write(struct.pack(HEADER_2, self.map_revision))
+
+                # Then each lump.
+                for lump_name in LUMP_WRITE_ORDER:
+                    # Write out the actual data.
+                    lump = self.lumps[lump_name]
+                    if lump_name is BSP_LUMPS.GAME_LUMP:
+                        # Construct this right here.
+                        lump_start = file.tell()
+                        file.write(struct.pack('<i', len(game_lumps)))
+                        for game_lump in game_lumps:
+                            file.write(struct.pack(
+                                '<4s HH',
+                                game_lump.id[::-1],
+                                game_lump.flags,
+                                game_lump.version,
+                            ))
+                            defer.defer(game_lump.id, '<i', write=True)
+                            file.write(struct.pack('<i', game_lump._data_len()))
+
+                        # Now write data.
+                        for game_lump in game_lumps:
+                            offset = file.tell()
+                            defer.set_data(game_lump.id, offset)
+                            locations.append((game_lump, offset, game_lump._write_to(file)))
+                        # Length of the game lump is current - start.
+                        defer.set_data(
+                            lump_name,
+                            lump_start,
+                            file.tell() - lump_start,
+                        )
+                        locations.append((lump, lump_start, file.tell() - lump_start))
+                    else:
+                        # Normal lump.
+                        offset = file.tell()
+                        length = lump._write_to(file)
+                        defer.set_data(lump_name, offset, length)
+                        locations.append((lump, offset, length))
+                # Apply all the deferred writes.
+                defer.write()
+                if overwrite:
+                    # The original can't be replaced while it's still mapped
+                    # on some OSes.
+                    self._source.close()
+        finally:
+            if overwrite and self.lazy:
+                # Map whichever file is present now - if saving failed, this
+                # is still the original.
+                self._source.open(self.filename)
+
+        if overwrite:
+            # Everything now matches the file on disk.
+            for lump, offset, length in locations:
+                lump._move_location(offset, length)
+            self._file_stat = _stat_file(self.filename)
+            self._game_lump_dir = self._game_lump_state()
+
+    def _save_in_place(self) -> bool:
+        """Rewrite just the header and modified lumps in our file.
+
+        Lumps which fit are written over their old data, others are placed at
+        the end of the file (before the packfile). If this isn't possible,
+        False is returned without making any changes.
+        """
+        if self._file_stat is None or _stat_file(self.filename) != self._file_stat:
+            # Modified by something else, our offsets can't be trusted.
+            return False
+
+        game_lumps = list(self.game_lumps.values())
+        if any(lump._location is None for lump in self.lumps.values()):
+            return False
+        game_dir_changed = (
+            any(glump.dirty for glump in game_lumps) or
+            self._game_lump_state() != self._game_lump_dir
+        )
+        # Each lump which needs to be written, and its new length.
+        changed = {}  # type: Dict[BSP_LUMPS, int]
+        for lump_name, lump in self.lumps.items():
+            if lump_name is BSP_LUMPS.GAME_LUMP:
+                if game_dir_changed:
+                    changed[lump_name] = GameLump.ST.size * len(game_lumps) + 4 + sum(
+                        glump._data_len() for glump in game_lumps
+                    )
+            elif lump.dirty:
+                changed[lump_name] = lump._data_len()
+
+        # Lumps which won't fit get moved to the end.
+        moved = [
+            lump_name for lump_name in LUMP_WRITE_ORDER
+            if changed.get(lump_name, 0) > self.lumps[lump_name]._location[1]
+        ]
+
+        def end_pos(ignore: List[BSP_LUMPS]) -> int:
+            """Compute the end of lump data, excluding some lumps."""
+            end = HEADER_SIZE
+            for lump_name, lump in self.lumps.items():
+                if lump_name not in ignore:
+                    offset, length = lump._location
+                    length = changed.get(lump_name, length)
+                    if length:
+                        end = max(end, offset + length)
+            return end
+
+        pakfile = self.lumps[BSP_LUMPS.PAKFILE]
+        if moved and BSP_LUMPS.PAKFILE not in moved and pakfile._location[1] > 0:
+            # Keep the packfile at the end, so the BSP can be opened as a zip.
+            pak_off, pak_len = pakfile._location
+            if all(
+                offset + length <= pak_off + pak_len
+                for offset, length in (lump._location for lump in self.lumps.values())
+            ):
+                moved.append(BSP_LUMPS.PAKFILE)
+                changed[BSP_LUMPS.PAKFILE] = pakfile._data_len()
+
+        positions = {}  # type: Dict[BSP_LUMPS, int]
+        file_end = end_pos(moved)
+        for lump_name in LUMP_WRITE_ORDER:
+            if lump_name in moved:
+                positions[lump_name] = file_end
+                file_end += changed[lump_name]
+            elif lump_name in changed:
+                positions[lump_name] = self.lumps[lump_name]._location[0]
+
+        # Moving or shrinking lumps leaves unused space behind. If that would
+        # bloat the file too much, a full rewrite is better.
+        old_size = sum(lump._location[1] for lump in self.lumps.values())
+        new_size = sum(
+            changed.get(lump_name, lump._location[1])
+            for lump_name, lump in self.lumps.items()
+        )
+        old_unused = self._file_stat[0] - old_size
+        new_unused = file_end - new_size
+        if new_unused - old_unused > file_end // 4:
+            return False
+
+        # Load everything we need before the file is modified. An unchanged
+        # packfile is moved inside the file instead.
+        game_lump_data = b''
+        if game_dir_changed:
+            game_lump_data = self._build_game_lump(positions[BSP_LUMPS.GAME_LUMP])
+        relocate_pak = (
+            BSP_LUMPS.PAKFILE in changed and
+            pakfile._data is None and pakfile._file is None
+        )
+        for lump_name in changed:
+            lump = self.lumps[lump_name]
+            if lump._file is None and lump is not pakfile:
+                lump.data  # Read if lazy.
+
+        # Release the mapping while we modify the file, some OSes don't allow
+        # resizing a mapped file.
+        self._source.close()
+        try:
+            with open(self.filename, 'r+b') as file:
+                if relocate_pak:
+                    # Do this first, before other lumps overwrite it.
+                    _move_range(
+                        file, pakfile._location[0],
+                        positions[BSP_LUMPS.PAKFILE],
+                        changed[BSP_LUMPS.PAKFILE],
+                    )
+                for lump_name, offset in positions.items():
+                    file.seek(offset)
+                    if lump_name is BSP_LUMPS.GAME_LUMP:
+                        file.write(game_lump_data)
+                    elif not (relocate_pak and lump_name is BSP_LUMPS.PAKFILE):
+                        self.lumps[lump_name]._write_to(file)
+                    self.lumps[lump_name]._move_location(offset, changed[lump_name])
+                if game_dir_changed:
+                    glump_offset = positions[BSP_LUMPS.GAME_LUMP] + 4 + GameLump.ST.size * len(game_lumps)
+                    for glump in game_lumps:
+                        glump._move_location(glump_offset, glump._data_len())
+                        glump_offset += glump._data_len()
+
+                file.seek(0)
+                self._write_header(file)
+                file.truncate(end_pos([]))
+        finally:
+            if self.lazy:
+                self._source.open(self.filename)
+        self._file_stat = _stat_file(self.filename)
+        self._game_lump_dir = self._game_lump_state()
+        return True
+
+    def _write_header(self, file: BinaryIO) -> None:
+        """Write the header, using the current lump locations."""
+        if isinstance(self.version, VERSIONS):
+            version = self.version.value
+        else:
+            version = self.version
+
+        file.write(struct.pack(HEADER_1, BSP_MAGIC, version))
+        for lump_name in BSP_LUMPS:
+            lump = self.lumps[lump_name]
+            offset, length = lump._location
+            file.write(struct.pack(
+                HEADER_LUMP,
+                offset,
+                length,
+                lump.version,
+                bytes(lump.ident),
+            ))
+        file.write(struct.pack(HEADER_2, self.map_revision))
+
+    def _build_game_lump(self, offset: int) -> bytes:
+        """Produce the game lump directory and data, for the given position."""
+        game_lumps = list(self.game_lumps.values())
+        buf = BytesIO()
+        buf.write(struct.pack('<i', len(game_lumps)))
+        data_off = offset + 4 + GameLump.ST.size * len(game_lumps)
+        for glump in game_lumps:
+            buf.write(GameLump.ST.pack(
+                glump.id[::-1],
+                glump.flags,
+                glump.version,
+                data_off,
+                len(glump.data),
+            ))
+            data_off += len(glump.data)
+        for glump in game_lumps:
+            buf.write(glump.data)
+        return buf.getvalue()
 
     def read_header(self) -> None:
         """No longer used."""
@@ -552,227 +820,302 @@ class BSP:
 
     def static_props(self) -> Iterator['StaticProp']:
         """Read in the Static Props lump."""
-        # The version of the static prop format - different features.
+        yield from self.static_prop_table()
+
+    def static_prop_table(self) -> 'StaticPropTable':
+        """Read in the Static Props lump, as a StaticPropTable.
+
+        This avoids constructing objects for every prop.
+        """
         try:
-            version = self.game_lumps[b'sprp'].version
+            game_lump = self.game_lumps[b'sprp']
         except KeyError:
             raise ValueError('No static prop lump!') from None
-
-        if version > 11:
-            raise ValueError('Unknown version ({})!'.format(version))
-        if version < 4:
-            # Predates HL2...
-            raise ValueError('Static prop version {} is too old!')
-
-        static_lump = BytesIO(self.game_lumps[b'sprp'].data)
-
-        # Array of model filenames.
-        model_dict = list(self._read_static_props_models(static_lump))
-
-        [visleaf_count] = struct_read('<i', static_lump)
-        visleaf_list = list(struct_read('H' * visleaf_count, static_lump))
-
-        [prop_count] = struct_read('<i', static_lump)
-
-        for i in range(prop_count):
-            origin = Vec(struct_read('fff', static_lump))
-            angles = Vec(struct_read('fff', static_lump))
-
-            [model_ind] = struct_read('<H', static_lump)
-
-            (
-                first_leaf,
-                leaf_count,
-                solidity,
-                flags,
-                skin,
-                min_fade,
-                max_fade,
-            ) = struct_read('<HHBBiff', static_lump)
-
-            model_name = model_dict[model_ind]
-
-            visleafs = visleaf_list[first_leaf:first_leaf + leaf_count]
-            lighting_origin = Vec(struct_read('<fff', static_lump))
-
-            if version >= 5:
-                fade_scale = struct_read('<f', static_lump)[0]
-            else:
-                fade_scale = 1  # default
-
-            if version in (6, 7):
-                min_dx_level, max_dx_level = struct_read('<HH', static_lump)
-            else:
-                # Replaced by GPU & CPU in later versions.
-                min_dx_level = max_dx_level = 0  # None
-
-            if version >= 8:
-                (
-                    min_cpu_level,
-                    max_cpu_level,
-                    min_gpu_level,
-                    max_gpu_level,
-                ) = struct_read('BBBB', static_lump)
-            else:
-                # None
-                min_cpu_level = max_cpu_level = 0
-                min_gpu_level = max_gpu_level = 0
-
-            if version >= 7:
-                r, g, b, renderfx = struct_read('BBBB', static_lump)
-                # Alpha isn't used.
-                tint = Vec(r, g, b)
-            else:
-                # No tint.
-                tint = Vec(255, 255, 255)
-                renderfx = 255
-
-            if version >= 11:
-                # Unknown data, though it's float-like.
-                unknown_1 = struct_read('<i', static_lump)
-
-            if version >= 10:
-                # Extra flags, post-CSGO.
-                flags |= struct_read('<I', static_lump)[0] << 8
-
-            flags = StaticPropFlags(flags)
-
-            scaling = 1.0
-            disable_on_xbox = False
-
-            if version >= 11:
-                # XBox support was removed. Instead this is the scaling factor.
-                [scaling] = struct_read("<f", static_lump)
-            elif version >= 9:
-                # The single boolean byte also produces 3 pad bytes.
-                [disable_on_xbox] = struct_read('<?xxx', static_lump)
-
-            yield StaticProp(
-                model_name,
-                origin,
-                angles,
-                scaling,
-                visleafs,
-                solidity,
-                flags,
-                skin,
-                min_fade,
-                max_fade,
-                lighting_origin,
-                fade_scale,
-                min_dx_level,
-                max_dx_level,
-                min_cpu_level,
-                max_cpu_level,
-                min_gpu_level,
-                max_gpu_level,
-                tint,
-                renderfx,
-                disable_on_xbox,
-            )
+        return StaticPropTable.parse(game_lump.data, game_lump.version)
 
     def write_static_props(self, props: List['StaticProp']) -> None:
         """Remake the static prop lump."""
-
-        # First generate the visleaf and model-names block.
-        # Unfortunately it seems reusing visleaf parts isn't possible.
-        leaf_array = []  # type: List[int]
-        leaf_offsets = []  # type: List[int]
-
-        models = set()
-
-        for prop in props:
-            leaf_offsets.append(len(leaf_array))
-            leaf_array.extend(prop.visleafs)
-            models.add(prop.model)
-
-        # Lock down the order of the names.
-        model_list = list(models)
-        model_ind = {
-            mdl: i
-            for i, mdl in enumerate(model_list)
-        }
-
         game_lump = self.game_lumps[b'sprp']
+        game_lump.data = StaticPropTable.from_props(props, game_lump.version).export()
 
-        # Now write out the sections.
-        prop_lump = BytesIO()
-        prop_lump.write(struct.pack('<i', len(model_list)))
-        for name in model_list:
-            prop_lump.write(struct.pack('<128s', name.encode('ascii')))
-
-        prop_lump.write(struct.pack('<i', len(leaf_array)))
-        prop_lump.write(struct.pack('<{}H'.format(len(leaf_array)), *leaf_array))
-
-        prop_lump.write(struct.pack('<i', len(props)))
-        for leaf_off, prop in zip(leaf_offsets, props):
-            prop_lump.write(struct.pack(
-                '<6fH',
-                prop.origin.x,
-                prop.origin.y,
-                prop.origin.z,
-                prop.angles.x,
-                prop.angles.y,
-                prop.angles.z,
-                model_ind[prop.model],
-            ))
-
-            prop_lump.write(struct.pack(
-                '<HHBBifffff',
-                leaf_off,
-                len(prop.visleafs),
-                prop.solidity,
-                prop.flags.value_prim,
-                prop.skin,
-                prop.min_fade,
-                prop.max_fade,
-                prop.lighting.x,
-                prop.lighting.y,
-                prop.lighting.z,
-            ))
-            if game_lump.version >= 5:
-                prop_lump.write(struct.pack('<f', prop.fade_scale))
-
-            if game_lump.version in (6, 7):
-                prop_lump.write(struct.pack(
-                    '<HH',
-                    prop.min_dx_level,
-                    prop.max_dx_level,
-                ))
+    def write_static_prop_table(self, table: 'StaticPropTable') -> None:
+        """Remake the static prop lump, from a StaticPropTable."""
+        game_lump = self.game_lumps[b'sprp']
+        game_lump.version = table.version
+        game_lump.data = table.export()
+
+
+def _stat_file(filename: str) -> Tuple[int, int]:
+    """Return the size and modification time of a file."""
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_same_path(first: str, second: str) -> bool:
+    """Check if two filenames refer to the same location."""
+    return (
+        os.path.normcase(os.path.abspath(first)) ==
+        os.path.normcase(os.path.abspath(second))
+    )
+
+
+def _move_range(file: BinaryIO, src: int, dest: int, length: int) -> None:
+    """Move a section of a file to another position, which may overlap."""
+    if dest > src:
+        # Copy from the end, so we don't overwrite data we haven't read.
+        end = length
+        while end > 0:
+            start = max(0, end - COPY_BLOCK_SIZE)
+            file.seek(src + start)
+            block = file.read(end - start)
+            file.seek(dest + start)
+            file.write(block)
+            end = start
+    elif dest < src:
+        for start in range(0, length, COPY_BLOCK_SIZE):
+            file.seek(src + start)
+            block = file.read(min(COPY_BLOCK_SIZE, length - start))
+            file.seek(dest + start)
+            file.write(block)
+
+
+class _LumpSource:
+    """The memory-mapped BSP file, shared by lazily-loaded lumps."""
+    __slots__ = ['file', 'mapping']
+
+    def __init__(self) -> None:
+        self.file = None  # type: Optional[BinaryIO]
+        self.mapping = None  # type: Optional[mmap.mmap]
+
+    def open(self, filename: str) -> None:
+        """Map the given file, replacing any existing mapping."""
+        self.close()
+        self.file = open(filename, 'rb')
+        try:
+            self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Release the mapping, if present."""
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Read a section of the file."""
+        if self.mapping is None:
+            raise ValueError('BSP file has been closed!')
+        return self.mapping[offset:offset + length]
+
+    def open_range(self, offset: int, length: int) -> BinaryIO:
+        """Open a section of the file, without reading it."""
+        if self.mapping is None:
+            raise ValueError('BSP file has been closed!')
+        return _BufferFile(self.mapping, offset, length)  # type: ignore
+
+    def write_to(self, file: BinaryIO, offset: int, length: int) -> None:
+        """Copy a section of the file into another, without loading it."""
+        if self.file is None:
+            raise ValueError('BSP file has been closed!')
+        copy_range(self.file, file, offset, length)
+
+
+class _BufferFile(io.RawIOBase):
+    """A read-only file over a section of a buffer, which isn't copied.
+
+    If owner is provided, it is closed along with this file.
+    """
+    def __init__(self, buffer: Any, offset: int, length: int, owner: Any=None) -> None:
+        super().__init__()
+        self._base = memoryview(buffer)
+        self._view = self._base[offset:offset + length]
+        self._pos = 0
+        self._owner = owner
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int=-1) -> bytes:
+        """Read up to size bytes, or the remainder if negative."""
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+        start = self._pos
+        if size is None or size < 0:
+            end = len(self._view)
+        else:
+            end = min(start + size, len(self._view))
+        self._pos = max(start, end)
+        return bytes(self._view[start:end])
+
+    def readinto(self, buffer: Any) -> int:
+        """Read into a buffer, returning the size read."""
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, pos: int, whence: int=io.SEEK_SET) -> int:
+        """Move to a new position."""
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += len(self._view)
+        if pos < 0:
+            raise ValueError('Negative seek position {}'.format(pos))
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        """Release the buffer, allowing it to be closed."""
+        if not self.closed:
+            self._view.release()
+            self._base.release()
+            if self._owner is not None:
+                self._owner.close()
+        super().close()
+
+
+class _LazyData:
+    """Shared logic for lumps, allowing data to be read only when required.
+
+    _location is the (offset, length) of the data in the BSP file, or None
+    if it has never been saved. _data is None if it has not been read yet.
+    _file is a temporary file containing new data, if set_data_file() was
+    used.
+    """
+    __slots__ = ['_data', '_source', '_location', '_dirty', '_file']
 
-            if game_lump.version >= 8:
-                prop_lump.write(struct.pack(
-                    '<BBBB',
-                    prop.min_cpu_level,
-                    prop.max_cpu_level,
-                    prop.min_gpu_level,
-                    prop.max_gpu_level
-                ))
+    def __init__(self, data: bytes=b'') -> None:
+        self._data = data  # type: Optional[bytes]
+        self._source = None  # type: Optional[_LumpSource]
+        self._location = None  # type: Optional[Tuple[int, int]]
+        self._dirty = True
+        self._file = None  # type: Optional[Tuple[BinaryIO, int]]
 
-            if game_lump.version >= 7:
-                prop_lump.write(struct.pack(
-                    '<BBBB',
-                    int(prop.tint.x),
-                    int(prop.tint.y),
-                    int(prop.tint.z),
-                    prop.renderfx,
-                ))
+    @property
+    def data(self) -> bytes:
+        """The contents of the lump. If lazily loaded, this is read on first access."""
+        if self._data is None:
+            if self._file is not None:
+                file, length = self._file
+                file.seek(0)
+                data = file.read(length)
+                self._close_file()
+                self._data = data
+            else:
+                self._data = self._source.read(*self._location)
+        return self._data
 
-            if game_lump.version >= 10:
-                prop_lump.write(struct.pack('<I', prop.flags.value_sec))
+    @data.setter
+    def data(self, data: bytes) -> None:
+        self._close_file()
+        self._data = data
+        self._dirty = True
 
-            if game_lump.version >= 11:
-                # Unknown padding/data, though it's always zero.
+    @property
+    def dirty(self) -> bool:
+        """Check if the data has been changed since the BSP was read or saved."""
+        return self._dirty
 
-                prop_lump.write(struct.pack('<xxxxf', prop.scaling))
-            elif game_lump.version >= 9:
-                # The 1-byte bool gets expanded to the full 4-byte size.
-                prop_lump.write(struct.pack('<?xxx', prop.disable_on_xbox))
+    def open_data(self) -> BinaryIO:
+        """Open the contents of the lump as a read-only file.
 
-        game_lump.data = prop_lump.getvalue()
+        Data which has not been loaded is read directly from the BSP or
+        temporary file, without reading it all into memory. Close the file
+        when done, the BSP can't be saved while it is open.
+        """
+        if self._data is not None:
+            # This shares the bytes object, instead of copying.
+            return BytesIO(self._data)
+        elif self._file is not None:
+            file, length = self._file
+            if length == 0:
+                return BytesIO()
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return _BufferFile(mapping, 0, length, mapping)  # type: ignore
+        else:
+            offset, length = self._location
+            return self._source.open_range(offset, length)
 
+    def set_data_file(self, file: BinaryIO) -> None:
+        """Replace the contents of the lump with those of a temporary file.
 
-class Lump:
+        This allows producing large lumps without holding them in memory.
+        The lump takes ownership of the file, closing it once the data has
+        been saved or read, or when the BSP is closed.
+        """
+        file.flush()
+        length = file.seek(0, io.SEEK_END)
+        self._close_file()
+        self._data = None
+        self._file = file, length
+        self._dirty = True
+
+    def _close_file(self) -> None:
+        """Close the temporary file, if present."""
+        if self._file is not None:
+            self._file[0].close()
+            self._file = None
+
+    def _set_location(
+        self,
+        source: _LumpSource,
+        offset: int,
+        length: int,
+        data: Optional[bytes]=None,
+    ) -> None:
+        """Record where this lump is in the file, with the data if already read."""
+        self._close_file()
+        self._source = source
+        self._location = offset, length
+        self._data = data
+        self._dirty = False
+
+    def _move_location(self, offset: int, length: int) -> None:
+        """The file has been rewritten, so update where the data is."""
+        if self._file is not None and self._source.mapping is not None:
+            # The data can now be read from the BSP instead.
+            self._close_file()
+        self._location = offset, length
+        self._dirty = False
+
+    def _data_len(self) -> int:
+        """Return the length of the data, without loading it."""
+        if self._data is None:
+            if self._file is not None:
+                return self._file[1]
+            return self._location[1]
+        return len(self._data)
+
+    def _write_to(self, file: BinaryIO) -> int:
+        """Write the data into the file, returning the length written.
+
+        If not loaded, the data is copied directly from the original or
+        temporary file.
+        """
+        if self._data is None:
+            if self._file is not None:
+                src, length = self._file
+                copy_range(src, file, 0, length)
+                return length
+            offset, length = self._location
+            self._source.write_to(file, offset, length)
+            return length
+        file.write(self._data)
+        return len(self._data)
+
+
+class Lump(_LazyData):
     """Represents a lump header in a BSP file.
 
     """
@@ -783,21 +1126,21 @@ class Lump:
         ident: bytes,
     ) -> None:
         """This should not be constructed outside a BSP."""
+        super().__init__()
         self.type = typ
         self.version = version
         self.ident = [int(x) for x in ident]
-        self.data = b''
 
     def __repr__(self) -> str:
         return '<BSP Lump "{}", v{}, ident={}, {} bytes>'.format(
             self.type.name,
             self.version,
             bytes(self.ident),
-            len(self.data)
+            self._data_len(),
         )
 
 
-class GameLump:
+class GameLump(_LazyData):
     """Represents a game lump.
 
     These are designed to be game-specific.
@@ -806,7 +1149,6 @@ class GameLump:
         'id',
         'flags',
         'version',
-        'data',
     ]
 
     ST = struct.Struct('<4s HH ii')
@@ -819,17 +1161,17 @@ class GameLump:
         data: bytes,
     ) -> None:
         """This should not be constructed outside a BSP."""
+        super().__init__(data)
         self.id = lump_id
         self.flags = flags
         self.version = version
-        self.data = data
 
     def __repr__(self) -> str:
         return '<GameLump {}, flags={}, v{}, {} bytes>'.format(
             repr(self.id)[1:],
             self.flags,
             self.version,
-            len(self.data),
+            self._data_len(),
         )
 
 
@@ -903,3 +1245,382 @@ class StaticProp:
             self.origin,
             self.angles,
         )
+
+
+# For each column in StaticPropTable - the array typecode, the number of values
+# per prop, and the value used if the lump version doesn't have the column.
+SPROP_COLUMNS = {
+    'origin': ('f', 3, 0.0),
+    'angles': ('f', 3, 0.0),
+    'model': ('H', 1, 0),
+    'first_leaf': ('I', 1, 0),
+    'leaf_count': ('H', 1, 0),
+    'solidity': ('B', 1, 0),
+    'flags': ('I', 1, 0),
+    'skin': ('i', 1, 0),
+    'min_fade': ('f', 1, 0.0),
+    'max_fade': ('f', 1, 0.0),
+    'lighting': ('f', 3, 0.0),
+    'fade_scale': ('f', 1, 1.0),
+    'min_dx_level': ('H', 1, 0),
+    'max_dx_level': ('H', 1, 0),
+    'min_cpu_level': ('B', 1, 0),
+    'max_cpu_level': ('B', 1, 0),
+    'min_gpu_level': ('B', 1, 0),
+    'max_gpu_level': ('B', 1, 0),
+    'tint': ('B', 3, 255),
+    'renderfx': ('B', 1, 255),
+    'unknown': ('i', 1, 0),
+    'scaling': ('f', 1, 1.0),
+    'disable_on_xbox': ('B', 1, 0),
+}
+
+
+def _sprp_struct(version: int) -> Tuple[struct.Struct, List[Tuple[str, int]]]:
+    """Compute the structure of a static prop for the given version.
+
+    This returns the struct, and the column and value count for each part of
+    the structure. The secondary flags are named '_flags_sec'.
+    """
+    if version > 11:
+        raise ValueError('Unknown version ({})!'.format(version))
+    if version < 4:
+        # Predates HL2...
+        raise ValueError('Static prop version {} is too old!'.format(version))
+
+    fields = [
+        ('origin', '3f'),
+        ('angles', '3f'),
+        ('model', 'H'),
+        ('first_leaf', 'H'),
+        ('leaf_count', 'H'),
+        ('solidity', 'B'),
+        ('flags', 'B'),
+        ('skin', 'i'),
+        ('min_fade', 'f'),
+        ('max_fade', 'f'),
+        ('lighting', '3f'),
+    ]
+    if version >= 5:
+        fields.append(('fade_scale', 'f'))
+    if version in (6, 7):
+        fields += [('min_dx_level', 'H'), ('max_dx_level', 'H')]
+    if version >= 8:
+        fields += [
+            ('min_cpu_level', 'B'), ('max_cpu_level', 'B'),
+            ('min_gpu_level', 'B'), ('max_gpu_level', 'B'),
+        ]
+    if version >= 7:
+        # Alpha is used for renderfx.
+        fields += [('tint', '3B'), ('renderfx', 'B')]
+    if version >= 11:
+        # Unknown data, though it's float-like.
+        fields.append(('unknown', 'i'))
+    if version >= 10:
+        # Extra flags, post-CSGO.
+        fields.append(('_flags_sec', 'I'))
+    if version >= 11:
+        # XBox support was removed. Instead this is the scaling factor.
+        fields.append(('scaling', 'f'))
+    elif version >= 9:
+        # The single boolean byte also produces 3 pad bytes.
+        fields += [('disable_on_xbox', '?'), ('', 'xxx')]
+
+    return struct.Struct('<' + ''.join(fmt for name, fmt in fields)), [
+        (name, int(fmt[:-1] or 1) if name else 0)
+        for name, fmt in fields
+    ]
+
+
+class StaticPropTable:
+    """The static prop lump, stored as an array for each value.
+
+    This allows reading, filtering and modifying large numbers of props
+    without constructing a StaticProp object for each. Each column is
+    an array with the same name as the StaticProp attribute, except that
+    "model" is an index into the models list. Vectors are stored as 3
+    consecutive values. "first_leaf" and "leaf_count" locate each prop's
+    section of the visleafs array. Indexing produces StaticProp objects.
+    """
+    def __init__(self, version: int) -> None:
+        _sprp_struct(version)  # Check the version is valid.
+        self.version = version
+        self.models = []  # type: List[str]
+        self.visleafs = array('H')
+        # Model name -> index in models, rebuilt if models changes size.
+        self._model_lookup = {}  # type: Dict[str, int]
+        self.columns = {
+            name: array(typecode)
+            for name, (typecode, count, default) in SPROP_COLUMNS.items()
+        }  # type: Dict[str, array]
+
+    def __len__(self) -> int:
+        return len(self.columns['model'])
+
+    def __repr__(self) -> str:
+        return '<StaticPropTable v{}, {} props>'.format(self.version, len(self))
+
+    @classmethod
+    def parse(cls, data: bytes, version: int) -> 'StaticPropTable':
+        """Parse the static prop game lump."""
+        st, fields = _sprp_struct(version)
+        table = cls(version)
+        columns = table.columns
+
+        [dict_num] = struct.unpack_from('<i', data, 0)
+        offset = 4
+        for [padded_name] in struct.iter_unpack('<128s', data[offset:offset + 128 * dict_num]):
+            # Strip null chars off the end, and convert to a str.
+            table.models.append(padded_name.rstrip(b'\x00').decode('ascii'))
+        offset += 128 * dict_num
+
+        [leaf_count] = struct.unpack_from('<i', data, offset)
+        offset += 4
+        table.visleafs.frombytes(data[offset:offset + 2 * leaf_count])
+        offset += 2 * leaf_count
+
+        [prop_count] = struct.unpack_from('<i', data, offset)
+        offset += 4
+        prop_data = data[offset:offset + st.size * prop_count]
+        if len(prop_data) != st.size * prop_count:
+            raise ValueError('Static prop lump is truncated!')
+
+        if sys.byteorder == 'big':
+            table.visleafs.byteswap()
+
+        # Transpose into one tuple per value in the struct.
+        values = list(zip(*st.iter_unpack(prop_data)))
+        if not values:
+            values = [()] * sum(count for name, count in fields)
+
+        flags_sec = None
+        pos = 0
+        for name, count in fields:
+            if name == '_flags_sec':
+                flags_sec = values[pos]
+            elif count == 1:
+                columns[name] = array(SPROP_COLUMNS[name][0], values[pos])
+            elif count:
+                column = columns[name] = array(SPROP_COLUMNS[name][0], [0]) * (count * prop_count)
+                for i in range(count):
+                    column[i::count] = array(column.typecode, values[pos + i])
+            pos += count
+
+        if flags_sec is not None:
+            columns['flags'] = array('I', [
+                prim | sec << 8
+                for prim, sec in zip(columns['flags'], flags_sec)
+            ])
+
+        # Fill in columns this version doesn't have.
+        for name, (typecode, count, default) in SPROP_COLUMNS.items():
+            if len(columns[name]) != count * prop_count:
+                columns[name] = array(typecode, [default]) * (count * prop_count)
+
+        return table
+
+    def export(self) -> bytes:
+        """Produce the data for the static prop game lump."""
+        st, fields = _sprp_struct(self.version)
+        columns = self.columns
+
+        # Only write models which are used.
+        used_models = set(columns['model'])
+        model_list = []  # type: List[str]
+        model_remap = {}  # type: Dict[int, int]
+        for ind, name in enumerate(self.models):
+            if ind in used_models:
+                model_remap[ind] = len(model_list)
+                model_list.append(name)
+
+        # Rebuild the visleafs array, so the leafs of each prop are in order.
+        leaf_array = array('H')
+        first_leafs = []  # type: List[int]
+        for first, count in zip(columns['first_leaf'], columns['leaf_count']):
+            first_leafs.append(len(leaf_array))
+            leaf_array.extend(self.visleafs[first:first + count])
+
+        values = []  # type: List[Iterable[Any]]
+        for name, count in fields:
+            if name == 'model':
+                values.append([model_remap[ind] for ind in columns['model']])
+            elif name == 'first_leaf':
+                values.append(first_leafs)
+            elif name == 'flags':
+                values.append([flags & 0xFF for flags in columns['flags']])
+            elif name == '_flags_sec':
+                values.append([flags >> 8 for flags in columns['flags']])
+            elif count == 1:
+                values.append(columns[name])
+            elif count:
+                column = columns[name]
+                values.extend(column[i::count] for i in range(count))
+
+        buf = BytesIO()
+        buf.write(struct.pack('<i', len(model_list)))
+        for name in model_list:
+            buf.write(struct.pack('<128s', name.encode('ascii')))
+
+        buf.write(struct.pack('<i', len(leaf_array)))
+        if sys.byteorder == 'big':
+            leaf_array.byteswap()
+        buf.write(leaf_array.tobytes())
+
+        buf.write(struct.pack('<i', len(self)))
+        buf.write(b''.join(map(st.pack, *values)))
+        return buf.getvalue()
+
+    @classmethod
+    def from_props(cls, props: Iterable['StaticProp'], version: int) -> 'StaticPropTable':
+        """Build a table from StaticProp objects."""
+        table = cls(version)
+        for prop in props:
+            table.append(prop)
+        return table
+
+    def append(self, prop: 'StaticProp') -> None:
+        """Add a StaticProp object to the end of the table."""
+        columns = self.columns
+        columns['model'].append(self._model_index(prop.model))
+        columns['origin'].extend(prop.origin)
+        columns['angles'].extend(prop.angles)
+        columns['first_leaf'].append(len(self.visleafs))
+        columns['leaf_count'].append(len(prop.visleafs))
+        self.visleafs.extend(prop.visleafs)
+        columns['solidity'].append(prop.solidity)
+        columns['flags'].append(prop.flags.value)
+        columns['skin'].append(prop.skin)
+        columns['min_fade'].append(prop.min_fade)
+        columns['max_fade'].append(prop.max_fade)
+        columns['lighting'].extend(prop.lighting)
+        columns['fade_scale'].append(prop.fade_scale)
+        columns['min_dx_level'].append(prop.min_dx_level)
+        columns['max_dx_level'].append(prop.max_dx_level)
+        columns['min_cpu_level'].append(prop.min_cpu_level)
+        columns['max_cpu_level'].append(prop.max_cpu_level)
+        columns['min_gpu_level'].append(prop.min_gpu_level)
+        columns['max_gpu_level'].append(prop.max_gpu_level)
+        columns['tint'].extend([int(prop.tint.x), int(prop.tint.y), int(prop.tint.z)])
+        columns['renderfx'].append(prop.renderfx)
+        columns['unknown'].append(0)
+        columns['scaling'].append(prop.scaling)
+        columns['disable_on_xbox'].append(prop.disable_on_xbox)
+
+    def extend(self, other: 'StaticPropTable') -> None:
+        """Add all the props in another table to the end of this one."""
+        model_remap = [self._model_index(name) for name in other.models]
+        leaf_off = len(self.visleafs)
+        self.visleafs.extend(other.visleafs)
+        for name, column in other.columns.items():
+            if name == 'model':
+                self.columns[name].extend([model_remap[ind] for ind in column])
+            elif name == 'first_leaf':
+                self.columns[name].extend([first + leaf_off for first in column])
+            else:
+                self.columns[name].extend(column)
+
+    def _model_index(self, model: str) -> int:
+        """Find the index for a model, adding it if required."""
+        if len(self._model_lookup) != len(self.models):
+            self._model_lookup = {name: ind for ind, name in enumerate(self.models)}
+        try:
+            return self._model_lookup[model]
+        except KeyError:
+            self._model_lookup[model] = ind = len(self.models)
+            self.models.append(model)
+            return ind
+
+    def __iter__(self) -> Iterator['StaticProp']:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, ind: int) -> 'StaticProp':
+        """Construct a StaticProp object for the given prop."""
+        if ind < 0:
+            ind += len(self)
+        if not 0 <= ind < len(self):
+            raise IndexError(ind)
+        columns = self.columns
+        first_leaf = columns['first_leaf'][ind]
+        vec_ind = slice(3 * ind, 3 * ind + 3)
+        return StaticProp(
+            model=self.models[columns['model'][ind]],
+            origin=Vec(columns['origin'][vec_ind]),
+            angles=Vec(columns['angles'][vec_ind]),
+            scaling=columns['scaling'][ind],
+            visleafs=self.visleafs[first_leaf:first_leaf + columns['leaf_count'][ind]].tolist(),
+            solidity=columns['solidity'][ind],
+            flags=StaticPropFlags(columns['flags'][ind]),
+            skin=columns['skin'][ind],
+            min_fade=columns['min_fade'][ind],
+            max_fade=columns['max_fade'][ind],
+            lighting_origin=Vec(columns['lighting'][vec_ind]),
+            fade_scale=columns['fade_scale'][ind],
+            min_dx_level=columns['min_dx_level'][ind],
+            max_dx_level=columns['max_dx_level'][ind],
+            min_cpu_level=columns['min_cpu_level'][ind],
+            max_cpu_level=columns['max_cpu_level'][ind],
+            min_gpu_level=columns['min_gpu_level'][ind],
+            max_gpu_level=columns['max_gpu_level'][ind],
+            tint=Vec(columns['tint'][vec_ind]),
+            renderfx=columns['renderfx'][ind],
+            disable_on_xbox=bool(columns['disable_on_xbox'][ind]),
+        )
+
+    def take(self, indexes: Iterable[int]) -> 'StaticPropTable':
+        """Produce a new table containing only the specified props."""
+        indexes = list(indexes)
+        table = StaticPropTable(self.version)
+        table.models = self.models.copy()
+        table.visleafs = array('H', self.visleafs)
+        for name, column in self.columns.items():
+            count = SPROP_COLUMNS[name][1]
+            if count == 1:
+                table.columns[name] = array(column.typecode, [column[i] for i in indexes])
+            else:
+                table.columns[name] = array(column.typecode, [
+                    column[count * i + j]
+                    for i in indexes
+                    for j in range(count)
+                ])
+        return table
+
+    def filter(self, mask: Iterable[bool]) -> 'StaticPropTable':
+        """Produce a new table containing the props where the mask is true."""
+        return self.take([ind for ind, keep in enumerate(mask) if keep])
+
+    def update(self, indexes: Iterable[int], **values: Any) -> None:
+        """Set columns to the given values, for each of the specified props.
+
+        Model names and StaticPropFlags are converted as required.
+        """
+        indexes = list(indexes)
+        for name, value in values.items():
+            try:
+                typecode, count, default = SPROP_COLUMNS[name]
+            except KeyError:
+                raise ValueError('Unknown static prop column "{}"!'.format(name)) from None
+            if name == 'model':
+                value = self._model_index(value)
+            elif isinstance(value, StaticPropFlags):
+                value = value.value
+
+            conv = float if typecode == 'f' else int
+            column = self.columns[name]
+            if count == 1:
+                value = conv(value)
+                for ind in indexes:
+                    column[ind] = value
+            else:
+                value = array(typecode, map(conv, value))
+                if len(value) != count:
+                    raise ValueError('Expected {} values for "{}"!'.format(count, name))
+                for ind in indexes:
+                    column[count * ind:count * ind + count] = value
+
+    def model_skins(self) -> Dict[str, Set[int]]:
+        """Return the skins used by each model."""
+        skins = {}  # type: Dict[str, Set[int]]
+        for ind, skin in set(zip(self.columns['model'], self.columns['skin'])):
+            skins.setdefault(self.models[ind], set()).add(skin)
+        return skins
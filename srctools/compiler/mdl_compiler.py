@@ -5,9 +5,13 @@ We can then reuse already compiled versions.
 """
 import os
 import pickle
+import shutil
 import subprocess
 import tempfile
+import threading
 import random
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
 from typing import Dict, Callable, TypeVar, Tuple, Set, List, Optional, Hashable
 from pathlib import Path, PurePosixPath
 
@@ -26,13 +30,137 @@ class GenModel:
     def __init__(self, mdl_name: str, used: bool = False) -> None:
         self.name = mdl_name  # This is just the filename.
         self.used = used
+        # If compiling in the background, the compile job.
+        self.pending: Optional[Future] = None
 
     def __repr__(self) -> str:
         return f'<Model "{self.name}, used={self.used}>'
 
 
+class ModelCache:
+    """A cache of compiled models, which can be shared between maps.
+
+    Entries are keyed by a digest of everything used to generate the model,
+    so identical models are only compiled once. Models are hard-linked into
+    place where possible. Once the total size exceeds max_size bytes, the least
+    recently used models are removed. If zero, the size is unlimited.
+    """
+    def __init__(self, folder: Path, max_size: int = 0) -> None:
+        self.folder = Path(folder)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'<ModelCache "{self.folder}", max_size={self.max_size}>'
+
+    def _path(self, digest: str, ext: str) -> Path:
+        """Return the location of a file in the cache."""
+        return self.folder / digest[:2] / (digest + ext)
+
+    def fetch(self, digest: str, folder: Path, mdl_name: str, internal_name: str) -> bool:
+        """Copy a cached model into the folder, if present.
+
+        internal_name is the name stored inside the MDL file, which is
+        updated to match. This returns whether the model was found.
+        """
+        mdl_path = self._path(digest, '.mdl')
+        try:
+            with mdl_path.open('rb') as f:
+                mdl_data = bytearray(f.read())
+            # Mark as recently used.
+            os.utime(mdl_path)
+        except FileNotFoundError:
+            return False
+
+        # The model name is a 64-character field following the ID,
+        # version and checksum.
+        name = internal_name.encode('ascii')
+        if mdl_data[:4] == b'IDST' and len(name) < 64:
+            mdl_data[12:76] = name.ljust(64, b'\0')
+
+        os.makedirs(folder, exist_ok=True)
+        try:
+            for ext in MDL_EXTS:
+                if ext == '.mdl':
+                    continue
+                src = self._path(digest, ext)
+                dest = folder / (mdl_name + ext)
+                try:
+                    os.remove(dest)
+                except FileNotFoundError:
+                    pass
+                if not src.exists():
+                    # This component wasn't produced by the compile.
+                    continue
+                try:
+                    os.link(src, dest)
+                except OSError:
+                    # Different drive, or links aren't supported.
+                    shutil.copyfile(src, dest)
+        except FileNotFoundError:
+            # Removed while we were copying.
+            return False
+        with AtomicWriter(folder / (mdl_name + '.mdl'), is_bytes=True) as f:
+            f.write(mdl_data)
+        return True
+
+    def store(self, digest: str, folder: Path, mdl_name: str) -> None:
+        """Add a freshly compiled model to the cache."""
+        with self._lock:
+            os.makedirs(self.folder / digest[:2], exist_ok=True)
+            # Write the MDL last, so it only exists once the rest do.
+            for ext in sorted(MDL_EXTS, key=lambda ext: ext == '.mdl'):
+                src = folder / (mdl_name + ext)
+                if not src.exists():
+                    continue
+                temp = self._path(digest, ext + '.tmp')
+                shutil.copyfile(src, temp)
+                os.replace(temp, self._path(digest, ext))
+
+    def evict(self) -> None:
+        """Remove the least recently used models, until under the size limit."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            # Digest -> (last use time, total size)
+            entries: Dict[str, Tuple[float, int]] = {}
+            total = 0
+            for file in self.folder.glob('*/*'):
+                digest = file.name[:file.name.find('.')]
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                last_use, size = entries.get(digest, (0.0, 0))
+                if file.suffix == '.mdl':
+                    last_use = stat.st_mtime
+                entries[digest] = (last_use, size + stat.st_size)
+                total += stat.st_size
+
+            for digest, (last_use, size) in sorted(entries.items(), key=lambda t: t[1][0]):
+                if total <= self.max_size:
+                    break
+                LOGGER.info('Evicting cached model {}...', digest)
+                # Remove the MDL first, so it's no longer valid.
+                for ext in sorted(MDL_EXTS, key=lambda ext: ext != '.mdl'):
+                    try:
+                        os.remove(self._path(digest, ext))
+                    except FileNotFoundError:
+                        pass
+                total -= size
+
+
 class ModelCompiler:
-    """Manages the set of merged models that have been generated."""
+    """Manages the set of merged models that have been generated.
+
+    If jobs is greater than one, models are compiled in the background with
+    that many running at once. The name is still returned immediately,
+    and the compiled model is packed once it finishes. If zero, the CPU count
+    is used.
+
+    If a ModelCache is provided, models with a digest are looked up there
+    before compiling, and added after.
+    """
     def __init__(
         self,
         game: Game,
@@ -40,6 +168,8 @@ class ModelCompiler:
         pack: PackList,
         map_name: str,
         folder_name: str,
+        jobs: int = 1,
+        cache: Optional[ModelCache] = None,
     ) -> None:
         # The models already constructed.
         self._built_models: Dict[ModelKey, GenModel] = {}
@@ -56,8 +186,30 @@ class ModelCompiler:
             studiomdl_loc = game.bin_folder() / 'studiomdl.exe'
         self.studiomdl_loc = studiomdl_loc.resolve()
 
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache
+        self._studiomdl_digest = ''
+        if cache is not None:
+            # Cached models are invalid if StudioMDL changes.
+            try:
+                stat = self.studiomdl_loc.stat()
+            except FileNotFoundError:
+                pass
+            else:
+                self._studiomdl_digest = f'{self.studiomdl_loc}:{stat.st_size}:{stat.st_mtime_ns}'
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Models which are being compiled in the background.
+        self._pending: Set[GenModel] = set()
+
     @classmethod
-    def from_ctx(cls, ctx: Context, folder_name: str) -> 'ModelCompiler':
+    def from_ctx(
+        cls,
+        ctx: Context,
+        folder_name: str,
+        jobs: int = 1,
+        cache: Optional[ModelCache] = None,
+    ) -> 'ModelCompiler':
         """Convenience method to construct from the context's data."""
         return cls(
             ctx.game,
@@ -65,6 +217,8 @@ class ModelCompiler:
             ctx.pack,
             ctx.bsp_path.stem,
             folder_name,
+            jobs,
+            cache,
         )
 
     def use_count(self) -> int:
@@ -103,17 +257,22 @@ class ModelCompiler:
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
         """Write the constructed models to the cache file and remove unused models."""
+        if self._executor is not None:
+            if exc_type is not None:
+                for model in self._pending:
+                    model.pending.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
         if exc_type is not None or exc_val is not None:
             return False
-        data = []
-        used_mdls = set()
-        for key, mdl in self._built_models.items():
-            if mdl.used:
-                data.append((key, mdl.name))
-                used_mdls.add(mdl.name.casefold())
+        self.wait()
 
-        with AtomicWriter(self.model_folder_abs / 'manifest.bin', is_bytes=True) as f:
-            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        self._write_manifest(only_used=True)
+        used_mdls = {
+            mdl.name.casefold()
+            for mdl in self._built_models.values()
+            if mdl.used
+        }
 
         for mdl_file in self.model_folder_abs.glob('*'):
             if mdl_file.suffix not in {'.mdl', '.phy', '.vtx', '.vvd'}:
@@ -129,10 +288,61 @@ class ModelCompiler:
             except FileNotFoundError:
                 pass
 
+        if self.cache is not None:
+            self.cache.evict()
+
+    def _write_manifest(self, only_used: bool) -> None:
+        """Write out the compiled models to the manifest."""
+        data = [
+            (key, mdl.name)
+            for key, mdl in self._built_models.items()
+            if mdl.pending is None and (mdl.used or not only_used)
+        ]
+        with AtomicWriter(self.model_folder_abs / 'manifest.bin', is_bytes=True) as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+    def wait(self) -> None:
+        """Wait for all background compiles to finish, then pack them.
+
+        If any failed, the exception is raised.
+        """
+        self._finish_compiles(block=True)
+
+    def _finish_compiles(self, block: bool) -> None:
+        """Pack any background compiles that have completed.
+
+        If block is true, wait for all to complete.
+        """
+        while self._pending:
+            done, not_done = wait(
+                [mdl.pending for mdl in self._pending],
+                timeout=None if block else 0,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                return
+            for model in list(self._pending):
+                if model.pending not in done:
+                    continue
+                self._pending.discard(model)
+                future, model.pending = model.pending, None
+                try:
+                    future.result()
+                except BaseException:
+                    # Don't record this failed model.
+                    for key, mdl in list(self._built_models.items()):
+                        if mdl is model:
+                            del self._built_models[key]
+                    raise
+                self._pack_model(model)
+            # Record these now, so they can be reused if later ones fail.
+            self._write_manifest(only_used=False)
+
     def get_model(
         self,
         key: ModelKey,
         compile_func: Callable[[ModelKey, Path, str], None],
+        digest: Optional[str] = None,
     ) -> str:
         """Given a model key, either return the existing model, or compile it.
 
@@ -144,8 +354,13 @@ class ModelCompiler:
             * the name of the model to generate.
         It should create "mdl.qc" in the folder, and then
         StudioMDL will be called on the model to comile it.
+        If compiling in the background, this function is called in another
+        thread.
 
         If the model key is None, a new model will always be compiled.
+
+        If provided, the digest should be a stable hash of all the data used
+        to generate the model. This is used to look it up in the shared cache.
         """
         try:
             model = self._built_models[key]
@@ -159,40 +374,78 @@ class ModelCompiler:
                     break
 
             model = self._built_models[key] = GenModel(mdl_name)
+            if digest is not None and self.cache is not None:
+                digest = hashlib.sha256(
+                    f'{digest}|{self._studiomdl_digest}|{self.game.path}'.encode('utf8')
+                ).hexdigest()
+            else:
+                digest = None
 
-            with tempfile.TemporaryDirectory(prefix='mdl_compile') as folder:
-                path = Path(folder)
-                compile_func(key, path, f'{self.model_folder}{mdl_name}.mdl')
-                args = [
-                    str(self.studiomdl_loc),
-                    '-nop4',
-                    '-game', str(self.game.path),
-                    str(path / 'model.qc'),
-                ]
-                res = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-                LOGGER.debug(
-                    'Executing {}:\n{}',
-                    args,
-                    res.stdout.replace(b'\r\n', b'\n').decode('ascii', 'replace'),
+            if digest is not None and self.cache.fetch(
+                digest,
+                self.model_folder_abs,
+                mdl_name,
+                f'{self.model_folder}{mdl_name}.mdl',
+            ):
+                LOGGER.info('Using cached model for {}', mdl_name)
+            elif self.jobs > 1:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.jobs, 'mdl_compile')
+                model.pending = self._executor.submit(
+                    self._compile, key, compile_func, mdl_name, digest,
                 )
-                res.check_returncode()
+                self._pending.add(model)
+            else:
+                self._compile(key, compile_func, mdl_name, digest)
 
         if not model.used:
-            # Pack it in.
             model.used = True
-
-            full_model_path = self.model_folder_abs / model.name
-            LOGGER.debug('Packing model {}.mdl:', full_model_path)
-            for ext in MDL_EXTS:
-                try:
-                    with open(str(full_model_path.with_suffix(ext)), 'rb') as fb:
-                        self.pack.pack_file(
-                            'models/{}{}{}'.format(
-                                self.model_folder, model.name, ext,
-                            ),
-                            data=fb.read(),
-                        )
-                except FileNotFoundError:
-                    pass
+            if model.pending is None:
+                self._pack_model(model)
+        # Pack anything else which has finished.
+        self._finish_compiles(block=False)
 
         return f'models/{self.model_folder}{model.name}.mdl'
+
+    def _compile(
+        self,
+        key: ModelKey,
+        compile_func: Callable[[ModelKey, Path, str], None],
+        mdl_name: str,
+        digest: Optional[str],
+    ) -> None:
+        """Generate and compile a model, then add it to the cache."""
+        with tempfile.TemporaryDirectory(prefix='mdl_compile') as folder:
+            path = Path(folder)
+            compile_func(key, path, f'{self.model_folder}{mdl_name}.mdl')
+            args = [
+                str(self.studiomdl_loc),
+                '-nop4',
+                '-game', str(self.game.path),
+                str(path / 'model.qc'),
+            ]
+            res = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            LOGGER.debug(
+                'Executing {}:\n{}',
+                args,
+                res.stdout.replace(b'\r\n', b'\n').decode('ascii', 'replace'),
+            )
+            res.check_returncode()
+        if digest is not None:
+            self.cache.store(digest, self.model_folder_abs, mdl_name)
+
+    def _pack_model(self, model: GenModel) -> None:
+        """Pack a compiled model into the map."""
+        full_model_path = self.model_folder_abs / model.name
+        LOGGER.debug('Packing model {}.mdl:', full_model_path)
+        for ext in MDL_EXTS:
+            try:
+                with open(str(full_model_path.with_suffix(ext)), 'rb') as fb:
+                    self.pack.pack_file(
+                        'models/{}{}{}'.format(
+                            self.model_folder, model.name, ext,
+                        ),
+                        data=fb.read(),
+                    )
+            except FileNotFoundError:
+                pass
@@ -7,6 +7,10 @@ import os
 import random
 import colorsys
 import functools
+import hashlib
+import itertools
+import math
+import operator
 from collections import defaultdict
 from enum import Enum
 from pathlib import Path
@@ -22,10 +26,10 @@ from srctools.game import Game
 
 from srctools.logger import get_logger
 from srctools.packlist import PackList
-from srctools.bsp import BSP, StaticProp
+from srctools.bsp import BSP, StaticProp, StaticPropTable
 from srctools.mdl import Model
 from srctools.smd import Mesh
-from srctools.compiler.mdl_compiler import ModelCompiler
+from srctools.compiler.mdl_compiler import ModelCompiler, ModelCache
 
 
 LOGGER = get_logger(__name__)
@@ -59,6 +63,8 @@ $collisionmodel "physics.smd" {
 '''
 
 MAX_GROUP = 24  # Studiomdl does't allow more than this...
+# Change this if the generated models change, to invalidate cached models.
+CACHE_VERSION = 1
 
 # Cache of the SMD models we have already parsed, so we don't need
 # to parse them again. The second is the collision model.
@@ -79,17 +85,6 @@ def unify_mdl(path: str):
     return path
 
 
-def bsp_collision(point: Vec, planes: List[Tuple[Vec, Vec]]) -> bool:
-    """Check if the given position is inside a BSP node."""
-    for pos, norm in planes:
-        off = pos - point
-        # This is the actual distance, so we'll use a rather large
-        # "epsilon" to catch objects close to the edges.
-        if Vec.dot(off, norm) < -0.1:
-            return False
-    return True
-
-
 class CollType(Enum):
     """Collision types that static props can have."""
     NONE = 0  # No collision
@@ -168,9 +163,15 @@ def combine_group(
         ))
     # We don't want to build collisions if it's not used.
     has_coll = any(pos.solidity is not CollType.NONE for pos in prop_pos)
+    # The digest is only used to share models between maps.
+    if compiler.cache is not None:
+        digest = compute_digest(prop_pos, has_coll, lookup_model)  # type: Optional[str]
+    else:
+        digest = None
     mdl_name = compiler.get_model(
         (frozenset(prop_pos), has_coll),
         functools.partial(compile_func, lookup_model),
+        digest,
     )
 
     # Many of these we require to be the same, so we can read them
@@ -189,6 +190,35 @@ def combine_group(
     )
 
 
+def compute_digest(
+    prop_pos: Set[PropPos],
+    has_coll: bool,
+    lookup_model: Callable[[str], Tuple[QC, Model]],
+) -> str:
+    """Compute a stable hash of the data used to generate a merged model.
+
+    This is used to share models between maps.
+    """
+    digest = hashlib.sha256()
+    digest.update(f'{CACHE_VERSION}|{has_coll}\n'.encode('utf8'))
+    for pos in sorted(prop_pos, key=lambda pos: (pos.model, pos.skin, pos[:6], pos.scale)):
+        digest.update('{0}|{1}|{2}|{3}|{4}|{5}|{6}|{7}|{8}|{9}\n'.format(
+            *pos[:9], pos.solidity.value,
+        ).encode('utf8'))
+
+    for mdl_name in sorted({pos.model for pos in prop_pos}):
+        qc, mdl = lookup_model(mdl_name)
+        for path in [qc.path, qc.ref_smd, qc.phy_smd]:
+            if path is None:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = 0
+            digest.update(f'{path}|{mtime}|{qc.ref_scale}|{qc.phy_scale}\n'.encode('utf8'))
+    return digest.hexdigest()
+
+
 def compile_func(
     lookup_model: Callable[[str], Tuple[QC, Model]],
     mdl_key: Tuple[Set[PropPos], bool],
@@ -461,6 +491,92 @@ def parse_qc(qc_loc: Path, qc_path: Path) -> Optional[Tuple[
     )
 
 
+class _Volume(NamedTuple):
+    """A comp_propcombine_set box, prepared for quick point tests."""
+    mins: Tuple[float, float, float]
+    maxs: Tuple[float, float, float]
+    # Normal and distance - points are inside if dot(norm, point) <= dist.
+    planes: List[Tuple[float, float, float, float]]
+    set_ind: int  # The set this is part of.
+
+    @classmethod
+    def from_box(cls, origin: Vec, mat: Matrix, mins: Vec, maxs: Vec, set_ind: int) -> '_Volume':
+        """Compute the planes and bounds for a rotated box."""
+        mins, maxes = Vec.bbox(mins, maxs)
+        # Enlarge slightly to ensure it never has a zero area.
+        # Otherwise the normal could potentially be invalid.
+        mins -= 0.05
+        maxes += 0.05
+
+        # For each direction, compute the normal vector and distance. This
+        # is the actual distance, so we'll use a rather large "epsilon" to
+        # catch objects close to the edges.
+        planes = []
+        for offset, norm in zip([mins, maxes], (-1, 1)):
+            for axis in ('x', 'y', 'z'):
+                pos = origin + Vec.with_axes(axis, offset) @ mat
+                normal = Vec.with_axes(axis, norm) @ mat
+                planes.append((normal.x, normal.y, normal.z, Vec.dot(pos, normal) + 0.1))
+
+        # Then the world-space bounding box, for the tree.
+        bbox_min, bbox_max = Vec.bbox(
+            origin + Vec(x, y, z) @ mat
+            for x in (mins.x, maxes.x)
+            for y in (mins.y, maxes.y)
+            for z in (mins.z, maxes.z)
+        )
+        return cls(tuple(bbox_min - 0.1), tuple(bbox_max + 0.1), planes, set_ind)
+
+
+class VolumeTree:
+    """A bounding volume hierarchy over propcombine set volumes.
+
+    This allows quickly finding which volumes a point is inside.
+    """
+    LEAF_SIZE = 4
+
+    def __init__(self, volumes: List[_Volume]) -> None:
+        if volumes:
+            self.mins = tuple(min(vol.mins[i] for vol in volumes) for i in range(3))
+            self.maxs = tuple(max(vol.maxs[i] for vol in volumes) for i in range(3))
+        else:
+            self.mins = self.maxs = (0.0, 0.0, 0.0)
+        self.children = []  # type: List[VolumeTree]
+        self.volumes = volumes
+
+        if len(volumes) > self.LEAF_SIZE:
+            # Split along the longest axis, at the median.
+            axis = max(range(3), key=lambda i: self.maxs[i] - self.mins[i])
+            volumes = sorted(volumes, key=lambda vol: vol.mins[axis] + vol.maxs[axis])
+            half = len(volumes) // 2
+            self.children = [VolumeTree(volumes[:half]), VolumeTree(volumes[half:])]
+            self.volumes = []
+
+    def find(self, x: float, y: float, z: float) -> Iterator[int]:
+        """Yield the set index of each volume containing this point."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not (
+                node.mins[0] <= x <= node.maxs[0] and
+                node.mins[1] <= y <= node.maxs[1] and
+                node.mins[2] <= z <= node.maxs[2]
+            ):
+                continue
+            stack.extend(node.children)
+            for vol in node.volumes:
+                if (
+                    vol.mins[0] <= x <= vol.maxs[0] and
+                    vol.mins[1] <= y <= vol.maxs[1] and
+                    vol.mins[2] <= z <= vol.maxs[2] and
+                    all(
+                        nx * x + ny * y + nz * z <= dist
+                        for nx, ny, nz, dist in vol.planes
+                    )
+                ):
+                    yield vol.set_ind
+
+
 def group_props_ent(
     prop_groups: Dict[Optional[tuple], List[StaticProp]],
     rejected: List[StaticProp],
@@ -469,15 +585,16 @@ def group_props_ent(
     min_cluster: int,
 ) -> Iterator[List[StaticProp]]:
     """Given the groups of props, merge props according to the provided ents."""
-    # (name, skinset) -> list of boxes, constructed as 6 (pos, norm) tuples.
-    combine_sets = defaultdict(list)  # type: Dict[Tuple[str, FrozenSet[str]], List[List[Tuple[Vec, Vec]]]]
+    # (name, skinset) -> index, used to identify each set.
+    set_indexes = {}  # type: Dict[Tuple[str, FrozenSet[str]], int]
+    set_skins = []  # type: List[FrozenSet[str]]
+    volumes = []  # type: List[_Volume]
 
     empty_fs = frozenset('')
 
     for ent in bbox_ents:
         # Either provided name, or unique value.
         name = ent['name'] or format(int(ent['hammerid']), 'X')
-        origin = Vec.from_str(ent['origin'])
 
         skinset = empty_fs
 
@@ -491,27 +608,21 @@ def group_props_ent(
                     mdl.iter_textures([conv_int(ent['skin'])])
                 })
 
-        # Compute 6 planes to use for collision detection.
-        mat = Matrix.from_angle(Angle.from_str(ent['angles']))
-        mins, maxes = Vec.bbox(
+        try:
+            set_ind = set_indexes[name, skinset]
+        except KeyError:
+            set_ind = set_indexes[name, skinset] = len(set_skins)
+            set_skins.append(skinset)
+
+        volumes.append(_Volume.from_box(
+            Vec.from_str(ent['origin']),
+            Matrix.from_angle(Angle.from_str(ent['angles'])),
             Vec.from_str(ent['mins']),
             Vec.from_str(ent['maxs']),
-        )
-        # Enlarge slightly to ensure it never has a zero area.
-        # Otherwise the normal could potentially be invalid.
-        mins -= 0.05
-        maxes += 0.05
+            set_ind,
+        ))
 
-        # For each direction, compute a position on the plane and
-        # the normal vector.
-        combine_sets[name, skinset].append([
-            (
-                origin + Vec.with_axes(axis, offset) @ mat,
-                Vec.with_axes(axis, norm) @ mat,
-            )
-            for offset, norm in zip([mins, maxes], (-1, 1))
-            for axis in ('x', 'y', 'z')
-        ])
+    tree = VolumeTree(volumes)
 
     # Each of these groups cannot be merged with other ones.
     for group_key, group in prop_groups.items():
@@ -525,31 +636,34 @@ def group_props_ent(
             group.clear()
             continue
 
-        for (name, skinset), boxes in combine_sets.items():
-            if skinset and skinset != group_skinset:
-                continue  # No match
-            found = defaultdict(list)  # type: Dict[int, List[StaticProp]]
-            for prop in list(group):
-                for box in boxes:
-                    if bsp_collision(prop.origin, box):
-                        # Group by this box object's identity.
-                        # That's a cheap way to keep each propcombine set
-                        # grouped uniquely.
-                        found[id(boxes)].append(prop)
-                        break
-
-            for subgroup in found.values():
-                actual = set(subgroup).intersection(group)
-                if len(actual) >= min_cluster:
-                    yield list(actual)
-                    for prop in actual:
-                        group.remove(prop)
+        # Find the sets each prop could be part of, in the order sets
+        # are checked.
+        found = defaultdict(list)  # type: Dict[int, List[StaticProp]]
+        for prop in group:
+            for set_ind in set(tree.find(*prop.origin)):
+                skinset = set_skins[set_ind]
+                if not skinset or skinset == group_skinset:
+                    found[set_ind].append(prop)
+
+        remaining = set(group)
+        for set_ind in sorted(found):
+            actual = [prop for prop in found[set_ind] if prop in remaining]
+            if len(actual) >= min_cluster:
+                yield actual
+                remaining.difference_update(actual)
+        group[:] = [prop for prop in group if prop in remaining]
 
     # Finally, reject all the ones not in a bbox.
     for group in prop_groups.values():
         rejected.extend(group)
 
 
+def _grid_cell(pos: Tuple[float, float, float], cell_size: float) -> Tuple[int, int, int]:
+    """Compute the grid cell a position is in."""
+    x, y, z = pos
+    return math.floor(x / cell_size), math.floor(y / cell_size), math.floor(z / cell_size)
+
+
 def group_props_auto(
     prop_groups: Dict[Optional[tuple], List[StaticProp]],
     rejected: List[StaticProp],
@@ -561,6 +675,9 @@ def group_props_auto(
 
     dist_sq = dist * dist
     large_dist_sq = 4 * dist_sq
+    # Props are bucketed into a grid with cells as large as the search
+    # radius, so only the neighbouring cells need to be checked.
+    cell_size = 2 * dist
 
     for group in prop_groups.values():
         # No point merging single/empty groups.
@@ -568,29 +685,47 @@ def group_props_auto(
             rejected.extend(group)
             continue
 
-        todo = set(group)
-        while todo:
-            center = todo.pop()
-            cluster = {center}
-
-            for prop in todo:
-                if (center.origin - prop.origin).mag_sq() <= large_dist_sq:
-                    cluster.add(prop)
-                    if len(cluster) > MAX_GROUP:
-                        # Limit the number of maximum props that can be used.
-                        break
+        positions = {prop: tuple(prop.origin) for prop in group}
+        grid = defaultdict(set)  # type: Dict[Tuple[int, int, int], Set[StaticProp]]
+        for prop, pos in positions.items():
+            grid[_grid_cell(pos, cell_size)].add(prop)
+
+        for center in group:
+            center_x, center_y, center_z = center_pos = positions[center]
+            cell_x, cell_y, cell_z = cell = _grid_cell(center_pos, cell_size)
+            if center not in grid[cell]:
+                continue  # Already used.
+            grid[cell].discard(center)
+
+            nearby = []  # type: List[Tuple[float, StaticProp]]
+            for neighbour in itertools.product(
+                (cell_x - 1, cell_x, cell_x + 1),
+                (cell_y - 1, cell_y, cell_y + 1),
+                (cell_z - 1, cell_z, cell_z + 1),
+            ):
+                for prop in grid.get(neighbour, ()):
+                    x, y, z = positions[prop]
+                    off = (x - center_x) ** 2 + (y - center_y) ** 2 + (z - center_z) ** 2
+                    if off <= large_dist_sq:
+                        nearby.append((off, prop))
+
+            # Limit the number of maximum props that can be used,
+            # preferring the closest.
+            nearby.sort(key=operator.itemgetter(0))
+            cluster = [center] + [prop for off, prop in nearby[:MAX_GROUP]]
 
             if len(cluster) < min_cluster:
                 rejected.append(center)
                 continue
 
             bbox_min, bbox_max = Vec.bbox(prop.origin for prop in cluster)
-            center_pos = (bbox_min + bbox_max) / 2
+            mid_x, mid_y, mid_z = (bbox_min + bbox_max) / 2
 
             cluster_list = []
 
             for prop in cluster:
-                prop_off = (center_pos - prop.origin).mag_sq()
+                x, y, z = positions[prop]
+                prop_off = (mid_x - x) ** 2 + (mid_y - y) ** 2 + (mid_z - z) ** 2
                 if prop_off <= dist_sq:
                     cluster_list.append((prop, prop_off))
 
@@ -599,7 +734,11 @@ def group_props_auto(
                 prop for prop, off in
                 cluster_list[:MAX_GROUP]
             ]
-            todo.difference_update(selected_props)
+            for prop in selected_props:
+                grid[_grid_cell(positions[prop], cell_size)].discard(prop)
+            if center not in selected_props:
+                # Don't lose this prop if it ended up outside the cluster.
+                rejected.append(center)
 
             if len(selected_props) >= min_cluster:
                 yield selected_props
@@ -617,8 +756,15 @@ def combine(
     auto_range: float=0,
     min_cluster: int=2,
     debug_tint: bool=False,
+    compile_jobs: int=1,
+    model_cache: ModelCache=None,
 ) -> None:
-    """Combine props in this map."""
+    """Combine props in this map.
+
+    compile_jobs is the number of models to compile at once, or zero to use
+    the CPU count. If provided, model_cache is used to reuse models compiled
+    for other maps.
+    """
 
     # First parse out the bbox ents, so they are always removed.
     bbox_ents = list(bsp_ents.by_class['comp_propcombine_set'])
@@ -668,13 +814,20 @@ def combine(
             model = mdl_map[key] = Model(pack.fsys, mdl_file)
         return qc, model
 
-    def get_grouping_key(prop: StaticProp) -> Optional[tuple]:
-        """Compute a grouping key for this prop.
+    @functools.lru_cache(maxsize=None)
+    def get_grouping_key(
+        mdl_name: str,
+        skin: int,
+        flags: int,
+        renderfx: int,
+        tint: Tuple[int, int, int],
+    ) -> Optional[tuple]:
+        """Compute a grouping key for props with these values.
 
         Only props with matching key can be possibly combined.
         If None it cannot be combined.
         """
-        qc, model = get_model(prop.model)
+        qc, model = get_model(mdl_name)
 
         if model is None or qc is None:
             return None
@@ -684,18 +837,16 @@ def combine(
             frozenset({
                 tex.casefold().replace('\\', '/')
                 for tex in
-                model.iter_textures([prop.skin])
+                model.iter_textures([skin])
             }),
             model.flags.value,
-            prop.flags.value,
+            flags,
             model.contents,
             model.surfaceprop,
-            prop.renderfx,
-            *prop.tint,
+            renderfx,
+            *tint,
         )
 
-    prop_count = 0
-
     # First, construct groups of props that can possibly be combined.
     prop_groups = defaultdict(list)  # type: Dict[Optional[tuple], List[StaticProp]]
 
@@ -723,13 +874,29 @@ def combine(
         LOGGER.info('No propcombine groups provided.')
         return
 
-    for prop in bsp.static_props():
-        prop_groups[get_grouping_key(prop)].append(prop)
-        prop_count += 1
+    prop_table = bsp.static_prop_table()
+    prop_count = len(prop_table)
+    columns = prop_table.columns
+    tints = columns['tint']
+    group_keys = [
+        get_grouping_key(prop_table.models[mdl_ind], skin, flags, renderfx, tint)
+        for mdl_ind, skin, flags, renderfx, tint in zip(
+            columns['model'],
+            columns['skin'],
+            columns['flags'],
+            columns['renderfx'],
+            zip(tints[0::3], tints[1::3], tints[2::3]),
+        )
+    ]
+
+    # Only construct objects for props which could be merged.
+    for ind, key in enumerate(group_keys):
+        if key is not None:
+            prop_groups[key].append(prop_table[ind])
 
     # These are models we cannot merge no matter what -
-    # no source files etc.
-    final_props.extend(prop_groups.pop(None, []))
+    # no source files etc. They can be left in the table as-is.
+    final_table = prop_table.filter([key is None for key in group_keys])
 
     with ModelCompiler(
         game,
@@ -737,6 +904,8 @@ def combine(
         pack,
         map_name,
         'propcombine',
+        compile_jobs,
+        model_cache,
     ) as compiler:
         for group in grouper:
             grouped_prop = combine_group(compiler, group, get_model)
@@ -745,10 +914,12 @@ def combine(
                 grouped_prop.tint = round(Vec(*colorsys.hsv_to_rgb(random.random(), 1, 1)) * 255)
             final_props.append(grouped_prop)
 
+    final_table.extend(StaticPropTable.from_props(final_props, prop_table.version))
+
     LOGGER.info(
         'Combined {} props to {} props using {} groups.',
         prop_count,
-        len(final_props),
+        len(final_table),
         compiler.model_folder,
     )
     # If present, delete old cache file. We'll have cleaned up the models.
@@ -757,4 +928,4 @@ def combine(
     except FileNotFoundError:
         pass
 
-    bsp.write_static_props(final_props)
+    bsp.write_static_prop_table(final_table)
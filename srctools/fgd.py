@@ -4,15 +4,18 @@ from copy import deepcopy
 from collections import defaultdict
 from enum import Enum
 from pathlib import PurePosixPath
-from struct import Struct
+from struct import Struct, error as StructError
+import hashlib
 import io
 import math
+import os
+import threading
 
 from typing import (
     Optional, Union, overload,
     TypeVar, Callable, Type,
     Dict, Tuple, List, Set, FrozenSet,
-    Mapping, Iterator, Iterable, Collection,
+    Mapping, MutableMapping, Iterator, Iterable, Collection,
     BinaryIO, TextIO,
     Container,
     IO,
@@ -54,7 +57,8 @@ def _read_struct(fmt: Struct, file: BinaryIO) -> tuple:
     return fmt.unpack(file.read(fmt.size))
 
 # Version number for the format.
-BIN_FORMAT_VERSION = 5
+# Version 6 adds an index of entities, allowing them to be decoded lazily.
+BIN_FORMAT_VERSION = 6
 # Cached result of FGD.engine_dbase().
 _ENGINE_FGD: Optional['FGD'] = None
 
@@ -517,12 +521,21 @@ class BinStrDict:
         This returns a function which reads
         a string from a file at the current point. 
         """
+        return BinStrDict.make_lookup(BinStrDict.read_strings(file), file)
+
+    @staticmethod
+    def read_strings(file: BinaryIO) -> List[str]:
+        """Read the list of strings in the dictionary."""
         [length] = _read_struct(_fmt_32bit, file)
         inv_list = [''] * length
         for ind in range(length):
             [str_len] = _fmt_16bit.unpack(file.read(2))
             inv_list[ind] = file.read(str_len).decode('utf8')
+        return inv_list
 
+    @staticmethod
+    def make_lookup(inv_list: List[str], file: BinaryIO) -> Callable[[], str]:
+        """Return a function which reads strings from the file."""
         def lookup() -> str:
             """Read the index from the file, and return the string it matches."""
             [index] = _fmt_16bit.unpack(file.read(2))
@@ -745,7 +758,7 @@ class KeyValues:
             self.disp_name,
             self.default,
             self.desc,
-            self.val_list.copy() if self.val_list else None,
+            None if self.val_list is None else self.val_list.copy(),
             self.readonly,
             self.reportable,
         )
@@ -759,7 +772,7 @@ class KeyValues:
             self.disp_name,
             self.default,
             self.desc,
-            self.val_list.copy() if self.val_list else None,
+            None if self.val_list is None else self.val_list.copy(),
             self.readonly,
             self.reportable,
         )
@@ -1496,6 +1509,7 @@ class EntityDef:
     def __deepcopy__(self, memodict: dict) -> 'EntityDef':
         """Handle copying ourselves, to eliminate lookups when not required."""
         copy = EntityDef.__new__(EntityDef)
+        memodict[id(self)] = copy
         copy.type = self.type
         copy.classname = self.classname
         copy.kv_order = self.kv_order.copy()
@@ -1507,14 +1521,14 @@ class EntityDef:
         for attr in ['keyvalues', 'inputs', 'outputs']:
             coll = {}
             setattr(copy, attr, coll)
-            for key, tags_map in getattr(copy, attr).items():
+            for key, tags_map in getattr(self, attr).items():
                 coll[key] = {
                     key: value.copy()
                     for key, value in tags_map.items()
                 }
-        copy.kv = _EntityView(self, 'keyvalues', 'kv')
-        copy.inp = _EntityView(self, 'inputs', 'inp')
-        copy.out = _EntityView(self, 'outputs', 'out')
+        copy.kv = _EntityView(copy, 'keyvalues', 'kv')
+        copy.inp = _EntityView(copy, 'inputs', 'inp')
+        copy.out = _EntityView(copy, 'outputs', 'out')
         return copy
 
     def __getstate__(self) -> tuple:
@@ -1756,6 +1770,136 @@ class EntityDef:
         return ent
 
 
+class _CopyOnAccess(MutableMapping[str, EntityDef]):
+    """A copy-on-write view of the entities in another FGD.
+
+    Entities are only copied the first time they are retrieved, so
+    the shared originals can't be modified. All copies share a memo,
+    so bases are copied along with an entity and are consistent.
+    """
+    def __init__(self, original: Dict[str, EntityDef]) -> None:
+        self._original = original
+        self._copies = {}  # type: Dict[str, EntityDef]
+        self._removed = set()  # type: Set[str]
+        self._memo = {}  # type: Dict[int, object]
+
+    def __getitem__(self, classname: str) -> EntityDef:
+        try:
+            return self._copies[classname]
+        except KeyError:
+            pass
+        if classname in self._removed:
+            raise KeyError(classname)
+        ent = self._copies[classname] = deepcopy(self._original[classname], self._memo)
+        return ent
+
+    def __setitem__(self, classname: str, ent: EntityDef) -> None:
+        self._copies[classname] = ent
+        self._removed.discard(classname)
+
+    def __delitem__(self, classname: str) -> None:
+        if classname not in self:
+            raise KeyError(classname)
+        self._copies.pop(classname, None)
+        self._removed.add(classname)
+
+    def __contains__(self, classname: object) -> bool:
+        return classname in self._copies or (
+            classname in self._original and classname not in self._removed
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        for classname in self._original:
+            if classname not in self._removed:
+                yield classname
+        for classname in self._copies:
+            if classname not in self._original:
+                yield classname
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class _LazyEntities(MutableMapping[str, EntityDef]):
+    """Entities from the binary format, decoded when first accessed.
+
+    The data is kept in a memoryview, and only the slice for an entity
+    is copied to decode it.
+    """
+    def __init__(
+        self,
+        index: Dict[str, int],
+        data: memoryview,
+        strings: List[str],
+    ) -> None:
+        self._index = index
+        self._decoded = {}  # type: Dict[str, EntityDef]
+        self._data = data
+        self._strings = strings
+        # Each entity ends where the next begins.
+        offsets = sorted(index.values())
+        self._ends = dict(zip(offsets, offsets[1:] + [len(data)]))
+        # Decoding also decodes bases, so only one can happen at a time.
+        self._lock = threading.RLock()
+
+    def __getitem__(self, classname: str) -> EntityDef:
+        try:
+            return self._decoded[classname]
+        except KeyError:
+            pass
+        with self._lock:
+            # May have been decoded while we were waiting.
+            try:
+                return self._decoded[classname]
+            except KeyError:
+                pass
+            start = self._index[classname]
+            file = io.BytesIO(self._data[start:self._ends[start]])
+            ent = EntityDef.unserialise(file, BinStrDict.make_lookup(self._strings, file))
+            # Store before decoding bases, in case they loop.
+            self._decoded[classname] = ent
+            base_names = ent.bases
+            ent.bases = []
+            for base in base_names:
+                try:
+                    ent.bases.append(self[base.casefold()])  # type: ignore
+                except KeyError:
+                    raise ValueError(
+                        'Unknown base ({}) for {}'.format(base, ent.classname)
+                    ) from None
+            return ent
+
+    def __setitem__(self, classname: str, ent: EntityDef) -> None:
+        with self._lock:
+            self._decoded[classname] = ent
+
+    def __delitem__(self, classname: str) -> None:
+        with self._lock:
+            if classname not in self:
+                raise KeyError(classname)
+            self._decoded.pop(classname, None)
+            self._index.pop(classname, None)
+
+    def __contains__(self, classname: object) -> bool:
+        return classname in self._decoded or classname in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._index
+        for classname in list(self._decoded):
+            if classname not in self._index:
+                yield classname
+
+    def __len__(self) -> int:
+        return len(self._index) + sum(
+            1 for classname in self._decoded
+            if classname not in self._index
+        )
+
+    def __reduce__(self) -> tuple:
+        """Pickle as a regular dict, decoding everything."""
+        return dict, (dict(self), )
+
+
 class FGD:
     """A FGD set for a game. May be composed of several files."""
     def __init__(self) -> None:
@@ -2130,24 +2274,63 @@ class FGD:
                     raise tokeniser.error('Bad keyword {!r}', token_value)
 
     @classmethod
-    def engine_dbase(cls) -> 'FGD':
+    def engine_dbase(cls, cache: Union[str, 'os.PathLike[str]', None]=None) -> 'FGD':
         """Load and return a database of entity keyvalues and I/O.
 
         This can be used to identify the kind of keys present on an entity.
+        The database is only loaded once - each call returns a copy-on-write
+        view, so it can be freely modified.
+        If cache is provided, it is a filename used to store the decompressed
+        database, so later runs can skip decompression.
         """
         # It's pretty expensive to parse, so keep the original privately,
-        # returning a deep-copy.
+        # returning a view which copies entities when used.
         global _ENGINE_FGD
         if _ENGINE_FGD is None:
+            _ENGINE_FGD = cls._load_engine_dbase(cache)
+
+        fgd = FGD()
+        fgd.entities = _CopyOnAccess(_ENGINE_FGD.entities)  # type: ignore
+        fgd.map_size_min = _ENGINE_FGD.map_size_min
+        fgd.map_size_max = _ENGINE_FGD.map_size_max
+        fgd.mat_exclusions = _ENGINE_FGD.mat_exclusions.copy()
+        fgd.auto_visgroups = deepcopy(_ENGINE_FGD.auto_visgroups)
+        return fgd
+
+    @classmethod
+    def _load_engine_dbase(cls, cache: Union[str, 'os.PathLike[str]', None]) -> 'FGD':
+        """Read the database from our package, or the cache if valid.
+
+        The cache consists of the SHA-1 of the compressed data, then the
+        decompressed data.
+        """
+        try:
+            from importlib.resources import read_binary
+        except ImportError:
+            # Backport module for before Python 3.7
+            from importlib_resources import read_binary
+        import lzma
+
+        comp_data = read_binary(srctools, 'fgd.lzma')
+        digest = hashlib.sha1(comp_data).digest()
+        if cache is not None:
+            try:
+                with open(cache, 'rb') as f:
+                    if f.read(len(digest)) == digest:
+                        return cls.unserialise(f)
+            except (OSError, ValueError, TypeError, StructError):
+                # Missing, or invalid. Just rebuild.
+                pass
+
+        data = lzma.decompress(comp_data)
+        if cache is not None:
             try:
-                from importlib.resources import open_binary
-            except ImportError:
-                # Backport module for before Python 3.7
-                from importlib_resources import open_binary
-            from lzma import LZMAFile
-            with open_binary(srctools, 'fgd.lzma') as comp, LZMAFile(comp) as f:
-                return cls.unserialise(f)
-        return deepcopy(_ENGINE_FGD)
+                with srctools.AtomicWriter(cache, is_bytes=True) as f:
+                    f.write(digest)
+                    f.write(data)
+            except OSError:
+                pass  # Not important if this fails.
+        return cls.unserialise(io.BytesIO(data))
 
     def __getitem__(self, classname: str) -> EntityDef:
         """Lookup entities by classname."""
@@ -2210,12 +2393,20 @@ class FGD:
         ))
         
         ent_data = io.BytesIO()
-        for ent in self.entities.values():
+        index = io.BytesIO()
+        for classname, ent in self.entities.items():
+            # Index each entity by its position, so it can be found
+            # without decoding the others.
+            encoded = classname.encode('utf8')
+            index.write(_fmt_8bit.pack(len(encoded)))
+            index.write(encoded)
+            index.write(_fmt_32bit.pack(ent_data.tell()))
             ent.serialise(ent_data, dictionary)
             
-        # The final file is the header, dictionary data, and all the entities 
-        # one after each other.
+        # The final file is the header, dictionary data, the index, and all
+        # the entities one after each other.
         dictionary.serialise(file)
+        file.write(index.getvalue())
         file.write(ent_data.getvalue())
         # print('Dict size: ', format(dictionary.cur_index / (1 << 16), '%'))
 
@@ -2224,6 +2415,7 @@ class FGD:
         """Unpack data from FGD.serialise() to return the original data.
         
         Help descriptions are not preserved, and are set to <BINARY>.
+        Entities are only decoded when they are first accessed.
         """
         
         if file.read(3) != b'FGD':
@@ -2238,16 +2430,31 @@ class FGD:
             ent_count,
         ] = _read_struct(_fmt_header, file)
         
-        if format_version != BIN_FORMAT_VERSION:
+        if format_version == 5:
+            # No index, decode everything now.
+            from_dict = BinStrDict.unserialise(file)
+
+            # Now there's ent_count entities after each other.
+            for _ in range(ent_count):
+                ent = EntityDef.unserialise(file, from_dict)
+                fgd.entities[ent.classname.casefold()] = ent
+
+            fgd.apply_bases()
+            return fgd
+        elif format_version != BIN_FORMAT_VERSION:
             raise TypeError('Unknown format version "{}"!'.format(format_version))
-            
-        from_dict = BinStrDict.unserialise(file)
 
-        # Now there's ent_count entities after each other.
+        strings = BinStrDict.read_strings(file)
+        index = {}  # type: Dict[str, int]
         for _ in range(ent_count):
-            ent = EntityDef.unserialise(file, from_dict)
-            fgd.entities[ent.classname.casefold()] = ent
-
-        fgd.apply_bases()
+            [name_len] = _read_struct(_fmt_8bit, file)
+            classname = file.read(name_len).decode('utf8')
+            [index[classname]] = _read_struct(_fmt_32bit, file)
 
+        if isinstance(file, io.BytesIO):
+            # If unmodified, this shares the original bytes object.
+            data = memoryview(file.getvalue())[file.tell():]
+        else:
+            data = memoryview(file.read())
+        fgd.entities = _LazyEntities(index, data, strings)  # type: ignore
         return fgd
@@ -4,9 +4,12 @@ This allows accessing raw files, zips and VPKs in the same way.
 Files are case-insensitive, and both slashes are converted to '/'.
 """
 from zipfile import ZipFile, ZipInfo
+from struct import Struct, error as struct_error
 import io
 import os
+import threading
 
+import srctools
 from srctools.vpk import VPK, FileInfo as VPKFile
 from srctools.property_parser import Property
 
@@ -19,7 +22,7 @@ from typing import (
 
 
 __all__ = [
-    'File', 'FileSystem', 'get_filesystem',
+    'File', 'FileSystem', 'get_filesystem', 'PropCache',
 
     'RawFileSystem', 'VPKFileSystem', 'ZipFileSystem',
     'VirtualFileSystem', 'FileSystemChain',
@@ -32,6 +35,12 @@ ChildSysT = TypeVar('ChildSysT', bound='FileSystem')
 _SysRefT = TypeVar('_SysRefT')  # the type of FileSystem._ref
 _FileDataT = TypeVar('_FileDataT')  # the type of File._data
 
+# PropCache files - magic, version, entry count.
+_fmt_prop_cache_header = Struct('<4sBI')
+# Per entry - string lengths, allow_escapes, cache key, data length.
+_fmt_prop_cache_entry = Struct('<HHHH?qI')
+PROP_CACHE_VERSION = 1
+
 
 def get_filesystem(path: str) -> 'FileSystem':
     """Return a filesystem given a path.
@@ -99,31 +108,52 @@ class FileSystem(Generic[_SysRefT, _FileDataT]):
         self.path = os.fspath(path)
         self._ref: Optional[_SysRefT] = None
         self._ref_count = 0
+        # If set, read_prop() uses this to skip parsing unchanged files.
+        self.prop_cache: Optional[PropCache] = None
+
+    # Guards reference counts, so systems can be shared between threads.
+    # Chains open their children, so this needs to be reentrant.
+    _ref_lock = threading.RLock()
 
     def open_ref(self) -> None:
         """Lock open a reference to this system."""
-        self._ref_count += 1
-        if self._ref is None:
-            self._create_ref()
+        with self._ref_lock:
+            self._ref_count += 1
+            if self._ref is None:
+                self._create_ref()
 
     def close_ref(self) -> None:
         """Reverse self.open_ref() - must be done in pairs."""
-        self._ref_count -= 1
-        if self._ref_count < 0:
-            raise ValueError('Closed too many times!')
-        if self._ref_count == 0 and self._ref is not None:
-            self._delete_ref()
-
-    def read_prop(self, path: str, encoding='utf8') -> Property:
+        with self._ref_lock:
+            self._ref_count -= 1
+            if self._ref_count < 0:
+                raise ValueError('Closed too many times!')
+            if self._ref_count == 0 and self._ref is not None:
+                self._delete_ref()
+
+    def read_prop(
+        self,
+        path: Union[str, File],
+        encoding='utf8',
+        *,
+        allow_escapes: bool=True,
+    ) -> Property:
         """Read a Property file from the filesystem.
 
-        This handles opening and closing files.
+        This handles opening and closing files. If prop_cache is set,
+        unchanged files are read from there instead of being parsed.
         """
-        with self, self.open_str(path, encoding) as file:
-            return Property.parse(
-                file,
-                self.path + ':' + path,
-            )
+        with self:
+            if self.prop_cache is not None:
+                if not isinstance(path, File):
+                    path = self._get_file(path)
+                return self.prop_cache.read(path, encoding, allow_escapes)
+            with self.open_str(path, encoding) as file:
+                return Property.parse(
+                    file,
+                    self.path + ':' + (path.path if isinstance(path, File) else path),
+                    allow_escapes=allow_escapes,
+                )
 
     def _check_open(self) -> None:
         """Ensure self._ref is valid."""
@@ -184,6 +214,15 @@ class FileSystem(Generic[_SysRefT, _FileDataT]):
         """Yield files in a folder."""
         raise NotImplementedError
 
+    def _iter_names(self, folder: str) -> Iterator[str]:
+        """Yield the paths of files in a folder.
+
+        This is used to index chains, systems can override this to avoid
+        looking up each file.
+        """
+        for file in self.walk_folder(folder):
+            yield file.path
+
     def _create_ref(self) -> None:
         """Create the _ref object."""
         raise NotImplementedError
@@ -214,12 +253,141 @@ class FileSystem(Generic[_SysRefT, _FileDataT]):
         return -1
 
 
+class PropCache:
+    """Caches parsed keyvalues files, for FileSystem.read_prop().
+
+    Trees are stored in the binary format from Property.export_binary(),
+    along with the cache key of the file. Unchanged files are then read
+    from that instead of being parsed again. The cache can be saved to
+    disk, to reuse it later.
+    """
+    def __init__(self) -> None:
+        # (system type, system path, folded filename, encoding, allow_escapes)
+        # -> (cache key, tree).
+        self._entries: Dict[Tuple[str, str, str, str, bool], Tuple[int, bytes]] = {}
+        # Entries read or added since this was created.
+        self._used: Set[Tuple[str, str, str, str, bool]] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def read(self, file: File, encoding: str='utf8', allow_escapes: bool=True) -> Property:
+        """Parse a keyvalues file, or fetch it from the cache."""
+        # Files in chains are identified by the original system.
+        orig_file = file
+        while isinstance(orig_file.sys, FileSystemChain):
+            orig_file = orig_file.sys._get_data(orig_file)
+        key = (
+            type(orig_file.sys).__name__,
+            orig_file.sys.path,
+            orig_file.path.replace('\\', '/').casefold(),
+            encoding,
+            allow_escapes,
+        )
+        cache_key = file.cache_key()
+        if cache_key != -1:
+            self._used.add(key)
+            try:
+                old_key, data = self._entries[key]
+            except KeyError:
+                pass
+            else:
+                if old_key == cache_key:
+                    return Property.parse_binary(io.BytesIO(data))
+
+        with file.open_str(encoding) as f:
+            props = Property.parse(
+                f,
+                orig_file.sys.path + ':' + orig_file.path,
+                allow_escapes=allow_escapes,
+            )
+        if cache_key != -1:
+            buf = io.BytesIO()
+            props.export_binary(buf)
+            self._entries[key] = (cache_key, buf.getvalue())
+        return props
+
+    def load(self, filename: Union[str, os.PathLike]) -> None:
+        """Add the entries from a cache file written by save().
+
+        This raises ValueError if the file is invalid.
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        try:
+            magic, version, count = _fmt_prop_cache_header.unpack_from(data, 0)
+            if magic != b'SPRC' or version != PROP_CACHE_VERSION:
+                raise ValueError('Incompatible keyvalues cache!')
+            off = _fmt_prop_cache_header.size
+            entries = {}
+            for _ in range(count):
+                (
+                    type_len, path_len, name_len, enc_len,
+                    allow_escapes, cache_key, data_len,
+                ) = _fmt_prop_cache_entry.unpack_from(data, off)
+                off += _fmt_prop_cache_entry.size
+                strings = []
+                for size in [type_len, path_len, name_len, enc_len]:
+                    strings.append(data[off:off + size].decode('utf8'))
+                    off += size
+                sys_type, sys_path, name, encoding = strings
+                entries[sys_type, sys_path, name, encoding, allow_escapes] = (
+                    cache_key,
+                    data[off:off + data_len],
+                )
+                off += data_len
+        except (UnicodeDecodeError, struct_error) as exc:
+            raise ValueError('Corrupt keyvalues cache!') from exc
+        self._entries.update(entries)
+
+    def prune(self) -> None:
+        """Remove entries which haven't been read since this was created.
+
+        This prevents files which are no longer used from accumulating.
+        """
+        for key in self._entries.keys() - self._used:
+            del self._entries[key]
+
+    def save(self, filename: Union[str, os.PathLike]) -> None:
+        """Write the cache to a file."""
+        with srctools.AtomicWriter(filename, is_bytes=True) as f:
+            f.write(_fmt_prop_cache_header.pack(b'SPRC', PROP_CACHE_VERSION, len(self._entries)))
+            for (sys_type, sys_path, name, encoding, allow_escapes), (cache_key, data) in self._entries.items():
+                strings = [
+                    string.encode('utf8')
+                    for string in [sys_type, sys_path, name, encoding]
+                ]
+                f.write(_fmt_prop_cache_entry.pack(
+                    *map(len, strings),
+                    allow_escapes, cache_key, len(data),
+                ))
+                for string in strings:
+                    f.write(string)
+                f.write(data)
+
+
 class FileSystemChain(Generic[ChildSysT], FileSystem[None, File]):
     """Chains several filesystem into one prioritised whole."""
 
-    def __init__(self, *systems: Union[ChildSysT, Tuple[str, ChildSysT]]) -> None:
+    def __init__(
+        self,
+        *systems: Union[ChildSysT, Tuple[str, ChildSysT]],
+        indexed: bool=False,
+    ) -> None:
+        """Create a chain of systems.
+
+        If indexed is True, all files in the children are found when the
+        chain is opened, so lookups don't need to check each system.
+        Files which are not found are also remembered. Call invalidate_index()
+        if files are later added to the children.
+        """
         super().__init__('')
         self.systems: List[Tuple[ChildSysT, str]] = []
+        self.indexed = indexed
+        # Casefolded path -> system and full path, and paths known to be
+        # missing.
+        self._index: Optional[Dict[str, Tuple[ChildSysT, str]]] = None
+        self._missing: Set[str] = set()
         for sys in systems:
             if isinstance(sys, tuple):
                 self.add_sys(*sys)
@@ -262,10 +430,65 @@ class FileSystemChain(Generic[ChildSysT], FileSystem[None, File]):
         # If we're currently open, apply that to the added systems.
         if self._ref_count > 0:
             sys.open_ref()
+            if self._index is not None:
+                self._build_index()
+
+    @staticmethod
+    def _index_key(name: str) -> str:
+        """Convert paths to the form used in the index."""
+        return os.path.normpath(name).replace('\\', '/').casefold()
+
+    def _build_index(self) -> None:
+        """Find all the files in our systems.
+
+        Only the names are collected, the files are looked up when used.
+        """
+        index: Dict[str, Tuple[ChildSysT, str]] = {}
+        for sys, prefix in self.systems:
+            # noinspection PyProtectedMember
+            for path in sys._iter_names(os.path.join(prefix, '').replace('\\', '/')):
+                path = path.replace('\\', '/')
+                key = self._index_key(os.path.relpath(path, prefix) if prefix else path)
+                # The first system has priority.
+                if key not in index:
+                    index[key] = (sys, path)
+        self._index = index
+        self._missing = set()
+
+    def invalidate_index(self, name: Optional[str]=None) -> None:
+        """Discard cached lookups, after files in the systems are changed.
+
+        If a name is given, only that file is looked up again.
+        Otherwise the entire index is rebuilt.
+        """
+        with self._ref_lock:
+            if self._index is None:
+                return
+            if name is None:
+                self._build_index()
+            else:
+                key = self._index_key(name)
+                self._index.pop(key, None)
+                self._missing.discard(key)
 
     def _get_file(self: 'FileSystemChain[ChildSysT]', name: str) -> File[ChildSysT]:
         """Search for a file on each filesystem in turn."""
         self._check_open()
+        index = self._index
+        if index is not None:
+            key = self._index_key(name)
+            try:
+                sys, full_name = index[key]
+            except KeyError:
+                if key in self._missing:
+                    raise FileNotFoundError(name) from None
+            else:
+                try:
+                    return File(self, full_name, sys._get_file(full_name))
+                except FileNotFoundError:
+                    # Removed since it was indexed, check the others.
+                    # Another thread may have already removed it.
+                    index.pop(key, None)
         for sys, prefix in self.systems:
             full_name = os.path.join(prefix, name).replace('\\', '/')
             try:
@@ -274,7 +497,12 @@ class FileSystemChain(Generic[ChildSysT], FileSystem[None, File]):
                 continue
             # Pass the original file instance, so we can open
             # from the original system.
+            if index is not None:
+                # Added after the index was built.
+                index[key] = (sys, full_name)
             return File(self, full_name, file_info)
+        if index is not None:
+            self._missing.add(key)
         raise FileNotFoundError(name)
 
     def open_str(self, name: Union[str, File[ChildSysT]], encoding: str = 'utf8') -> TextIO:
@@ -325,12 +553,16 @@ class FileSystemChain(Generic[ChildSysT], FileSystem[None, File]):
         for sys, prefix in self.systems:
             sys.close_ref()
         self._ref = None
+        self._index = None
+        self._missing = set()
 
     def _create_ref(self) -> None:
         """Creating and deleting refs affects the underlying systems."""
         for sys, prefix in self.systems:
             sys.open_ref()
         self._ref = True
+        if self.indexed:
+            self._build_index()
 
     def _get_cache_key(self, file: File[ChildSysT]) -> int:
         """Return the last modified time of this file.
@@ -447,13 +679,34 @@ class VirtualFileSystem(FileSystem[Any, str]):
         self._ref = True
 
 
+class _IndexedDir:
+    """A folder scanned by an indexed RawFileSystem."""
+    __slots__ = ['path', 'mtime', 'files', 'dirs']
+
+    def __init__(self, path: str) -> None:
+        self.path = path  # Relative to the root, in the real case.
+        self.mtime = -1
+        # Casefolded name -> real name or folder.
+        self.files: Dict[str, str] = {}
+        self.dirs: Dict[str, _IndexedDir] = {}
+
+
 class RawFileSystem(FileSystem):
     """Accesses files in a real folder.
 
     This prohibits access to folders above the root.
+    If indexed is True, the folder is scanned when the system is opened,
+    and lookups are then case-insensitive. Folders are rescanned when their
+    modification time changes. Like os.walk(), symlinked folders are not
+    entered, so their contents are not found in this mode.
     """
-    def __init__(self, path: Union[str, os.PathLike]):
+    def __init__(self, path: Union[str, os.PathLike], indexed: bool=False):
         super().__init__(os.path.abspath(path))
+        self.indexed = indexed
+        # Casefolded relative path -> the folder, or the real file path.
+        self._index_dirs: Dict[str, _IndexedDir] = {}
+        self._index_files: Dict[str, str] = {}
+        self._index_lock = threading.RLock()
 
     def __repr__(self):
         return 'RawFileSystem({!r})'.format(self.path)
@@ -465,8 +718,125 @@ class RawFileSystem(FileSystem):
             raise ValueError('Path "{}" escaped "{}"!'.format(path, self.path))
         return abs_path
 
+    def _index_key(self, path: str) -> str:
+        """Get the casefolded relative path used in the index."""
+        key = os.path.normpath(path).replace('\\', '/').casefold()
+        if key == '.':
+            return ''
+        if key == '..' or key.startswith('../') or os.path.isabs(key):
+            raise ValueError('Path "{}" escaped "{}"!'.format(path, self.path))
+        return key
+
+    def _scan_dir(self, folder: _IndexedDir, key: str) -> None:
+        """Read the contents of a folder.
+
+        New subfolders are scanned entirely, existing ones are left alone.
+        """
+        abs_path = os.path.join(self.path, folder.path)
+        prefix = folder.path + '/' if folder.path else ''
+        key_prefix = key + '/' if key else ''
+        with self._index_lock:
+            for name in folder.files:
+                self._index_files.pop(key_prefix + name, None)
+            old_dirs = folder.dirs
+            folder.files = {}
+            folder.dirs = {}
+            try:
+                # Fetch this first, so changes during the scan are noticed.
+                folder.mtime = os.stat(abs_path).st_mtime_ns
+                entries = list(os.scandir(abs_path))
+            except (FileNotFoundError, NotADirectoryError):
+                entries = []
+            new_dirs: List[Tuple[_IndexedDir, str]] = []
+            # Sort, so names differing only in case pick the same file.
+            entries.sort(key=lambda entry: entry.name)
+            for entry in entries:
+                folded = entry.name.casefold()
+                # Like os.walk(), don't recurse into symlinked folders.
+                if entry.is_dir(follow_symlinks=False):
+                    if folded in folder.dirs:
+                        continue
+                    sub = old_dirs.pop(folded, None)
+                    if sub is None or sub.path != prefix + entry.name:
+                        if sub is not None:
+                            self._drop_dir(sub, key_prefix + folded)
+                        sub = _IndexedDir(prefix + entry.name)
+                        new_dirs.append((sub, key_prefix + folded))
+                    folder.dirs[folded] = self._index_dirs[key_prefix + folded] = sub
+                elif entry.is_file() and folded not in folder.files:
+                    folder.files[folded] = entry.name
+                    self._index_files[key_prefix + folded] = prefix + entry.name
+            for folded, sub in old_dirs.items():
+                self._drop_dir(sub, key_prefix + folded)
+            for sub, sub_key in new_dirs:
+                self._scan_dir(sub, sub_key)
+
+    def _drop_dir(self, folder: _IndexedDir, key: str) -> None:
+        """Remove a deleted folder from the index."""
+        self._index_dirs.pop(key, None)
+        for name in folder.files:
+            self._index_files.pop(key + '/' + name, None)
+        for name, sub in folder.dirs.items():
+            self._drop_dir(sub, key + '/' + name)
+
+    def _check_dir(self, folder: _IndexedDir, key: str) -> bool:
+        """Rescan a folder if it was modified, returning if it was."""
+        try:
+            mtime = os.stat(os.path.join(self.path, folder.path)).st_mtime_ns
+        except FileNotFoundError:
+            mtime = -1
+        if mtime != folder.mtime:
+            self._scan_dir(folder, key)
+            return True
+        return False
+
+    def refresh_index(self) -> None:
+        """Rescan any folders in the index which have been modified."""
+        with self._index_lock:
+            if '' not in self._index_dirs:
+                self._index_dirs[''] = _IndexedDir('')
+            for key, folder in list(self._index_dirs.items()):
+                # Skip folders removed while rescanning parents.
+                if self._index_dirs.get(key) is folder:
+                    self._check_dir(folder, key)
+
+    def _lookup(self, name: str) -> Optional[str]:
+        """Find the real relative path for a file in the index.
+
+        The nearest indexed parent folder is checked first, so files added
+        or removed since it was scanned are noticed.
+        """
+        key = self._index_key(name)
+        with self._index_lock:
+            folder_key = key
+            while folder_key:
+                folder_key = folder_key.rpartition('/')[0]
+                if folder_key in self._index_dirs:
+                    break
+            self._check_dir(self._index_dirs[folder_key], folder_key)
+            return self._index_files.get(key)
+
     def walk_folder(self, folder: str) -> Iterator[File]:
         """Yield files in a folder."""
+        if self.indexed and self._index_dirs:
+            key = self._index_key(folder)
+            if key not in self._index_dirs:
+                return
+            todo = [key]
+            while todo:
+                key = todo.pop()
+                try:
+                    indexed_dir = self._index_dirs[key]
+                except KeyError:  # Deleted.
+                    continue
+                self._check_dir(indexed_dir, key)
+                prefix = indexed_dir.path + '/' if indexed_dir.path else ''
+                for name in list(indexed_dir.files.values()):
+                    yield File(self, prefix + name, prefix + name)
+                key_prefix = key + '/' if key else ''
+                todo.extend(key_prefix + name for name in indexed_dir.dirs)
+            return
+
         path = self._resolve_path(folder)
         for dirpath, dirnames, filenames in os.walk(path):
             for file in filenames:
@@ -485,6 +855,11 @@ class RawFileSystem(FileSystem):
         self._check_open()
         if isinstance(name, File):
             name = self._get_data(name)
+        elif self.indexed:
+            real_name = self._lookup(name)
+            if real_name is None:
+                raise FileNotFoundError(name)
+            name = real_name
         return open(self._resolve_path(name), mode='rt', encoding=encoding)
 
     def open_bin(self, name: Union[str, File['RawFileSystem']]) -> BinaryIO:
@@ -496,18 +871,30 @@ class RawFileSystem(FileSystem):
         self._check_open()
         if isinstance(name, File):
             name = self._get_data(name)
+        elif self.indexed:
+            real_name = self._lookup(name)
+            if real_name is None:
+                raise FileNotFoundError(name)
+            name = real_name
         return open(self._resolve_path(name), mode='rb')
 
     def _file_exists(self, name: str) -> bool:
         # We don't need this, but it should match other filesystems.
         self._check_open()
 
+        if self.indexed:
+            return self._lookup(name) is not None
         return os.path.isfile(self._resolve_path(name))
 
     def _get_file(self, name: str):
         # We don't need this, but it should match other filesystems.
         self._check_open()
 
+        if self.indexed:
+            real_name = self._lookup(name)
+            if real_name is None:
+                raise FileNotFoundError(name)
+            return File(self, real_name, real_name)
         if os.path.isfile(self._resolve_path(name)):
             name = name.replace('\\', '/')
             return File(self, name, name)
@@ -518,8 +905,13 @@ class RawFileSystem(FileSystem):
         self._ref = None
 
     def _create_ref(self) -> None:
-        """The raw filesystem doesn't need a reference to anything."""
+        """The raw filesystem doesn't need a reference to anything.
+
+        If indexed, the index is built or refreshed.
+        """
         self._ref = True
+        if self.indexed:
+            self.refresh_index()
 
     def _get_cache_key(self, file: File['RawFileSystem']) -> int:
         """Our cache key is the last modification time."""
@@ -616,48 +1008,80 @@ class ZipFileSystem(FileSystem[ZipFile, ZipInfo]):
 
 
 class VPKFileSystem(FileSystem[VPK, VPKFile]):
-    """Accesses files in a VPK file."""
+    """Accesses files in a VPK file.
+
+    The directory is kept loaded when the system is closed, so reopening
+    is quick. It is reloaded if the directory file changes.
+    """
     def __init__(self, path: Union[str, os.PathLike]):
         super().__init__(path)
         # Used to enforce case-insensitivity.
-        self._name_to_file: Dict[str, VPKFile] = {}
+        # The VPK creates the FileInfo objects when they're looked up.
+        self._name_to_file: Dict[str, str] = {}
+        # The loaded VPK, and the size and modification time of the
+        # directory file when it was.
+        self._vpk: Optional[VPK] = None
+        self._vpk_stat = (-1, -1)
 
     def __repr__(self) -> str:
         return 'VPKFileSystem({!r})'.format(self.path)
 
     def _create_ref(self) -> None:
-        self._ref = VPK(self.path)
+        stat = os.stat(self.path)
+        vpk_stat = (stat.st_size, stat.st_mtime_ns)
+        if self._vpk is not None and vpk_stat == self._vpk_stat:
+            self._ref = self._vpk
+            return
+        if self._vpk is not None:
+            self._vpk.close()
+        self._ref = self._vpk = VPK(self.path, lazy=True)
+        self._vpk_stat = vpk_stat
 
         self._name_to_file.clear()
-        for file in self._ref:
+        for filename in self._ref.filenames():
             self._name_to_file[
-                file.filename.replace('\\', '/').casefold()
-            ] = file
+                filename.replace('\\', '/').casefold()
+            ] = filename
 
     def _delete_ref(self) -> None:
-        # We only read from VPKs, so no cleanup needs to be done.
+        # We only read from VPKs, so just release the archive files.
+        # The directory stays mapped, so Files can still use the data in it.
+        if self._ref is not None:
+            # noinspection PyProtectedMember
+            self._ref._close_archives()
         self._ref = None
-        self._name_to_file.clear()
 
     def _file_exists(self, name: str) -> bool:
         self._check_open()
         return name in self._name_to_file
 
-    def _get_file(self, name: str) -> File['VPKFileSystem']:
-        key = name.casefold().replace('\\', '/')
+    def _lookup(self, name: str) -> VPKFile:
+        """Find the FileInfo for a file, ignoring case."""
         try:
-            file = self._name_to_file[key]
+            filename = self._name_to_file[name.casefold().replace('\\', '/')]
         except KeyError:
             raise FileNotFoundError(name) from None
-        return File(self, key, file)
+        return self._ref[filename]
+
+    def _get_file(self, name: str) -> File['VPKFileSystem']:
+        key = name.casefold().replace('\\', '/')
+        return File(self, key, self._lookup(key))
 
     def walk_folder(self, folder: str) -> Iterator[File['VPKFileSystem']]:
         """Yield files in a folder."""
+        for filename in self._iter_names(folder):
+            file = self._ref[filename]
+            yield File(self, file.filename, file)
+
+    def _iter_names(self, folder: str) -> Iterator[str]:
+        """Yield the paths of files in a folder, without looking them up."""
+        self._check_open()
         # All VPK files use forward slashes.
-        folder = folder.replace('\\', '/')
-        for file in self._name_to_file.values():
-            if file.dir.startswith(folder):
-                yield File(self, file.filename, file)
+        folder = folder.replace('\\', '/').strip('/').casefold()
+        prefix = folder + '/' if folder else ''
+        for key, filename in self._name_to_file.items():
+            if key.startswith(prefix):
+                yield filename
 
     def open_bin(self, name: Union[str, File['VPKFileSystem']]) -> BinaryIO:
         """Open a file in bytes mode or raise FileNotFoundError."""
@@ -666,10 +1090,7 @@ class VPKFileSystem(FileSystem[VPK, VPKFile]):
             if isinstance(name, File):
                 file = self._get_data(name)
             else:
-                try:
-                    file = self._name_to_file[name.casefold().replace('\\', '/')]
-                except KeyError:
-                    raise FileNotFoundError(name)
+                file = self._lookup(name)
             return io.BytesIO(file.read())
 
     def open_str(
@@ -683,10 +1104,7 @@ class VPKFileSystem(FileSystem[VPK, VPKFile]):
             if isinstance(name, File):
                 file = self._get_data(name)
             else:
-                try:
-                    file = self._name_to_file[name.casefold().replace('\\', '/')]
-                except KeyError:
-                    raise FileNotFoundError(name)
+                file = self._lookup(name)
             # Wrap the data to treat it as bytes, then
             # wrap that to decode and clean up universal newlines.
             return io.TextIOWrapper(io.BytesIO(file.read()), encoding)
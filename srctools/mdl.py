@@ -750,7 +750,20 @@ class Model:
         list. This looks up in the filesystem to determine which CDMaterials
         folder to use, if any.
         """
+        with self._sys:
+            for candidates in self.iter_texture_paths(skins):
+                for full in candidates:
+                    if full in self._sys:
+                        yield full
+                        break
+
+    def iter_texture_paths(self, skins: Iterable[int]=None) -> Iterator[List[str]]:
+        """Yield the possible locations of each texture used by this model.
 
+        Skins if given should be a set of skin indexes, which constrains the
+        list. Each texture is found in the first CDMaterials folder which
+        contains it, so a list of material paths is produced in that order.
+        """
         if skins:
             paths = set()
             for ind in skins:
@@ -766,13 +779,11 @@ class Model:
                 for tex in texgroup
             }
 
-        with self._sys:
-            for tex in paths:
-                for folder in self.cdmaterials:
-                    full = str(PurePosixPath('materials', folder, tex).with_suffix('.vmt'))
-                    if full in self._sys:
-                        yield full
-                        break
+        for tex in paths:
+            yield [
+                str(PurePosixPath('materials', folder, tex).with_suffix('.vmt'))
+                for folder in self.cdmaterials
+            ]
 
     def find_sounds(self) -> Iterator[str]:
         """Yield all sounds used by animations.
@@ -1,13 +1,24 @@
 """Handles the list of files which are desired to be packed into the BSP."""
+import hashlib
 import io
 import itertools
-from collections import OrderedDict
-from typing import Iterable, Dict, Tuple, List, Iterator, Set, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import (
+    Iterable, Dict, Tuple, List, Iterator, Set, Optional, Union,
+    Mapping, BinaryIO, Deque,
+)
 from enum import Enum, auto as auto_enum
-from zipfile import ZipFile
+from struct import Struct, error as StructError
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
 import os
+import shutil
+import tempfile
+import time
+import zlib
 
-from srctools import conv_bool
+from srctools import conv_bool, EmptyMapping
+from srctools.binformat import copy_range
 from srctools.tokenizer import TokenSyntaxError
 from srctools.property_parser import Property, KeyValError
 from srctools.vmf import VMF
@@ -24,6 +35,41 @@ import srctools.logger
 
 LOGGER = srctools.logger.get_logger(__name__)
 SOUND_CACHE_VERSION = '1'  # Used to allow ignoring incompatible versions.
+DEP_CACHE_VERSION = 2
+
+# Magic, version, string count.
+_fmt_dep_header = Struct('<4sII')
+# Filename index, skin count (-1 for all), source count, dependency count.
+_fmt_dep_entry = Struct('<IhHH')
+# Filename index, cache key.
+_fmt_dep_source = Struct('<Iq')
+# Filename index, type name index, optional (2 if it matches the file).
+_fmt_dep_file = Struct('<IIB')
+# Cache key recorded for files which were checked, but don't exist.
+_MISSING_KEY = -2
+_fmt_dep_count = Struct('<I')
+_fmt_dep_str = Struct('<H')
+
+# The filename and extra field lengths, in a zip local file header.
+_fmt_zip_local_lengths = Struct('<HH')
+ZIP_LOCAL_HEADER_SIZE = 30
+# Size of chunks when copying files into zips.
+ZIP_CHUNK_SIZE = 1024 * 1024
+# Previously stored in the packfile, this is removed if present.
+PACK_MANIFEST = 'srctools_pack_manifest.vdf'
+# Version of the manifest file given to pack_into_zip().
+PACK_MANIFEST_VERSION = '2'
+
+# Dependencies found for a file - filename, type, optional.
+Dependency = Tuple[str, 'FileType', bool]
+# Dependencies as found by the analysers and cached. Optional is None if the
+# dependency is only optional when the file itself is.
+_DepTemplate = Tuple[str, 'FileType', Optional[bool]]
+# (filename, skinset) -> ((filename, cache key) of files read, dependencies)
+DepCache = Dict[
+    Tuple[str, Optional[Tuple[int, ...]]],
+    Tuple[List[Tuple[str, int]], List[_DepTemplate]],
+]
 
 
 class FileType(Enum):
@@ -117,6 +163,181 @@ class PackFile:
         return text
 
 
+def _read_dep_cache(filename: Union[str, os.PathLike]) -> DepCache:
+    """Read the dependency cache written by _write_dep_cache().
+
+    This raises ValueError if the file is invalid.
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    try:
+        magic, version, str_count = _fmt_dep_header.unpack_from(data, 0)
+        if magic != b'SDEP' or version != DEP_CACHE_VERSION:
+            raise ValueError('Incompatible dependency cache!')
+        off = _fmt_dep_header.size
+        strings = []  # type: List[str]
+        for _ in range(str_count):
+            [size] = _fmt_dep_str.unpack_from(data, off)
+            off += _fmt_dep_str.size
+            strings.append(data[off:off + size].decode('utf8'))
+            off += size
+
+        [entry_count] = _fmt_dep_count.unpack_from(data, off)
+        off += _fmt_dep_count.size
+        cache = {}  # type: DepCache
+        for _ in range(entry_count):
+            name_ind, skin_count, src_count, dep_count = _fmt_dep_entry.unpack_from(data, off)
+            off += _fmt_dep_entry.size
+            if skin_count >= 0:
+                skins = Struct('<{}H'.format(skin_count)).unpack_from(data, off)  # type: Optional[Tuple[int, ...]]
+                off += 2 * skin_count
+            else:
+                skins = None
+            sources = []
+            for _ in range(src_count):
+                src_ind, key = _fmt_dep_source.unpack_from(data, off)
+                off += _fmt_dep_source.size
+                sources.append((strings[src_ind], key))
+            deps = []  # type: List[_DepTemplate]
+            for _ in range(dep_count):
+                dep_ind, type_ind, optional = _fmt_dep_file.unpack_from(data, off)
+                off += _fmt_dep_file.size
+                deps.append((
+                    strings[dep_ind], FileType[strings[type_ind]],
+                    None if optional == 2 else bool(optional),
+                ))
+            cache[strings[name_ind], skins] = (sources, deps)
+    except (StructError, IndexError, KeyError, UnicodeDecodeError) as exc:
+        raise ValueError('Invalid dependency cache!') from exc
+    return cache
+
+
+def _write_dep_cache(filename: Union[str, os.PathLike], cache: DepCache) -> None:
+    """Write the dependency cache to a file."""
+    strings = {}  # type: Dict[str, int]
+
+    def intern(string: str) -> int:
+        """Compress repeated strings into a list."""
+        try:
+            return strings[string]
+        except KeyError:
+            ind = strings[string] = len(strings)
+            return ind
+
+    entries = io.BytesIO()
+    entries.write(_fmt_dep_count.pack(len(cache)))
+    for (name, skins), (sources, deps) in cache.items():
+        entries.write(_fmt_dep_entry.pack(
+            intern(name),
+            -1 if skins is None else len(skins),
+            len(sources),
+            len(deps),
+        ))
+        if skins is not None:
+            entries.write(Struct('<{}H'.format(len(skins))).pack(*skins))
+        for src_name, key in sources:
+            entries.write(_fmt_dep_source.pack(intern(src_name), key))
+        for dep_name, dep_type, optional in deps:
+            entries.write(_fmt_dep_file.pack(
+                intern(dep_name), intern(dep_type.name),
+                2 if optional is None else optional,
+            ))
+
+    with srctools.AtomicWriter(filename, is_bytes=True) as f:
+        f.write(_fmt_dep_header.pack(b'SDEP', DEP_CACHE_VERSION, len(strings)))
+        for string in strings:
+            encoded = string.encode('utf8')
+            f.write(_fmt_dep_str.pack(len(encoded)))
+            f.write(encoded)
+        f.write(entries.getvalue())
+
+
+def _zip_data_offset(file: BinaryIO, info: ZipInfo) -> int:
+    """Find the position of the compressed data for a zip entry."""
+    file.seek(info.header_offset + 26)
+    name_len, extra_len = _fmt_zip_local_lengths.unpack(file.read(4))
+    return info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_len + extra_len
+
+
+def _zip_read_raw(file: BinaryIO, info: ZipInfo) -> bytes:
+    """Read the compressed data for a zip entry."""
+    file.seek(_zip_data_offset(file, info))
+    return file.read(info.compress_size)
+
+
+def _zip_write_raw(
+    zipfile: ZipFile,
+    orig: ZipInfo,
+    crc: int,
+    file_size: int,
+    data: Union[bytes, Tuple[BinaryIO, ZipInfo]],
+) -> ZipInfo:
+    """Write already-compressed data to a zip being written.
+
+    This copies the information from orig, then appends it directly.
+    The data is either bytes, or another zip file and the entry to copy
+    from it in chunks.
+    The zipfile module doesn't support this, so we need to modify its
+    file list and position ourselves.
+    """
+    info = ZipInfo(orig.filename, orig.date_time)
+    info.compress_type = orig.compress_type
+    info.external_attr = orig.external_attr
+    # Sizes are written in the header, so we don't need a data descriptor.
+    info.flag_bits = orig.flag_bits & ~0x08
+    info.CRC = crc
+    info.file_size = file_size
+    if isinstance(data, bytes):
+        info.compress_size = len(data)
+    else:
+        src, src_info = data
+        info.compress_size = src_info.compress_size
+    # We might have read from the file, seek back to the end.
+    zipfile.fp.seek(zipfile.start_dir)
+    info.header_offset = zipfile.start_dir
+
+    zipfile.fp.write(info.FileHeader())
+    if isinstance(data, bytes):
+        zipfile.fp.write(data)
+    else:
+        copy_range(src, zipfile.fp, _zip_data_offset(src, src_info), info.compress_size)
+    zipfile.filelist.append(info)
+    zipfile.NameToInfo[info.filename] = info
+    zipfile.start_dir = zipfile.fp.tell()
+    zipfile._didModify = True
+    return info
+
+
+def _hash_file(file: Union[File, bytes]) -> Tuple[str, int, int]:
+    """Compute the SHA-1, CRC and size of a file's contents."""
+    sha = hashlib.sha1()
+    if isinstance(file, bytes):
+        sha.update(file)
+        return sha.hexdigest(), zlib.crc32(file), len(file)
+    crc = size = 0
+    with file.open_bin() as f:
+        for chunk in iter(lambda: f.read(ZIP_CHUNK_SIZE), b''):
+            sha.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return sha.hexdigest(), crc, size
+
+
+def _deflate_file(file: Union[File, bytes]) -> Tuple[int, int, bytes]:
+    """Read and deflate a file, returning the CRC, size and data.
+
+    This is run in other threads, zlib releases the GIL.
+    """
+    if isinstance(file, bytes):
+        data = file
+    else:
+        with file.open_bin() as f:
+            data = f.read()
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    comp_data = compressor.compress(data) + compressor.flush()
+    return zlib.crc32(data), len(data), comp_data
+
+
 def unify_path(path: str):
     """Convert paths to a unique form."""
     path = os.path.normpath(path).casefold().replace('\\', '/')
@@ -148,6 +369,9 @@ class PackList:
         # one use is unknown, so all skins could be used.
         self.skinsets = {}  # type: Dict[str, Optional[Set[int]]]
 
+        # While evaluating dependencies, the cached dependencies of each file.
+        self._dep_cache = None  # type: Optional[DepCache]
+
     def __getitem__(self, path: str) -> PackFile:
         """Look up a packfile by filename."""
         return self._files[unify_path(path)]
@@ -386,8 +610,7 @@ class PackList:
             except FileNotFoundError:
                 LOGGER.warning('No scripts/propdata.txt for breakable chunks!')
                 return
-            with propdata.open_str() as f:
-                props = Property.parse(f, 'scripts/propdata.txt', allow_escapes=False)
+            props = self.fsys.read_prop(propdata, allow_escapes=False)
             self._break_chunks = {}
             for chunk_prop in props.find_children('BreakableModels'):
                 self._break_chunks[chunk_prop.name] = [
@@ -415,8 +638,7 @@ class PackList:
         The sounds registered by this soundscript are returned.
         """
         try:
-            with file.sys, file.open_str() as f:
-                props = Property.parse(f, file.path, allow_escapes=False)
+            props = file.sys.read_prop(file, allow_escapes=False)
         except FileNotFoundError:
             # It doesn't exist, complain and pretend it's empty.
             LOGGER.warning('Soundscript "{}" does not exist!', file.path)
@@ -551,8 +773,7 @@ class PackList:
         if cache_file is not None:
             # Write back out our new cache with updated data.
             with srctools.AtomicWriter(cache_file) as f:
-                for line in new_cache_data.export():
-                    f.write(line)
+                new_cache_data.serialise(f)
 
     def write_manifest(self, map_name: str=None) -> None:
         """Produce and pack a manifest file for this map.
@@ -568,23 +789,22 @@ class PackList:
             if is_enabled is SoundScriptMode.INCLUDE
         ])
 
-        buf = bytearray()
-        for line in manifest.export():
-            buf.extend(line.encode('utf8'))
+        buf = io.BytesIO()
+        manifest.serialise(buf)
 
         self.pack_file(
             'map/{}_level_sounds.txt'.format(map_name)
             if map_name else
             'scripts/game_sounds_manifest.txt',
             FileType.SOUNDSCRIPT,
-            bytes(buf),
+            buf.getvalue(),
         )
 
     def pack_from_bsp(self, bsp: BSP) -> None:
         """Pack files found in BSP data (excluding entities)."""
-        for prop in bsp.static_props():
-            # Static props obviously only use one skin.
-            self.pack_file(prop.model, FileType.MODEL, skinset={prop.skin})
+        # Static props obviously only use one skin each.
+        for model, skins in bsp.static_prop_table().model_skins().items():
+            self.pack_file(model, FileType.MODEL, skinset=skins)
 
         for mat in bsp.read_texture_names():
             self.pack_file('materials/{}.vmt'.format(mat.lower()), FileType.MATERIAL)
@@ -746,6 +966,9 @@ class PackList:
         whitelist: Iterable[FileSystem]=(),
         blacklist: Iterable[FileSystem]=(),
         ignore_vpk: bool=True,
+        compression: Mapping[str, int]=EmptyMapping,
+        jobs: int=1,
+        manifest_file: Union[str, os.PathLike, None]=None,
     ) -> None:
         """Pack all our files into the packfile in the BSP.
 
@@ -753,18 +976,22 @@ class PackList:
         Filesystems must be in the whitelist and not in the blacklist, if provided.
         If ignore_vpk is True, files in VPK won't be packed unless that system
         is in allow_filesys.
-        """
-        # We need to rebuild the zipfile from scratch, so we can overwrite
-        # old data if required.
 
-        # First retrieve the data.
-        with bsp.packfile() as start_zip:
-            packed_files = {
-                info.filename.casefold(): (info.filename, start_zip.read(info))
-                for info in start_zip.infolist()
-            }  # type: Dict[str, Tuple[str, bytes]]
+        compression maps file extensions (like '.vmt') to the zipfile
+        compression type to use for newly packed files. Other files are
+        stored. Files already in the packfile are copied without
+        recompressing. If jobs is greater than 1, files are deflated in a
+        pool of that many threads, or one per CPU if 0.
+
+        If manifest_file is provided, it should be a path to a file used to
+        record the files packed into each map. Files which are unchanged
+        since the map was last packed are then left as they are, and files
+        with the same cache key don't need to be read to check.
+        """
+        # The zipfile is rebuilt from scratch, so we can overwrite old data
+        # if required. Existing entries are copied without decompressing.
+        pak_lump = bsp.lumps[BSP_LUMPS.PAKFILE]
 
-        # The packed_files dict is a casefolded name -> (orig name, bytes) tuple.
         all_systems = {
             sys for sys, prefix in
             self.fsys.systems
@@ -787,93 +1014,428 @@ class PackList:
             self.fsys.systems
         ]))
 
-        with self.fsys:
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+
+        with self.fsys, pak_lump.open_data() as old_data, ZipFile(old_data) as old_zip:
+            # Casefolded name -> info, for the existing files.
+            old_files = {
+                info.filename.casefold(): info
+                for info in old_zip.infolist()
+            }  # type: Dict[str, ZipInfo]
+            # Remove the manifest older versions stored in here.
+            had_old_manifest = old_files.pop(PACK_MANIFEST, None) is not None
+            map_key = os.path.normcase(os.path.abspath(bsp.filename))
+            if manifest_file is not None:
+                manifests = self._read_pack_manifest(manifest_file)
+            else:
+                manifests = {}
+            manifest = manifests.get(map_key, {})
+
+            # Casefolded name -> (name, file or data) for the new files.
+            new_files = OrderedDict()  # type: Dict[str, Tuple[str, Union[File, bytes]]]
             for file in self._files.values():
                 # Need to ensure / separators.
                 fname = file.filename.replace('\\', '/')
 
-                already_packed = fname.casefold() in packed_files
-
                 if file.data is not None:
                     # Always pack, we've got custom data.
-                    packed_files[fname.casefold()] = (fname, file.data)
+                    new_files[fname.casefold()] = (fname, file.data)
                     continue
 
                 try:
                     sys_file = self.fsys[file.filename]
                 except FileNotFoundError:
-                    if not file.optional and not already_packed:
+                    if not file.optional and fname.casefold() not in old_files:
                         LOGGER.warning('WARNING: "{}" not packed!', file.filename)
                     continue
 
                 if self.fsys.get_system(sys_file) in allowed:
                     LOGGER.debug('ADD:  {}', fname)
-                    with sys_file.open_bin() as f:
-                        packed_files[fname.casefold()] = (fname, f.read())
+                    new_files[fname.casefold()] = (fname, sys_file)
                 else:
                     LOGGER.debug('SKIP: {}', fname)
 
-        LOGGER.info('Compressing packfile...')
-        with io.BytesIO() as new_data:
-            with ZipFile(new_data, 'w') as new_zip:
-                for fname, data in packed_files.values():
-                    new_zip.writestr(fname, data)
-            bsp.lumps[BSP_LUMPS.PAKFILE].data = new_data.getvalue()
+            # Hash each file, to check if it has changed. If the source has
+            # the same cache key as last time, we don't need to read it.
+            # name -> (cache key, sha1, crc, size)
+            new_manifest = OrderedDict()  # type: Dict[str, Tuple[int, str, int, int]]
+            unchanged = set()  # type: Set[str]
+            for key, (fname, file) in new_files.items():
+                cache_key = -1 if isinstance(file, bytes) else file.cache_key()
+                try:
+                    old_key, sha, crc, size = manifest[key]
+                except KeyError:
+                    old_key = -1
+                if cache_key == -1 or cache_key != old_key:
+                    sha, crc, size = _hash_file(file)
+                new_manifest[key] = (cache_key, sha, crc, size)
+
+                try:
+                    old_info = old_files[key]
+                    old_sha = manifest[key][1]
+                except KeyError:
+                    continue
+                if (
+                    old_sha == sha and
+                    old_info.CRC == crc and
+                    old_info.file_size == size and
+                    old_info.compress_type == compression.get(
+                        os.path.splitext(fname)[1].casefold(), ZIP_STORED,
+                    )
+                ):
+                    unchanged.add(key)
+
+            if len(unchanged) == len(new_files) and not had_old_manifest:
+                LOGGER.info('Packfile unchanged.')
+                return
+
+            LOGGER.info('Compressing packfile...')
+            # Write to a temporary file, which the lump then takes over.
+            new_data = tempfile.TemporaryFile()
+            try:
+                with ZipFile(new_data, 'w') as new_zip:
+                    for key, info in old_files.items():
+                        if key not in new_files or key in unchanged:
+                            _zip_write_raw(
+                                new_zip, info,
+                                info.CRC, info.file_size,
+                                (old_data, info),
+                            )
+                    self._write_zip_files(
+                        new_zip,
+                        [
+                            (fname, file, new_manifest[key][1])
+                            for key, (fname, file) in new_files.items()
+                            if key not in unchanged
+                        ],
+                        compression, jobs,
+                    )
+            except BaseException:
+                new_data.close()
+                raise
+        pak_lump.set_data_file(new_data)
+
+        if manifest_file is not None:
+            manifests[map_key] = new_manifest
+            try:
+                self._write_pack_manifest(manifest_file, manifests)
+            except OSError:
+                LOGGER.warning('Could not write pack manifest!', exc_info=True)
+
+    @staticmethod
+    def _read_pack_manifest(
+        filename: Union[str, os.PathLike],
+    ) -> Dict[str, Dict[str, Tuple[int, str, int, int]]]:
+        """Read the manifest of files we previously packed into each map."""
+        manifests = {}  # type: Dict[str, Dict[str, Tuple[int, str, int, int]]]
+        try:
+            with open(filename, encoding='utf8') as f:
+                props = Property.parse(f, str(filename))
+            if props['version'] != PACK_MANIFEST_VERSION:
+                raise LookupError
+            for map_prop in props.find_children('Maps'):
+                manifests[map_prop.real_name] = manifest = {}
+                for prop in map_prop:
+                    cache_key, sha, crc, size = prop.value.split()
+                    manifest[prop.real_name] = (int(cache_key), sha, int(crc), int(size))
+        except FileNotFoundError:
+            pass
+        except (KeyValError, LookupError, ValueError):
+            LOGGER.warning('Invalid pack manifest, ignoring.')
+            manifests.clear()
+        return manifests
+
+    @staticmethod
+    def _write_pack_manifest(
+        filename: Union[str, os.PathLike],
+        manifests: Dict[str, Dict[str, Tuple[int, str, int, int]]],
+    ) -> None:
+        """Write out the manifest of files packed into each map."""
+        props = Property(None, [
+            Property('version', PACK_MANIFEST_VERSION),
+            Property('Maps', [
+                Property(map_key, [
+                    Property(name, '{} {} {} {}'.format(*data))
+                    for name, data in manifest.items()
+                ])
+                for map_key, manifest in manifests.items()
+            ]),
+        ])
+        with srctools.AtomicWriter(filename) as f:
+            props.serialise(f)
+
+    def _write_zip_files(
+        self,
+        zipfile: ZipFile,
+        files: List[Tuple[str, Union[File, bytes], str]],
+        compression: Mapping[str, int],
+        jobs: int,
+    ) -> None:
+        """Write our files into the new packfile.
+
+        Files are streamed in, unless they are deflated in parallel.
+        Files with the same hash are only compressed once, then copied.
+        """
+        date_time = time.localtime(time.time())[:6]
+        executor = ThreadPoolExecutor(jobs) if jobs > 1 else None
+        # (sha1, compress type) -> the entry which was written.
+        written = {}  # type: Dict[Tuple[str, int], ZipInfo]
+        # Files being compressed. We limit how many can be waiting.
+        pending = deque()  # type: Deque[Tuple[Tuple[str, int], ZipInfo, Future]]
+        queued = set()  # type: Set[Tuple[str, int]]
+        # Copies of files which were still being compressed.
+        duplicates = []  # type: List[Tuple[ZipInfo, Tuple[str, int]]]
+        try:
+            for fname, file, sha in files:
+                info = ZipInfo(fname, date_time)
+                info.compress_type = compression.get(
+                    os.path.splitext(fname)[1].casefold(),
+                    ZIP_STORED,
+                )
+                key = (sha, info.compress_type)
+                if key in written:
+                    self._write_copy(zipfile, info, written[key])
+                elif key in queued:
+                    duplicates.append((info, key))
+                elif executor is not None and info.compress_type == ZIP_DEFLATED:
+                    if len(pending) >= 2 * jobs:
+                        self._write_deflated(zipfile, written, *pending.popleft())
+                    pending.append((key, info, executor.submit(_deflate_file, file)))
+                    queued.add(key)
+                else:
+                    if isinstance(file, bytes):
+                        zipfile.writestr(info, file)
+                    else:
+                        with file.open_bin() as src, zipfile.open(info, 'w') as dest:
+                            shutil.copyfileobj(src, dest, ZIP_CHUNK_SIZE)
+                    written[key] = zipfile.filelist[-1]
+            while pending:
+                self._write_deflated(zipfile, written, *pending.popleft())
+            for info, key in duplicates:
+                self._write_copy(zipfile, info, written[key])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    @staticmethod
+    def _write_deflated(
+        zipfile: ZipFile,
+        written: Dict[Tuple[str, int], ZipInfo],
+        key: Tuple[str, int],
+        info: ZipInfo,
+        future: 'Future[Tuple[int, int, bytes]]',
+    ) -> None:
+        """Write a file compressed by _deflate_file()."""
+        crc, size, data = future.result()
+        written[key] = _zip_write_raw(zipfile, info, crc, size, data)
+
+    @staticmethod
+    def _write_copy(zipfile: ZipFile, info: ZipInfo, orig: ZipInfo) -> None:
+        """Write a duplicate of a file already in the zip."""
+        _zip_write_raw(
+            zipfile, info,
+            orig.CRC, orig.file_size,
+            _zip_read_raw(zipfile.fp, orig),
+        )
 
-    def eval_dependencies(self) -> None:
+    def eval_dependencies(
+        self,
+        jobs: int=1,
+        cache_file: Union[str, os.PathLike, None]=None,
+    ) -> None:
         """Add files to the list which need to also be packed.
 
-        This requires parsing through many files.
+        This requires parsing through many files. If jobs is greater than 1,
+        files are parsed in a pool of that many threads, or one per CPU if 0.
+        The new files are added in the same order either way.
+
+        If cache_file is provided, it should be a path to a file used to
+        store the dependencies of materials and models, so files with the
+        same cache key do not need to be parsed again.
         """
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        executor = ThreadPoolExecutor(jobs) if jobs > 1 else None
+
+        if cache_file is not None:
+            # If the file doesn't exist or is corrupt, that's
+            # fine. We'll just parse everything the slow way.
+            try:
+                self._dep_cache = _read_dep_cache(cache_file)
+            except (FileNotFoundError, ValueError):
+                self._dep_cache = {}
+
         # Run though repeatedly, until all are analysed.
-        todo = True
-        with self.fsys:
-            while todo:
-                todo = False
-
-                for file in list(self._files.values()):
-                    if file._analysed:
-                        continue
-                    file._analysed = True
-                    todo = True
-
-                    try:
-                        if file.type is FileType.MATERIAL:
-                            self._get_material_files(file)
-                        elif file.type is FileType.MODEL:
-                            self._get_model_files(file)
-                        elif file.type is FileType.TEXTURE:
-                            # Try packing the '.hdr.vtf' file as well if present.
-                            # But don't recurse!
-                            if not file.filename.endswith('.hdr.vtf'):
-                                hdr_tex = file.filename[:-3] + 'hdr.vtf'
-                                if hdr_tex in self.fsys:
-                                    self.pack_file(hdr_tex, optional=True)
-                    except Exception as exc:
-                        # Skip errors in the file format - means we can't find the dependencies.
-                        LOGGER.warning('Bad file "{}"!', file.filename, exc_info=exc)
-
-    def _get_model_files(self, file: PackFile) -> None:
-        """Find any needed files for a model."""
+        try:
+            with self.fsys:
+                while True:
+                    todo = [
+                        file for file in self._files.values()
+                        if not file._analysed
+                    ]
+                    if not todo:
+                        break
+                    for file in todo:
+                        file._analysed = True
+
+                    if executor is None:
+                        for file in todo:
+                            self._add_dependencies(file, self._analyse_file(
+                                file, self.skinsets.get(file.filename, None),
+                            ))
+                    else:
+                        # Read skinsets now, they're changed by pack_file().
+                        results = executor.map(
+                            self._analyse_file,
+                            todo,
+                            [self.skinsets.get(file.filename, None) for file in todo],
+                        )
+                        for file, deps in zip(todo, results):
+                            self._add_dependencies(file, deps)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if cache_file is not None and self._dep_cache is not None:
+                try:
+                    _write_dep_cache(cache_file, self._dep_cache)
+                except OSError:
+                    LOGGER.warning('Could not write dependency cache!', exc_info=True)
+            self._dep_cache = None
+
+    def _analyse_file(
+        self,
+        file: PackFile,
+        skinset: Optional[Set[int]],
+    ) -> List[Dependency]:
+        """Find the dependencies of a file.
+
+        This only reads the filesystem, so it can be run in other threads.
+        """
+        deps = self._find_dependencies(file, skinset)
+        return [
+            (filename, data_type, file.optional if optional is None else optional)
+            for filename, data_type, optional in deps
+        ]
+
+    def _find_dependencies(
+        self,
+        file: PackFile,
+        skinset: Optional[Set[int]],
+    ) -> List[_DepTemplate]:
+        """Find the dependencies of a file, using the cache if possible.
+
+        Dependencies which are optional only if the file is are left as None,
+        so the same results can be reused regardless of that.
+        """
+        cache = self._dep_cache
+        if cache is not None and file.data is None and (
+            file.type is FileType.MATERIAL or file.type is FileType.MODEL
+        ):
+            cache_id = (
+                file.filename,
+                None if skinset is None else tuple(sorted(skinset)),
+            )
+            try:
+                sources, deps = cache[cache_id]
+            except KeyError:
+                pass
+            else:
+                if self._check_sources(sources):
+                    return list(deps)
+        else:
+            cache = cache_id = None
+
+        deps = []  # type: List[_DepTemplate]
+        source_names = [file.filename]
+        try:
+            if file.type is FileType.MATERIAL:
+                deps.extend(self._get_material_files(file, source_names))
+            elif file.type is FileType.MODEL:
+                deps.extend(self._get_model_files(file, skinset, source_names))
+            elif file.type is FileType.TEXTURE:
+                # Try packing the '.hdr.vtf' file as well if present.
+                # But don't recurse!
+                if not file.filename.endswith('.hdr.vtf'):
+                    hdr_tex = file.filename[:-3] + 'hdr.vtf'
+                    if hdr_tex in self.fsys:
+                        deps.append((hdr_tex, FileType.GENERIC, True))
+        except Exception as exc:
+            # Skip errors in the file format - means we can't find the dependencies.
+            LOGGER.warning('Bad file "{}"!', file.filename, exc_info=exc)
+            return deps
+
+        if cache is not None:
+            sources = []
+            for name in source_names:
+                try:
+                    key = self.fsys[name].cache_key()
+                except FileNotFoundError:
+                    if name == file.filename:
+                        # Don't cache, so missing files are always reported.
+                        break
+                    # Record that it doesn't exist, so we notice if it's added.
+                    key = _MISSING_KEY
+                if key == -1:
+                    break
+                sources.append((name, key))
+            else:
+                cache[cache_id] = (sources, deps.copy())
+        return deps
+
+    def _check_sources(self, sources: List[Tuple[str, int]]) -> bool:
+        """Check if the files used to find cached dependencies are unchanged."""
+        for name, key in sources:
+            try:
+                if self.fsys[name].cache_key() != key:
+                    return False
+            except FileNotFoundError:
+                if key != _MISSING_KEY:
+                    return False
+        return True
+
+    def _add_dependencies(
+        self,
+        file: PackFile,
+        deps: List[Dependency],
+    ) -> None:
+        """Pack the dependencies found by _analyse_file()."""
+        try:
+            for filename, data_type, optional in deps:
+                self.pack_file(filename, data_type, optional=optional)
+        except Exception as exc:
+            LOGGER.warning('Bad file "{}"!', file.filename, exc_info=exc)
+
+    def _get_model_files(
+        self,
+        file: PackFile,
+        skinset: Optional[Set[int]],
+        sources: List[str],
+    ) -> Iterator[_DepTemplate]:
+        """Find any needed files for a model.
+
+        Other files which are read or checked are added to sources.
+        """
         filename, ext = os.path.splitext(file.filename)
 
         # Some of these are optional.
         for ext in MDL_EXTS:
             component = filename + ext
+            # Breakable models are read from the .phy, and the others
+            # might be added or removed.
+            sources.append(component)
             if component in self.fsys:
-                self.pack_file(component)
+                yield component, FileType.GENERIC, False
 
         if file.data is not None:
             # We need to add that file onto the system, so it's loaded.
+            # Use a new chain, so other threads aren't affected.
             virtual_system = VirtualFileSystem({
                 file.filename: file.data,
             })
-            virtual_system.open_ref()
-            self.fsys.systems.insert(0, (virtual_system, ''))
-            try:
-                mdl = Model(self.fsys, self.fsys[file.filename])
-            finally:
-                self.fsys.systems.pop(0)
+            fsys = FileSystemChain((virtual_system, ''), *self.fsys.systems)
+            with fsys:
+                mdl = Model(fsys, fsys[file.filename])
         else:
             try:
                 mdl = Model(self.fsys, self.fsys[file.filename])
@@ -882,22 +1444,31 @@ class PackList:
                     LOGGER.warning('Can\'t find model "{}"!', file.filename)
                 return
 
-        for tex in mdl.iter_textures(self.skinsets.get(file.filename, None)):
-            self.pack_file(tex, FileType.MATERIAL, optional=file.optional)
+        # Each texture is in the first CDMaterials folder containing it,
+        # so every one we check can change the result.
+        for candidates in mdl.iter_texture_paths(skinset):
+            for tex in candidates:
+                sources.append(tex)
+                if tex in self.fsys:
+                    yield tex, FileType.MATERIAL, None
+                    break
 
         for mdl_file in mdl.included_models:
-            self.pack_file(mdl_file.filename, FileType.MODEL, optional=file.optional)
+            yield mdl_file.filename, FileType.MODEL, None
 
         for snd in mdl.find_sounds():
-            self.pack_soundscript(snd)
+            yield snd, FileType.GAME_SOUND, False
 
         for break_mdl in mdl.phys_keyvalues.find_all('break', 'model'):
-            self.pack_file(break_mdl.value, FileType.MODEL, optional=file.optional)
+            yield break_mdl.value, FileType.MODEL, None
+
+    def _get_material_files(self, file: PackFile, sources: List[str]) -> Iterator[_DepTemplate]:
+        """Find any needed files for a material.
 
-    def _get_material_files(self, file: PackFile) -> None:
-        """Find any needed files for a material."""
+        Other files which are read are added to sources.
+        """
 
-        parents = []  # type: List[str]
+        parents = []  # type: List[File]
         try:
             if file.data is not None:
                 # Read directly from the data we have.
@@ -932,7 +1503,8 @@ class PackList:
             return
 
         for vmt in parents:
-            self.pack_file(vmt, FileType.MATERIAL, optional=file.optional)
+            sources.append(vmt.path)
+            yield vmt.path, FileType.MATERIAL, None
 
         for param_name, param_type, param_value in mat:
             param_value = param_value.casefold()
@@ -940,10 +1512,10 @@ class PackList:
                 # Skip over reference to cubemaps, or realtime buffers.
                 if param_value == 'env_cubemap' or param_value.startswith('_rt_'):
                     continue
-                self.pack_file(param_value, FileType.TEXTURE, optional=file.optional)
+                yield param_value, FileType.TEXTURE, None
             # $bottommaterial for water brushes mainly.
             if param_type is VarType.MATERIAL:
-                self.pack_file(param_value, FileType.MATERIAL, optional=file.optional)
+                yield param_value, FileType.MATERIAL, None
 
 
 # noinspection PyProtectedMember
@@ -24,8 +24,7 @@ They end with a quote."
     >>> with open('filename.txt', 'r') as f:
     ...     props = Property.parse(f, 'filename.txt')
     >>> with open('filename_2.txt', 'w') as f:
-    ...     for line in props.export():
-    ...         f.write(line)
+    ...     props.serialise(f)
 
     Property values should be either a string, or a list of children Properties.
     Names will be converted to lowercase automatically; use Prop.real_name to
@@ -57,9 +56,14 @@ They end with a quote."
 
     \n, \t, and \\ will be converted in Property values.
 """
+import io
+import re
 import sys
 import keyword
 import builtins  # Property.bool etc shadows these.
+from array import array
+from enum import Enum
+from struct import Struct
 
 from srctools import BOOL_LOOKUP, EmptyMapping
 from srctools.vec import Vec as _Vec
@@ -73,10 +77,18 @@ from typing import (
     overload,
     Callable,
     Mapping,
+    BinaryIO,
+    IO,
 )
 
 
-__all__ = ['KeyValError', 'NoKeyError', 'Property']
+__all__ = ['KeyValError', 'NoKeyError', 'Property', 'PropEvent', 'PropEventParser']
+
+# Finds the characters escape_text() changes, so most strings can skip it.
+_NEEDS_ESCAPE = re.compile(r'[\\"\t\n]').search
+
+# Number of lines Property.serialise() joins together for each write.
+SERIALISE_BATCH = 1024
 
 # Sentinel value to indicate that no default was given to find_key()
 _NO_KEY_FOUND = object()
@@ -86,6 +98,11 @@ _As_Dict_Ret = Dict[str, Union[str, '_As_Dict_Ret']]
 
 T = TypeVar('T')
 
+# The header for export_binary() - magic, version, string count,
+# string data length, and node count.
+_fmt_bin_header = Struct('<4sBIII')
+BIN_FORMAT_VERSION = 1
+
 # Various [flags] used after property names in some Valve files.
 # See https://github.com/ValveSoftware/source-sdk-2013/blob/master/sp/src/tier1/KeyValues.cpp#L2055
 PROP_FLAGS_DEFAULT = {
@@ -410,6 +427,161 @@ class Property:
         # Return that root property.
         return open_properties[0]
 
+    @staticmethod
+    def parse_filtered(
+        file_contents: Union[str, Iterator[str]],
+        *keys: str,
+        filename='',
+        flags: Mapping[str, bool]=EmptyMapping,
+        allow_escapes: bool=True,
+    ) -> Iterator['Property']:
+        """Parse text, only producing the properties found at a specific path.
+
+        This is like parse(...).find_all(*keys), but other blocks are skipped
+        without building them. Like PropEventParser, flagged properties do
+        not replace the previous one.
+        """
+        if not keys:
+            raise ValueError("Cannot parse_filtered without keys!")
+        keys = tuple(key.casefold() for key in keys)
+        last = len(keys) - 1
+        events = PropEventParser(
+            file_contents, filename, flags,
+            allow_escapes=allow_escapes,
+        )
+        # The number of blocks we're inside, all of which match.
+        depth = 0
+        for event, name, value in events:
+            if event is PropEvent.BLOCK_END:
+                depth -= 1
+            elif depth > last or name.casefold() != keys[depth]:
+                if event is PropEvent.BLOCK_START:
+                    events.skip_block()
+            elif event is PropEvent.KEYVALUE:
+                if depth == last:
+                    yield Property(name, value)
+            elif depth == last:
+                yield events.read_block()
+            else:
+                depth += 1
+
+    @staticmethod
+    def parse_binary(file: BinaryIO) -> 'Property':
+        """Read a Property tree written by export_binary()."""
+        header = file.read(_fmt_bin_header.size)
+        if len(header) != _fmt_bin_header.size:
+            raise ValueError('Not a binary keyvalues file!')
+        magic, version, str_count, text_len, node_count = _fmt_bin_header.unpack(header)
+        if magic != b'SKVB':
+            raise ValueError('Not a binary keyvalues file!')
+        if version != BIN_FORMAT_VERSION:
+            raise ValueError('Unknown binary keyvalues version {}!'.format(version))
+
+        lengths = array('I')
+        lengths.frombytes(file.read(4 * str_count))
+        nodes = array('I')
+        nodes.frombytes(file.read(8 * node_count))
+        text_data = file.read(text_len)
+        if (
+            len(lengths) != str_count or len(nodes) != 2 * node_count
+            or len(text_data) != text_len
+        ):
+            raise ValueError('Binary keyvalues file is truncated!')
+        text = text_data.decode('utf8')
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+            nodes.byteswap()
+
+        # Index 0 is reserved for the None name.
+        strings = [''] * (str_count + 1)  # type: List[str]
+        pos = 0
+        for ind, length in enumerate(lengths, 1):
+            strings[ind] = text[pos:pos + length]
+            pos += length
+        # String index -> interned name and casefolded name.
+        names = {0: (None, None)}  # type: Dict[builtins.int, Tuple[Optional[str], Optional[str]]]
+
+        root = None  # type: Optional[Property]
+        # The blocks we're currently adding to, and the number of children
+        # they still need.
+        blocks = []  # type: List[List[Property]]
+        remaining = []  # type: List[builtins.int]
+        node_iter = iter(nodes)
+        for name_ind, value in zip(node_iter, node_iter):
+            # Skip calling __init__ for speed.
+            prop = Property.__new__(Property)
+            try:
+                prop.real_name, prop._folded_name = names[name_ind]
+            except KeyError:
+                name = sys.intern(strings[name_ind])
+                prop.real_name, prop._folded_name = names[name_ind] = (
+                    name, sys.intern(name.casefold()),
+                )
+            if blocks:
+                blocks[-1].append(prop)
+                remaining[-1] -= 1
+            elif root is None:
+                root = prop
+            else:
+                raise ValueError('Binary keyvalues file has multiple roots!')
+            if value & 1:
+                prop.value = []
+                if value > 1:
+                    blocks.append(prop.value)
+                    remaining.append(value >> 1)
+            else:
+                prop.value = strings[value >> 1]
+            while remaining and remaining[-1] == 0:
+                blocks.pop()
+                remaining.pop()
+        if root is None or blocks:
+            raise ValueError('Binary keyvalues file is truncated!')
+        return root
+
+    def export_binary(self, file: BinaryIO) -> None:
+        """Write this tree to a file in a compact binary format.
+
+        Each unique name and value is only stored once. This is much faster
+        to read back with Property.parse_binary() than the text format.
+        """
+        # Index 0 is reserved for the None name.
+        strings = {}  # type: Dict[str, builtins.int]
+        # Pairs of the name index, then either the value index << 1, or
+        # the child count << 1 | 1 for blocks.
+        nodes = array('I')
+        todo = [self]
+        while todo:
+            prop = todo.pop()
+            if prop.real_name is None:
+                nodes.append(0)
+            else:
+                try:
+                    nodes.append(strings[prop.real_name])
+                except KeyError:
+                    nodes.append(strings.setdefault(prop.real_name, len(strings) + 1))
+            if isinstance(prop.value, list):
+                nodes.append(len(prop.value) << 1 | 1)
+                todo.extend(reversed(prop.value))
+            else:
+                value = str(prop.value)
+                try:
+                    nodes.append(strings[value] << 1)
+                except KeyError:
+                    nodes.append(strings.setdefault(value, len(strings) + 1) << 1)
+
+        lengths = array('I', map(len, strings))
+        text = ''.join(strings).encode('utf8')
+        if sys.byteorder == 'big':
+            lengths.byteswap()
+            nodes.byteswap()
+        file.write(_fmt_bin_header.pack(
+            b'SKVB', BIN_FORMAT_VERSION,
+            len(lengths), len(text), len(nodes) // 2,
+        ))
+        file.write(lengths.tobytes())
+        file.write(nodes.tobytes())
+        file.write(text)
+
     def find_all(self, *keys) -> Iterator['Property']:
         """Search through the tree, yielding all properties that match a particular path.
 
@@ -894,7 +1066,7 @@ class Property:
                 for prop in self.value:
                     yield from prop.export()
             else:
-                yield '"' + self.real_name + '"\n'
+                yield '"' + escape_text(self.real_name) + '"\n'
                 yield '\t{\n'
                 yield from (
                     '\t' + line
@@ -906,6 +1078,74 @@ class Property:
             # We need to escape quotes and backslashes so they don't get detected.
             yield '"{}" "{}"\n'.format(escape_text(self.real_name), escape_text(self.value))
 
+    def serialise(
+        self,
+        file: Union[IO[str], IO[bytes]],
+        *,
+        compact: bool=False,
+        encoding: str='utf8',
+    ) -> None:
+        """Write this tree to a text or binary file.
+
+        This produces the same output as export(), but writes directly to
+        the file without building each line up level by level.
+        If compact is true, indentation is skipped and opening braces
+        are placed on the same line as the block name. Files which aren't
+        io.TextIOBase instances are treated as binary, and written using the
+        specified encoding.
+        """
+        if isinstance(file, io.TextIOBase):
+            write = file.write
+        else:
+            def write(text: str) -> None:
+                file.write(text.encode(encoding))
+
+        lines = []  # type: List[str]
+        # The indentation for each depth.
+        indents = ['']
+        # For each open block, the children left to write, the depth of
+        # them, and whether the block needs closing.
+        stack = [(iter([self]), 0, False)]  # type: List[Tuple[Iterator[Property], builtins.int, bool]]
+        while stack:
+            # After opening or closing blocks.
+            if len(lines) >= SERIALISE_BATCH:
+                write(''.join(lines))
+                lines.clear()
+            children, depth, needs_close = stack[-1]
+            for prop in children:
+                name = prop.real_name
+                value = prop.value
+                if name is not None and _NEEDS_ESCAPE(name):
+                    name = escape_text(name)
+                if isinstance(value, list):
+                    if name is None:
+                        # Root properties just output their children.
+                        stack.append((iter(value), depth, False))
+                        break
+                    if compact:
+                        lines.append('"' + name + '" {\n')
+                        stack.append((iter(value), 0, True))
+                        break
+                    while len(indents) <= depth + 1:
+                        indents.append(indents[-1] + '\t')
+                    lines.append(indents[depth] + '"' + name + '"\n')
+                    lines.append(indents[depth + 1] + '{\n')
+                    stack.append((iter(value), depth + 1, True))
+                    break
+                if _NEEDS_ESCAPE(value):
+                    value = escape_text(value)
+                lines.append(indents[depth] + '"' + name + '" "' + value + '"\n')
+                if len(lines) >= SERIALISE_BATCH:
+                    write(''.join(lines))
+                    lines.clear()
+            else:
+                # Finished this block, close it.
+                stack.pop()
+                if needs_close:
+                    lines.append(indents[depth] + '}\n')
+        if lines:
+            write(''.join(lines))
+
     def build(self) -> '_Builder':
         """Allows appending a tree to this property in a convenient way.
 
@@ -952,6 +1192,204 @@ class Property:
         return _Builder(self)
 
 
+class PropEvent(Enum):
+    """The kinds of events produced by PropEventParser."""
+    BLOCK_START = 'block_start'
+    KEYVALUE = 'keyvalue'
+    BLOCK_END = 'block_end'
+
+
+class PropEventParser:
+    """Parses keyvalues text incrementally, instead of building a tree.
+
+    Iterating produces (event, name, value) tuples. The name is the original
+    spelling, and for blocks the value is None. After a BLOCK_START event,
+    call skip_block() to skip its contents, or read_block() to build it
+    into a Property.
+
+    Properties disabled by [flags] are skipped, but unlike Property.parse()
+    enabled ones do not replace the previous property of the same name.
+    """
+    def __init__(
+        self,
+        file_contents: Union[str, Iterator[str]],
+        filename='',
+        flags: Mapping[str, bool]=EmptyMapping,
+        allow_escapes: bool=True,
+        single_line: bool=False,
+    ) -> None:
+        self.tokenizer = Tokenizer(
+            file_contents,
+            filename,
+            KeyValError,
+            string_bracket=True,
+            allow_escapes=allow_escapes,
+        )
+        self.flags = flags
+        self.single_line = single_line
+        # The names of the blocks we are currently in.
+        self._names = []  # type: List[str]
+        self._skip = False
+        self._events = self._parse()
+
+    def __iter__(self) -> 'PropEventParser':
+        return self
+
+    def __next__(self) -> Tuple[PropEvent, Optional[str], Optional[str]]:
+        return next(self._events)
+
+    def skip_block(self) -> None:
+        """Skip the contents of the block which was just opened.
+
+        No BLOCK_END event will be produced for it.
+        """
+        self._skip = True
+
+    def read_block(self) -> Property:
+        """Build the block which was just opened into a Property."""
+        if not self._names:
+            raise ValueError('No block is open!')
+        block = Property(self._names[-1], [])
+        # The blocks we are currently adding to.
+        open_blocks = [block]
+        for event, name, value in self:
+            if event is PropEvent.KEYVALUE:
+                open_blocks[-1].value.append(Property(name, value))
+            elif event is PropEvent.BLOCK_START:
+                child = Property(name, [])
+                open_blocks[-1].value.append(child)
+                open_blocks.append(child)
+            else:
+                open_blocks.pop()
+                if not open_blocks:
+                    return block
+        raise ValueError('Block was never closed!')
+
+    def _skip_tokens(self) -> None:
+        """Consume tokens until the current block is closed."""
+        BRACE_OPEN = Token.BRACE_OPEN
+        BRACE_CLOSE = Token.BRACE_CLOSE
+        depth = 1
+        for token_type, token_value in self.tokenizer:
+            if token_type is BRACE_OPEN:
+                depth += 1
+            elif token_type is BRACE_CLOSE:
+                depth -= 1
+                if depth == 0:
+                    return
+        raise KeyValError(
+            'End of text reached with remaining open sections.\n\n'
+            "File ended with at least one property that didn't "
+            'have an ending "}".',
+            self.tokenizer.filename,
+            line=None,
+        )
+
+    def _parse(self) -> Iterator[Tuple[PropEvent, Optional[str], Optional[str]]]:
+        """Produce the events."""
+        # Grab a reference to the token values, so we avoid global lookups.
+        STRING = Token.STRING
+        PROP_FLAG = Token.PROP_FLAG
+        NEWLINE = Token.NEWLINE
+        BRACE_OPEN = Token.BRACE_OPEN
+        BRACE_CLOSE = Token.BRACE_CLOSE
+        BLOCK_START = PropEvent.BLOCK_START
+        KEYVALUE = PropEvent.KEYVALUE
+        BLOCK_END = PropEvent.BLOCK_END
+
+        tokenizer = self.tokenizer
+        flags = self.flags
+        names = self._names
+
+        # The name of the block we require to be opened next, and whether
+        # its flag allows it.
+        block_name = None  # type: Optional[str]
+        block_enabled = True
+
+        for token_type, token_value in tokenizer:
+            if token_type is BRACE_OPEN:  # {
+                if block_name is None:
+                    raise tokenizer.error(
+                        'Property cannot have sub-section if it already '
+                        'has an in-line value.\n\n'
+                        'A "name" "value" line cannot then open a block.',
+                    )
+                name = block_name
+                block_name = None
+                if not block_enabled:
+                    self._skip_tokens()
+                    continue
+                names.append(name)
+                yield BLOCK_START, name, None
+                if self._skip:
+                    self._skip = False
+                    self._skip_tokens()
+                    names.pop()
+                continue
+            elif block_name is not None and token_type is not NEWLINE:
+                raise tokenizer.error(
+                    'Block opening ("{{") required!\n\n'
+                    'A single "name" on a line should next have a open brace '
+                    'to begin a block.',
+                )
+
+            if token_type is NEWLINE:
+                continue
+            elif token_type is STRING:   # "string"
+                prop_type, prop_value = tokenizer()
+                if prop_type is PROP_FLAG:  # "name" [flag]
+                    tokenizer.expect(NEWLINE)
+                    block_name = token_value
+                    block_enabled = _read_flag(flags, prop_value)
+                elif prop_type is STRING:  # "name" "value"
+                    flag_token, flag_val = tokenizer()
+                    if flag_token is PROP_FLAG:
+                        tokenizer.expect(NEWLINE)
+                        if _read_flag(flags, flag_val):
+                            yield KEYVALUE, token_value, prop_value
+                        continue
+                    elif flag_token is STRING and not self.single_line:
+                        raise tokenizer.error(
+                            "Cannot have multiple names on the same line!"
+                        )
+                    tokenizer.push_back(flag_token, flag_val)
+                    yield KEYVALUE, token_value, prop_value
+                else:
+                    # A block, re-evaluate the token in the next loop.
+                    block_name = token_value
+                    block_enabled = True
+                    tokenizer.push_back(prop_type, prop_value)
+            elif token_type is BRACE_CLOSE:  # }
+                try:
+                    name = names.pop()
+                except IndexError:
+                    raise tokenizer.error(
+                        'Too many closing brackets.\n\n'
+                        'An extra closing bracket was added which would '
+                        'close the outermost level.',
+                    ) from None
+                yield BLOCK_END, name, None
+            else:
+                raise tokenizer.error(token_type)
+
+        if block_name is not None:
+            raise KeyValError(
+                'Block opening ("{") required, but hit EOF!\n'
+                'A "name" line was located at the end of the file, which needs'
+                ' a {} block to follow.',
+                tokenizer.filename,
+                line=None,
+            )
+        if names:
+            raise KeyValError(
+                'End of text reached with remaining open sections.\n\n'
+                "File ended with at least one property that didn't "
+                'have an ending "}".',
+                tokenizer.filename,
+                line=None,
+            )
+
+
 class _Builder:
     """Allows constructing property trees using with: chains.
 
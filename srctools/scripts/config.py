@@ -161,6 +161,18 @@ OPTIONS = [
         'pack_vpk', False,
         """Prevent files in VPKs from being packed into the map.
     """),
+    Opt(
+        'pack_jobs', 0,
+        """The number of threads used to parse materials and models, to find
+        the files they depend on, and to compress packed files. If zero,
+        this uses the number of CPU cores.
+    """),
+    Opt(
+        'pack_compress', '',
+        """File extensions to compress when packing, separated by spaces
+        (for example ".vmt .txt .nut"). Other files are stored uncompressed.
+        Files already in the map are not recompressed.
+    """),
     Opt(
         'searchpaths', TYPE.RAW,
         """\
@@ -210,6 +222,26 @@ OPTIONS = [
         bother merging them. Should be greater than 1.
         """,
     ),
+    Opt(
+        'propcombine_jobs', 0,
+        """The number of combined models to compile with StudioMDL at once.
+        If zero, this uses the number of CPU cores.
+        """,
+    ),
+    Opt(
+        'propcombine_cache', '',
+        """If set, a folder where combined models are cached, so they can be
+        reused by other maps with identical groups of props. This is relative
+        to the game root.
+        """,
+    ),
+    Opt(
+        'propcombine_cache_size', 1024,
+        """The maximum size of the propcombine cache in megabytes. Once
+        exceeded, the least recently used models are removed. If zero, the
+        size is unlimited.
+        """,
+    ),
     Opt(
         'plugins', TYPE.RAW,
         """\
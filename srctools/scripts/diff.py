@@ -1,68 +1,95 @@
 """Compute diffs between files that srctools handles."""
 import sys
 import os
+import csv
+import json
 from pathlib import Path
-from srctools import VPK
-
-
-def diff_vpk(path1: Path, path2: Path):
-    """Compute the diff of two VPK files."""
-    vpk1 = VPK(path1)  # type: VPK
-    vpk2 = VPK(path2)  # type: VPK
-
-    files = set().union(vpk1.filenames(), vpk2.filenames())
+from typing import List, Optional
+
+from srctools.vpk import DiffKind, FileDiff, diff_vpk as diff_vpk_files
+
+
+def fmt_crc(crc: Optional[int]) -> Optional[str]:
+    """Format checksums as hex, for the machine-readable formats."""
+    return None if crc is None else '{:08x}'.format(crc)
+
+
+def write_diffs(table: List[FileDiff], fmt: str) -> None:
+    """Write out changes in one of the machine-readable formats, 'json' or 'csv'."""
+    if fmt == 'json':
+        json.dump([
+            {
+                'change': diff.kind.value,
+                'filename': diff.filename,
+                'old_size': diff.old_size,
+                'new_size': diff.new_size,
+                'old_crc': fmt_crc(diff.old_crc),
+                'new_crc': fmt_crc(diff.new_crc),
+            } for diff in table
+        ], sys.stdout, indent=1)
+        print()
+    elif fmt == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['change', 'filename', 'old_size', 'new_size', 'old_crc', 'new_crc'])
+        for diff in table:
+            writer.writerow([
+                diff.kind.value, diff.filename,
+                diff.old_size, diff.new_size,
+                fmt_crc(diff.old_crc) or '',
+                fmt_crc(diff.new_crc) or '',
+            ])
+    else:
+        raise ValueError('Unknown format "{}"!'.format(fmt))
 
-    table = []
 
-    for filename in files:
-        change = 'M'
+def diff_vpk(path1: Path, path2: Path, fmt: str='table', confirm: bool=False):
+    """Compute the diff of two VPK files.
 
-        try:
-            file1 = vpk1[filename]
-        except KeyError:
-            file1_size = 0
-            file1_crc = None
-            change = '+'
-        else:
-            file1_size = file1.size
-            file1_crc = file1.crc
-
-        try:
-            file2 = vpk2[filename]
-        except KeyError:
-            file2_size = 0
-            file2_crc = None
-            change = '-'
-        else:
-            file2_size = file2.size
-            file2_crc = file2.crc
+    The format can be 'table', 'json' or 'csv'.
+    """
+    table = diff_vpk_files(path1, path2, confirm)
 
-        if file1_crc == file2_crc:
-            continue  # Identical or both missing (latter should never happen).
+    if fmt != 'table':
+        write_diffs(table, fmt)
+        return
 
-        table.append((change, filename, file2_size - file1_size))
+    if not table:
+        print('No changes.')
+        return
 
-    table.sort()
+    table.sort(key=lambda diff: (diff.kind.value, diff.filename))
 
     # Figure out the longest name so we can format a table.
-    max_filename = max(len(t[1]) for t in table)
+    max_filename = max(len(diff.filename) for diff in table)
 
     header = '  | {0:^{1}} | Length'.format('Filename', max_filename)
     print(header)
     print('-' * len(header))
 
-    for change, filename, diff in table:
+    for diff in table:
         print('{type} | {file:<{size}} | {diff:+d}'.format(
-            type=change,
-            file=filename,
+            type=diff.kind.value,
+            file=diff.filename,
             size=max_filename,
-            diff=diff,
+            diff=diff.new_size - diff.old_size,
         ))
 
 
 def main():
     args = sys.argv[1:]
 
+    # Options for the output, before the filenames.
+    fmt = 'table'
+    confirm = False
+    while args and args[0].startswith('--'):
+        opt = args.pop(0)
+        if opt in ('--json', '--csv'):
+            fmt = opt[2:]
+        elif opt == '--confirm':
+            confirm = True
+        else:
+            return 'Unknown option "{}"!'.format(opt)
+
     ext = path = None
     if len(args) == 3:
         ext, fname1, fname2 = args
@@ -74,8 +101,8 @@ def main():
         fname1, fname2 = args
     else:
         return '''Usage:
-        diff.py file1 file2
-        diff.py ext file1 file2
+        diff.py [--json | --csv] [--confirm] file1 file2
+        diff.py [--json | --csv] [--confirm] ext file1 file2
         diff.py path old-file old-hex old-mode new-file new-hex new-mode
     '''
 
@@ -85,11 +112,20 @@ def main():
     file1 = Path(fname1)
     file2 = Path(fname2)
 
-    if not file1.is_file() or file1.stat().st_size == 0:
-        print('Create ' + str(path))
+    # The whole file is added or removed.
+    size1 = file1.stat().st_size if file1.is_file() else 0
+    size2 = file2.stat().st_size if file2.is_file() else 0
+    if size1 == 0:
+        if fmt == 'table':
+            print('Create ' + str(path))
+        else:
+            write_diffs([FileDiff(DiffKind.ADDED, str(path), 0, size2, None, None)], fmt)
         return
-    if not file2.is_file() or file2.stat().st_size == 0:
-        print('Delete ' + str(path))
+    if size2 == 0:
+        if fmt == 'table':
+            print('Delete ' + str(path))
+        else:
+            write_diffs([FileDiff(DiffKind.REMOVED, str(path), size1, 0, None, None)], fmt)
         return
 
     if ext is None:
@@ -99,12 +135,12 @@ def main():
         ext = file1.suffix
 
     try:
-        func = globals()['diff_' + ext.casefold()]
+        func = globals()['diff_' + ext.casefold().lstrip('.')]
     except KeyError:
         return 'Unknown extension "{}"!'.format(ext)
 
-    func(file1, file2)
+    func(file1, file2, fmt=fmt, confirm=confirm)
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
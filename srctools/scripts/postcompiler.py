@@ -4,6 +4,7 @@ import datetime
 import sys
 from logging import FileHandler
 from pathlib import Path
+from zipfile import ZipFile, ZIP_DEFLATED
 
 from srctools import Property
 from srctools.logger import init_logging, Formatter
@@ -13,11 +14,13 @@ from srctools.logger import init_logging, Formatter
 LOGGER = init_logging(Path(sys.argv[0]).with_name('postcompiler.log'))
 
 from srctools.fgd import FGD
+from srctools.filesys import PropCache
 from srctools.bsp import BSP, BSP_LUMPS
 from srctools.bsp_transform import run_transformations
 from srctools.packlist import PackList
 from srctools.scripts import config
 from srctools.compiler import propcombine
+from srctools.compiler.mdl_compiler import ModelCache
 from typing import List
 
 
@@ -71,6 +74,13 @@ def main(argv: List[str]) -> None:
 
     conf, game_info, fsys, pack_blacklist, plugins = config.parse(path)
 
+    fsys.prop_cache = PropCache()
+    prop_cache_path = conf.path.with_name('srctools_prop_cache.bin')
+    try:
+        fsys.prop_cache.load(prop_cache_path)
+    except (FileNotFoundError, ValueError):
+        pass
+
     fsys.open_ref()
 
     packlist = PackList(fsys)
@@ -90,78 +100,106 @@ def main(argv: List[str]) -> None:
     LOGGER.info('Done! ({} sounds)', len(packlist.soundscripts))
 
     LOGGER.info('Reading BSP...')
-    bsp_file = BSP(path)
-
-    LOGGER.info('Reading entities...')
-    vmf = bsp_file.read_ent_data()
-    LOGGER.info('Done!')
+    with BSP(path, lazy=True) as bsp_file:
+        LOGGER.info('Reading entities...')
+        vmf = bsp_file.read_ent_data()
+        LOGGER.info('Done!')
 
-    studiomdl_path = conf.get(str, 'studiomdl')
-    if studiomdl_path:
-        studiomdl_loc = (game_info.root / studiomdl_path).resolve()
-        if not studiomdl_loc.exists():
-            LOGGER.warning('No studiomdl found at "{}"!', studiomdl_loc)
+        studiomdl_path = conf.get(str, 'studiomdl')
+        if studiomdl_path:
+            studiomdl_loc = (game_info.root / studiomdl_path).resolve()
+            if not studiomdl_loc.exists():
+                LOGGER.warning('No studiomdl found at "{}"!', studiomdl_loc)
+                studiomdl_loc = None
+        else:
+            LOGGER.warning('No studiomdl path provided.')
             studiomdl_loc = None
-    else:
-        LOGGER.warning('No studiomdl path provided.')
-        studiomdl_loc = None
-
-    for plugin in plugins:
-        plugin.load()
-
-    use_comma_sep = conf.get(bool, 'use_comma_sep')
-    if use_comma_sep is None:
-        # Guess the format, by picking whatever the first output uses.
-        for ent in vmf.entities:
-            for out in ent.outputs:
-                use_comma_sep = out.comma_sep
-                break
-        if use_comma_sep is None:
-            LOGGER.warning('No outputs in map, could not determine BSP I/O format!')
-            LOGGER.warning('Set "use_comma_sep" in srctools.vdf.')
-        use_comma_sep = False
 
-    run_transformations(vmf, fsys, packlist, bsp_file, game_info, studiomdl_loc)
+        for plugin in plugins:
+            plugin.load()
 
-    if studiomdl_loc is not None and args.propcombine:
-        LOGGER.info('Combining props...')
-        propcombine.combine(
+        use_comma_sep = conf.get(bool, 'use_comma_sep')
+        if use_comma_sep is None:
+            # Guess the format, by picking whatever the first output uses.
+            for ent in vmf.entities:
+                for out in ent.outputs:
+                    use_comma_sep = out.comma_sep
+                    break
+            if use_comma_sep is None:
+                LOGGER.warning('No outputs in map, could not determine BSP I/O format!')
+                LOGGER.warning('Set "use_comma_sep" in srctools.vdf.')
+            use_comma_sep = False
+
+        run_transformations(vmf, fsys, packlist, bsp_file, game_info, studiomdl_loc)
+
+        if studiomdl_loc is not None and args.propcombine:
+            LOGGER.info('Combining props...')
+            cache_folder = conf.get(str, 'propcombine_cache')
+            if cache_folder:
+                model_cache = ModelCache(
+                    game_info.root / cache_folder,
+                    conf.get(int, 'propcombine_cache_size') * 1024 * 1024,
+                )
+            else:
+                model_cache = None
+            propcombine.combine(
+                bsp_file,
+                vmf,
+                packlist,
+                game_info,
+                studiomdl_loc,
+                [
+                    game_info.root / folder
+                    for folder in
+                    conf.get(Property, 'propcombine_qc_folder').as_array(conv=Path)
+                ],
+                conf.get(int, 'propcombine_auto_range'),
+                conf.get(int, 'propcombine_min_cluster'),
+                debug_tint=args.showgroups,
+                compile_jobs=conf.get(int, 'propcombine_jobs'),
+                model_cache=model_cache,
+            )
+            LOGGER.info('Done!')
+        else:  # Strip these if they're present.
+            for ent in vmf.by_class['comp_propcombine_set']:
+                 ent.remove()
+
+        bsp_file.lumps[BSP_LUMPS.ENTITIES].data = bsp_file.write_ent_data(vmf, use_comma_sep)
+
+        if conf.get(bool, 'auto_pack') and args.allow_pack:
+            LOGGER.info('Analysing packable resources...')
+            packlist.pack_fgd(vmf, fgd)
+
+            packlist.pack_from_bsp(bsp_file)
+
+            packlist.eval_dependencies(
+                conf.get(int, 'pack_jobs'),
+                conf.path.with_name('srctools_dep_cache.bin'),
+            )
+
+        packlist.pack_into_zip(
             bsp_file,
-            vmf,
-            packlist,
-            game_info,
-            studiomdl_loc,
-            [
-                game_info.root / folder
-                for folder in
-                conf.get(Property, 'propcombine_qc_folder').as_array(conv=Path)
-            ],
-            conf.get(int, 'propcombine_auto_range'),
-            conf.get(int, 'propcombine_min_cluster'),
-            debug_tint=args.showgroups,
+            blacklist=pack_blacklist,
+            ignore_vpk=False,
+            compression={
+                '.' + ext.lstrip('.'): ZIP_DEFLATED
+                for ext in conf.get(str, 'pack_compress').casefold().split()
+            },
+            jobs=conf.get(int, 'pack_jobs'),
+            manifest_file=conf.path.with_name('srctools_pack_manifest.vdf'),
         )
-        LOGGER.info('Done!')
-    else:  # Strip these if they're present.
-        for ent in vmf.by_class['comp_propcombine_set']:
-             ent.remove()
-
-    bsp_file.lumps[BSP_LUMPS.ENTITIES].data = bsp_file.write_ent_data(vmf, use_comma_sep)
-
-    if conf.get(bool, 'auto_pack') and args.allow_pack:
-        LOGGER.info('Analysing packable resources...')
-        packlist.pack_fgd(vmf, fgd)
-
-        packlist.pack_from_bsp(bsp_file)
-
-        packlist.eval_dependencies()
 
-    packlist.pack_into_zip(bsp_file, blacklist=pack_blacklist, ignore_vpk=False)
+        with bsp_file.lumps[BSP_LUMPS.PAKFILE].open_data() as pak_data, ZipFile(pak_data) as pak_zip:
+            LOGGER.info('Packed files: \n{}'.format('\n'.join(pak_zip.namelist())))
 
-    with bsp_file.packfile() as pak_zip:
-        LOGGER.info('Packed files: \n{}'.format('\n'.join(pak_zip.namelist())))
+        LOGGER.info('Writing BSP...')
+        # Write a new file and swap it in, so the map isn't corrupted
+        # if interrupted. Unchanged lumps are copied without loading.
+        bsp_file.save()
 
-    LOGGER.info('Writing BSP...')
-    bsp_file.save()
+    # Drop files other maps or older configs used, so it doesn't grow forever.
+    fsys.prop_cache.prune()
+    fsys.prop_cache.save(prop_cache_path)
 
     LOGGER.info("srctools VRAD hook finished!")
 
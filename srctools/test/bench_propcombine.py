@@ -0,0 +1,52 @@
+"""Benchmarks propcombine's automatic grouping on synthetic maps.
+
+Run with "python -m srctools.test.bench_propcombine".
+"""
+import random
+import time
+from typing import List
+
+from srctools import Vec
+from srctools.bsp import StaticProp
+from srctools.compiler.propcombine import group_props_auto
+
+
+def make_props(count: int, size: float, seed: int=1) -> List[StaticProp]:
+    """Generate props scattered in clumps across a map."""
+    rand = random.Random(seed)
+    props = []
+    while len(props) < count:
+        # Detail props are usually placed in small clumps.
+        center = Vec(
+            rand.uniform(-size, size),
+            rand.uniform(-size, size),
+            rand.uniform(-size / 8, size / 8),
+        )
+        for _ in range(rand.randint(1, 12)):
+            props.append(StaticProp(
+                'models/props/rock.mdl',
+                center + Vec(rand.gauss(0, 96), rand.gauss(0, 96), rand.gauss(0, 16)),
+                Vec(0, rand.uniform(0, 360), 0),
+                1.0,
+                [],
+                6,
+            ))
+    return props[:count]
+
+
+def main() -> None:
+    """Time grouping for several map sizes."""
+    for count in [10_000, 25_000, 50_000]:
+        props = make_props(count, 16384)
+        rejected = []  # type: List[StaticProp]
+        start = time.perf_counter()
+        groups = list(group_props_auto({(): props}, rejected, 256, 2))
+        duration = time.perf_counter() - start
+        print('{:>6} props: {:>5} groups, {:>6} rejected in {:.3f}s'.format(
+            count, len(groups), len(rejected), duration,
+        ))
+        assert sum(map(len, groups)) + len(rejected) == count
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmarks tokenizing large VMFs from text and from raw bytes.
+
+Run with "python -m srctools.test.bench_tokenizer".
+"""
+import mmap
+import os
+import random
+import tempfile
+import time
+from typing import Any, Callable
+
+from srctools import Vec, VMF
+from srctools.tokenizer import C_Tokenizer, Py_Tokenizer
+
+
+def make_vmf(brushes: int, seed: int=1) -> bytes:
+    """Generate a VMF with lots of brushes and entities."""
+    rand = random.Random(seed)
+    vmf = VMF()
+    for i in range(brushes):
+        pos = Vec(
+            rand.randint(-256, 256) * 32,
+            rand.randint(-256, 256) * 32,
+            rand.randint(-64, 64) * 32,
+        )
+        prism = vmf.make_prism(pos, pos + (64, 64, 128), 'tools/toolsnodraw')
+        if i % 4 == 0:
+            ent = vmf.create_ent(
+                'func_brush',
+                origin=pos,
+                targetname='brush_{}'.format(i),
+                solidity=rand.randint(0, 2),
+            )
+            ent.solids.append(prism.solid)
+        else:
+            vmf.add_brush(prism.solid)
+    return vmf.export().encode('utf8')
+
+
+def time_it(func: Callable[[], Any]) -> float:
+    """Return the best of several runs of this function."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Compare the str and binary input modes of each tokenizer."""
+    tokenizers = [('Python', Py_Tokenizer)]
+    if C_Tokenizer is not Py_Tokenizer:
+        tokenizers.insert(0, ('Cython', C_Tokenizer))
+    else:
+        print('Cython tokenizer not compiled!')
+
+    for brushes in [1_000, 5_000]:
+        data = make_vmf(brushes)
+        size = len(data) / 1024 / 1024
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, 'bench.vmf')
+            with open(path, 'wb') as f:
+                f.write(data)
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                for name, tok_cls in tokenizers:
+                    modes = [
+                        ('str', lambda: list(tok_cls(data.decode('utf8')))),
+                        ('bytes', lambda: list(tok_cls(data, encoding='utf8'))),
+                        ('mmap', lambda: list(tok_cls(view, encoding='utf8'))),
+                    ]
+                    for mode, func in modes:
+                        duration = time_it(func)
+                        print('{:>6}, {:>5.1f}MB, {:>6}: {:.3f}s = {:>6.1f}MB/s'.format(
+                            name, size, mode, duration, size / duration,
+                        ))
+
+
+if __name__ == '__main__':
+    main()
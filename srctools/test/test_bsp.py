@@ -0,0 +1,192 @@
+"""Test the BSP reader and writer."""
+import io
+import shutil
+import tempfile
+
+import pytest
+
+import srctools.test
+from srctools import Vec, bsp as bsp_mod
+from srctools.bsp import (
+    BSP, BSP_LUMPS,
+    StaticProp, StaticPropFlags, StaticPropTable,
+)
+
+try:
+    from importlib.resources import path as import_file_path
+except ImportError:
+    from importlib_resources import path as import_file_path
+
+
+def copy_bsp(tmp_path, name='orig.bsp') -> str:
+    """Copy the test BSP into the temporary folder."""
+    dest = tmp_path / name
+    with import_file_path(srctools.test, 'rot_main.bsp') as bsp_path:
+        shutil.copy(bsp_path, dest)
+    return str(dest)
+
+
+def test_lazy_roundtrip(tmp_path) -> None:
+    """Check lazy and normal loading produce identical files."""
+    filename = copy_bsp(tmp_path)
+    BSP(filename).save(str(tmp_path / 'normal.bsp'))
+    with BSP(filename, lazy=True) as bsp:
+        assert bsp.lumps[BSP_LUMPS.LIGHTING]._data is None
+        bsp.save(str(tmp_path / 'lazy.bsp'))
+
+    assert (tmp_path / 'normal.bsp').read_bytes() == (tmp_path / 'lazy.bsp').read_bytes()
+
+
+def test_lazy_overwrite(tmp_path) -> None:
+    """Check a lazy BSP can be saved over its own file, then saved again."""
+    filename = copy_bsp(tmp_path)
+    ent_data = BSP(filename).lumps[BSP_LUMPS.ENTITIES].data
+
+    with BSP(filename, lazy=True) as bsp:
+        vmf = bsp.read_ent_data()
+        vmf.spawn['message'] = 'Lazy test'
+        bsp.lumps[BSP_LUMPS.ENTITIES].data = new_ents = bsp.write_ent_data(vmf)
+        bsp.save()
+        # Unloaded lumps have to now be read from the new file.
+        bsp.save(str(tmp_path / 'second.bsp'))
+
+    assert new_ents != ent_data
+    assert BSP(str(tmp_path / 'second.bsp')).lumps[BSP_LUMPS.ENTITIES].data == new_ents
+    assert (tmp_path / 'second.bsp').read_bytes() == (tmp_path / 'orig.bsp').read_bytes()
+
+
+def test_save_in_place(tmp_path) -> None:
+    """Check in-place saving produces the same data as a full rewrite."""
+    in_place = copy_bsp(tmp_path, 'in_place.bsp')
+    rewrite = copy_bsp(tmp_path, 'rewrite.bsp')
+
+    for filename, use_in_place in [(in_place, True), (rewrite, False)]:
+        with BSP(filename, lazy=True) as bsp:
+            ents = bsp.lumps[BSP_LUMPS.ENTITIES]
+            assert not ents.dirty
+            ents.data = ents.data[:-1] + b'{\n"classname" "info_null"\n}\n\x00'
+            assert ents.dirty
+            with bsp.packfile() as zipfile:
+                zipfile.writestr('test.txt', 'Some data')
+            bsp.save(in_place=use_in_place)
+            assert not ents.dirty
+
+    bsp_in_place = BSP(in_place)
+    bsp_rewrite = BSP(rewrite)
+    for lump in BSP_LUMPS:
+        assert bsp_in_place.lumps[lump].data == bsp_rewrite.lumps[lump].data, lump
+    for lump_id, game_lump in bsp_rewrite.game_lumps.items():
+        assert bsp_in_place.game_lumps[lump_id].data == game_lump.data, lump_id
+
+
+def test_save_in_place_relocate(tmp_path, monkeypatch) -> None:
+    """Check the packfile is moved without loading it, when a lump grows."""
+    monkeypatch.setattr(bsp_mod, 'COPY_BLOCK_SIZE', 1000)
+    filename = copy_bsp(tmp_path)
+    orig = BSP(filename)
+    new_data = orig.lumps[BSP_LUMPS.OCCLUSION].data + bytes(range(256)) * 10
+    with BSP(filename, lazy=True) as bsp:
+        pakfile = bsp.lumps[BSP_LUMPS.PAKFILE]
+        old_pos = pakfile._location[0]
+        bsp.lumps[BSP_LUMPS.OCCLUSION].data = new_data
+        assert bsp._save_in_place()
+        assert pakfile._data is None
+        assert pakfile._location[0] == old_pos + len(new_data)
+        assert pakfile.data == orig.lumps[BSP_LUMPS.PAKFILE].data
+
+    saved = BSP(filename)
+    assert saved.lumps[BSP_LUMPS.OCCLUSION].data == new_data
+    for lump in BSP_LUMPS:
+        if lump is not BSP_LUMPS.OCCLUSION:
+            assert saved.lumps[lump].data == orig.lumps[lump].data, lump
+    for lump_id, game_lump in orig.game_lumps.items():
+        assert saved.game_lumps[lump_id].data == game_lump.data, lump_id
+
+
+@pytest.mark.parametrize('src, dest', [(10, 250), (250, 10), (100, 100)])
+def test_move_range(src: int, dest: int, monkeypatch) -> None:
+    """Check overlapping sections of a file can be moved."""
+    monkeypatch.setattr(bsp_mod, 'COPY_BLOCK_SIZE', 64)
+    data = bytes(range(256)) * 2
+    file = io.BytesIO(data + bytes(300))
+    bsp_mod._move_range(file, src, dest, 200)
+    assert file.getvalue()[dest:dest + 200] == data[src:src + 200]
+
+
+def test_lump_data_file(tmp_path) -> None:
+    """Check lumps can be read as files, and replaced with a temporary file."""
+    filename = copy_bsp(tmp_path)
+    orig = BSP(filename)
+    with BSP(filename, lazy=True) as bsp:
+        pakfile = bsp.lumps[BSP_LUMPS.PAKFILE]
+        with pakfile.open_data() as f:
+            assert f.read(4) == orig.lumps[BSP_LUMPS.PAKFILE].data[:4]
+            f.seek(-10, io.SEEK_END)
+            assert f.read() == orig.lumps[BSP_LUMPS.PAKFILE].data[-10:]
+        # Not loaded by reading it.
+        assert pakfile._data is None
+
+        temp = tempfile.TemporaryFile()
+        temp.write(b'new pakfile data')
+        pakfile.set_data_file(temp)
+        assert pakfile.dirty
+        assert pakfile._data_len() == 16
+        with pakfile.open_data() as f:
+            assert f.read() == b'new pakfile data'
+        bsp.save()
+        assert temp.closed
+        assert pakfile.data == b'new pakfile data'
+
+    saved = BSP(filename)
+    assert saved.lumps[BSP_LUMPS.PAKFILE].data == b'new pakfile data'
+    for lump in BSP_LUMPS:
+        if lump is not BSP_LUMPS.PAKFILE:
+            assert saved.lumps[lump].data == orig.lumps[lump].data, lump
+
+
+@pytest.mark.parametrize('version', range(4, 12))
+def test_static_prop_table(version: int) -> None:
+    """Check static props survive a round trip through the table."""
+    props = [
+        StaticProp(
+            'models/props/prop_{}.mdl'.format(i % 3),
+            Vec(i, 2.5, -3.0),
+            Vec(0, 15 * i, 0),
+            1.0,
+            [i, i + 1],
+            6,
+            StaticPropFlags.NO_SHADOW,
+            skin=i % 2,
+            tint=Vec(10, 20, 30),
+        )
+        for i in range(12)
+    ]
+    data = StaticPropTable.from_props(props, version).export()
+    table = StaticPropTable.parse(data, version)
+    assert len(table) == 12
+    assert table.export() == data
+    for orig, prop in zip(props, table):
+        assert prop.model == orig.model
+        assert prop.origin == orig.origin
+        assert prop.angles == orig.angles
+        assert prop.visleafs == orig.visleafs
+        assert prop.flags is StaticPropFlags.NO_SHADOW
+        assert prop.skin == orig.skin
+        if version >= 7:
+            assert prop.tint == Vec(10, 20, 30)
+
+    assert table.model_skins() == {
+        'models/props/prop_0.mdl': {0, 1},
+        'models/props/prop_1.mdl': {0, 1},
+        'models/props/prop_2.mdl': {0, 1},
+    }
+
+    subset = table.filter([prop.skin == 1 for prop in props])
+    assert len(subset) == 6
+    subset.update(range(3), model='models/props/other.mdl', solidity=0)
+    subset = StaticPropTable.parse(subset.export(), version)
+    assert [prop.model for prop in subset] == ['models/props/other.mdl'] * 3 + [
+        'models/props/prop_{}.mdl'.format(i % 3) for i in range(7, 12, 2)
+    ]
+    assert [prop.solidity for prop in subset] == [0, 0, 0, 6, 6, 6]
+    assert [prop.visleafs for prop in subset] == [[i, i + 1] for i in range(1, 12, 2)]
@@ -0,0 +1,208 @@
+"""Test the FGD parser and engine database."""
+import hashlib
+import io
+import lzma
+from pathlib import Path
+
+import pytest
+
+import srctools
+from srctools import fgd as fgd_mod
+from srctools.fgd import FGD, EntityDef, EntityTypes
+from srctools.filesys import VirtualFileSystem
+
+
+@pytest.fixture
+def no_dbase(monkeypatch) -> None:
+    """Make engine_dbase() load the database again."""
+    monkeypatch.setattr(fgd_mod, '_ENGINE_FGD', None)
+
+
+def test_engine_dbase_memoised(no_dbase, monkeypatch) -> None:
+    """Test the database is only loaded once."""
+    loads = []
+    orig_load = FGD._load_engine_dbase.__func__  # type: ignore
+
+    def load(cls, cache):
+        """Count the number of loads."""
+        loads.append(cache)
+        return orig_load(cls, cache)
+
+    monkeypatch.setattr(FGD, '_load_engine_dbase', classmethod(load))
+    first = FGD.engine_dbase()
+    second = FGD.engine_dbase()
+    assert loads == [None]
+    assert first is not second
+    assert first.entities._original is second.entities._original
+    assert len(first) == len(second) > 0
+
+
+def test_engine_dbase_cache(no_dbase, tmp_path: Path, monkeypatch) -> None:
+    """Test the decompressed database can be cached on disk."""
+    cache = tmp_path / 'fgd_cache.bin'
+    classnames = set(FGD.engine_dbase(cache).entities)
+    with open(str(Path(srctools.__file__).parent / 'fgd.lzma'), 'rb') as f:
+        digest = hashlib.sha1(f.read()).digest()
+    assert cache.read_bytes()[:len(digest)] == digest
+
+    # Now it's loaded from the cache without decompressing.
+    def decompress(data: bytes) -> bytes:
+        """The cache should be used."""
+        raise AssertionError('Decompressed!')
+
+    monkeypatch.setattr(fgd_mod, '_ENGINE_FGD', None)
+    monkeypatch.setattr(lzma, 'decompress', decompress)
+    assert set(FGD.engine_dbase(cache).entities) == classnames
+    monkeypatch.undo()
+
+    # An invalid cache is rebuilt.
+    cache.write_bytes(digest + b'garbage')
+    monkeypatch.setattr(fgd_mod, '_ENGINE_FGD', None)
+    assert set(FGD.engine_dbase(cache).entities) == classnames
+    assert cache.read_bytes()[:len(digest)] == digest
+    assert cache.stat().st_size > 1024
+
+
+def test_engine_dbase_copy_on_write() -> None:
+    """Test changing one copy of the database doesn't affect others."""
+    first = FGD.engine_dbase()
+    second = FGD.engine_dbase()
+    original = fgd_mod._ENGINE_FGD.entities
+
+    # Empty value lists are preserved when copied.
+    assert list(first['_cbaseentity_'].kv['spawnflags'].known_options()) == []
+    assert first['_cbaseentity_'].kv['spawnflags'] == original['_cbaseentity_'].kv['spawnflags']
+
+    light = first['light']
+    assert light is first['light']
+    assert light is not original['light']
+    light.keyvalues.clear()
+    assert second['light'].keyvalues
+    assert original['light'].keyvalues
+    # Bases are copied along with the entity.
+    for base in light.bases:
+        assert base is first[base.classname]
+        assert base is not original[base.classname.casefold()]
+
+    del first.entities['prop_static']
+    assert 'prop_static' not in first.entities
+    with pytest.raises(KeyError):
+        first['prop_static']
+    assert 'prop_static' in second.entities
+
+    custom = EntityDef(EntityTypes.POINT)
+    custom.classname = 'custom_ent'
+    first.entities['custom_ent'] = custom
+    assert first['custom_ent'] is custom
+    assert 'custom_ent' in first.entities
+    assert 'custom_ent' in list(first.entities)
+    assert 'custom_ent' not in second.entities
+    assert len(first) == len(second)
+
+
+TEST_FGD = '''
+@BaseClass = Base
+[
+    spawnflags(flags) =
+    [
+        1 : "First" : 1
+        4 : "Third" : 0
+    ]
+    input Kill(void) : "Remove."
+]
+@PointClass base(Base) = point_ent : "A point entity."
+[
+    mode(choices) : "Mode" : "a" =
+    [
+        "a" : "Option A"
+        "b" : "Option B"
+    ]
+    target(target_destination) : "Target"
+    output OnTrigger(void) : "Fired."
+]
+@SolidClass base(Base) = brush_ent : "A brush entity."
+[
+    speed(float) : "Speed" : "1.5"
+]
+'''
+
+
+def ent_key(ent: EntityDef) -> tuple:
+    """Produce the data stored in the binary format, which excludes descriptions."""
+    return (
+        ent.type, ent.classname,
+        {
+            name: {
+                tags: (kv.type, kv.disp_name, kv.default, kv.val_list, kv.readonly)
+                for tags, kv in tag_map.items()
+            } for name, tag_map in ent.keyvalues.items()
+        },
+        {
+            name.casefold(): {tags: io.type for tags, io in tag_map.items()}
+            for name, tag_map in ent.inputs.items()
+        },
+        {
+            name.casefold(): {tags: io.type for tags, io in tag_map.items()}
+            for name, tag_map in ent.outputs.items()
+        },
+        [base.classname for base in ent.bases],
+    )
+
+
+def parse_test_fgd() -> FGD:
+    """Parse the test FGD."""
+    fsys = VirtualFileSystem({'test.fgd': TEST_FGD})
+    with fsys:
+        return FGD.parse(fsys['test.fgd'])
+
+
+def test_binary_roundtrip() -> None:
+    """Test the binary format is indexed, and decoded when entities are used."""
+    orig = parse_test_fgd()
+    buf = io.BytesIO()
+    orig.serialise(buf)
+    buf.seek(0)
+    fgd = FGD.unserialise(buf)
+    assert isinstance(fgd.entities, fgd_mod._LazyEntities)
+    assert set(fgd.entities) == {'base', 'point_ent', 'brush_ent'}
+    assert len(fgd) == 3
+    assert not fgd.entities._decoded
+
+    point = fgd['point_ent']
+    # The base is decoded along with the entity.
+    assert set(fgd.entities._decoded) == {'base', 'point_ent'}
+    assert point.bases == [fgd['base']]
+    assert ent_key(point) == ent_key(orig['point_ent'])
+    for classname in orig.entities:
+        assert ent_key(fgd[classname]) == ent_key(orig[classname])
+    assert fgd['brush_ent'].bases[0] is point.bases[0]
+
+    del fgd.entities['brush_ent']
+    assert 'brush_ent' not in fgd.entities
+    assert set(fgd.entities) == {'base', 'point_ent'}
+
+
+def test_binary_version_5() -> None:
+    """Test the previous binary format without an index can still be read."""
+    orig = parse_test_fgd()
+    dictionary = fgd_mod.BinStrDict()
+    ent_data = io.BytesIO()
+    for ent in orig.entities.values():
+        ent.serialise(ent_data, dictionary)
+    buf = io.BytesIO()
+    buf.write(b'FGD' + fgd_mod._fmt_header.pack(
+        5, orig.map_size_min, orig.map_size_max, len(orig.entities),
+    ))
+    dictionary.serialise(buf)
+    buf.write(ent_data.getvalue())
+    buf.seek(0)
+
+    fgd = FGD.unserialise(buf)
+    assert isinstance(fgd.entities, dict)
+    assert set(fgd.entities) == set(orig.entities)
+    for classname in orig.entities:
+        assert ent_key(fgd[classname]) == ent_key(orig[classname])
+
+    buf = io.BytesIO(b'FGD' + fgd_mod._fmt_header.pack(4, 0.0, 0.0, 0))
+    with pytest.raises(TypeError):
+        FGD.unserialise(buf)
@@ -0,0 +1,333 @@
+"""Test the filesystem implementations."""
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from srctools.filesys import FileSystemChain, PropCache, RawFileSystem, VPKFileSystem
+from srctools.property_parser import Property
+from srctools.vpk import VPK
+
+
+def bump_mtime(path: Path) -> None:
+    """Change the modification time of a file or folder.
+
+    Timestamps can be too coarse to show changes made immediately after
+    scanning, so force it to be different.
+    """
+    mtime = path.stat().st_mtime_ns
+    os.utime(str(path), ns=(mtime, mtime + 1_000_000_000))
+
+
+def make_tree(root: Path) -> None:
+    """Create some files to test with."""
+    (root / 'Sub' / 'Deep').mkdir(parents=True)
+    (root / 'top.txt').write_text('top')
+    (root / 'Sub' / 'Mixed_Case.TXT').write_text('mixed')
+    (root / 'Sub' / 'Deep' / 'file.bin').write_bytes(b'deep')
+
+
+def test_raw_indexed_lookup(tmp_path: Path) -> None:
+    """Test lookups in an indexed folder are case-insensitive."""
+    make_tree(tmp_path)
+    fsys = RawFileSystem(tmp_path, indexed=True)
+    with fsys:
+        assert 'top.txt' in fsys
+        assert 'TOP.txt' in fsys
+        assert 'sub/mixed_case.txt' in fsys
+        assert 'SUB\\DEEP\\FILE.BIN' in fsys
+        assert 'sub/deep' not in fsys
+        assert 'missing.txt' not in fsys
+        # The real name is produced.
+        assert fsys['sub/mixed_case.txt'].path == 'Sub/Mixed_Case.TXT'
+        with fsys.open_str('SUB/MIXED_CASE.txt') as f:
+            assert f.read() == 'mixed'
+        with fsys.open_bin('sub/deep/FILE.bin') as f:
+            assert f.read() == b'deep'
+        with pytest.raises(FileNotFoundError):
+            fsys['sub/missing.txt']
+        with pytest.raises(ValueError):
+            fsys['../outside.txt']
+
+
+def test_raw_indexed_changes(tmp_path: Path) -> None:
+    """Test adding and removing files and folders are noticed."""
+    make_tree(tmp_path)
+    fsys = RawFileSystem(tmp_path, indexed=True)
+    with fsys:
+        assert 'new.txt' not in fsys
+        (tmp_path / 'New.txt').write_text('new')
+        bump_mtime(tmp_path)
+        assert 'new.txt' in fsys
+
+        os.remove(str(tmp_path / 'top.txt'))
+        bump_mtime(tmp_path)
+        assert 'top.txt' not in fsys
+
+        (tmp_path / 'Sub' / 'Added').mkdir()
+        (tmp_path / 'Sub' / 'Added' / 'a.txt').write_text('a')
+        bump_mtime(tmp_path / 'Sub')
+        assert 'sub/added/a.txt' in fsys
+        assert fsys['sub/added/A.TXT'].path == 'Sub/Added/a.txt'
+
+        (tmp_path / 'Sub' / 'Deep' / 'file.bin').unlink()
+        (tmp_path / 'Sub' / 'Deep').rmdir()
+        bump_mtime(tmp_path / 'Sub')
+        assert 'sub/deep/file.bin' not in fsys
+        assert sorted(file.path for file in fsys.walk_folder('sub')) == [
+            'Sub/Added/a.txt', 'Sub/Mixed_Case.TXT',
+        ]
+
+    # Reopening picks up changes made while closed.
+    (tmp_path / 'Sub' / 'Added' / 'b.txt').write_text('b')
+    bump_mtime(tmp_path / 'Sub' / 'Added')
+    with fsys:
+        assert 'sub/added/b.txt' in fsys
+
+
+def test_raw_indexed_walk(tmp_path: Path) -> None:
+    """Test walking an indexed folder matches the non-indexed mode."""
+    make_tree(tmp_path)
+    (tmp_path / 'Sub' / 'other.txt').write_text('other')
+    # Symlinked folders aren't entered, which also prevents loops.
+    try:
+        os.symlink(str(tmp_path / 'Sub'), str(tmp_path / 'Sub' / 'Deep' / 'loop'))
+    except (OSError, NotImplementedError):
+        pass
+
+    for folder in ['', 'Sub', 'Sub/Deep', 'Missing']:
+        with RawFileSystem(tmp_path) as fsys:
+            expected = sorted(file.path for file in fsys.walk_folder(folder))
+        with RawFileSystem(tmp_path, indexed=True) as fsys:
+            assert sorted(file.path for file in fsys.walk_folder(folder)) == expected
+            assert sorted(file.path for file in fsys.walk_folder(folder.upper())) == expected
+
+
+def test_vpk_reopen(tmp_path: Path) -> None:
+    """Test reopening a VPK system reuses the directory unless it changed."""
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w') as vpk:
+        vpk.add_file('scripts/a.txt', b'first')
+        vpk.add_file('scripts/b.txt', b'data' * 1000)
+    fsys = VPKFileSystem(path)
+    with fsys:
+        vpk = fsys._ref
+        file = fsys['SCRIPTS/A.txt']
+    with fsys:
+        assert fsys._ref is vpk
+    # Files can still be read once it's closed.
+    with file.open_bin() as f:
+        assert f.read() == b'first'
+    assert not vpk._arch_handles
+
+    with VPK(str(path), mode='a') as vpk_write:
+        vpk_write.add_file('scripts/c.txt', b'new')
+    bump_mtime(path)
+    with fsys:
+        assert fsys._ref is not vpk
+        assert 'scripts/c.txt' in fsys
+        with fsys['scripts/b.txt'].open_bin() as f:
+            assert f.read() == b'data' * 1000
+
+
+def test_chain_index(tmp_path: Path) -> None:
+    """Test indexed chains find the same files as unindexed ones."""
+    write = {
+        'first/shared.txt': 'first',
+        'first/only_first.txt': 'first',
+        'second/sub/shared.txt': 'second',
+        'second/sub/only_second.txt': 'second',
+        'second/outside.txt': 'second',
+    }
+    for name, data in write.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(data)
+    first = RawFileSystem(tmp_path / 'first')
+    second = RawFileSystem(tmp_path / 'second')
+    for indexed in [False, True]:
+        chain = FileSystemChain(first, (second, 'sub'), indexed=indexed)
+        with chain:
+            # The first system has priority.
+            with chain.open_str('shared.txt') as f:
+                assert f.read() == 'first'
+            with chain.open_str('only_second.txt') as f:
+                assert f.read() == 'second'
+            assert chain['only_second.txt'].path == 'sub/only_second.txt'
+            assert 'only_first.txt' in chain
+            # Files outside the prefix can't be found.
+            assert 'outside.txt' not in chain
+            assert 'missing.txt' not in chain
+
+
+def test_chain_index_changes(tmp_path: Path) -> None:
+    """Test the index remembers missing files, and can be updated."""
+    (tmp_path / 'first').mkdir()
+    (tmp_path / 'second').mkdir()
+    (tmp_path / 'second' / 'a.txt').write_text('second')
+    first = RawFileSystem(tmp_path / 'first')
+    second = RawFileSystem(tmp_path / 'second')
+    chain = FileSystemChain(first, indexed=True)
+    with chain:
+        assert chain._index == {}
+        assert 'a.txt' not in chain
+        assert 'b.txt' not in chain
+        # Missing files are remembered until invalidated.
+        (tmp_path / 'first' / 'b.txt').write_text('b')
+        assert 'b.txt' not in chain
+        chain.invalidate_index('b.txt')
+        assert 'b.txt' in chain
+
+        # Adding a system rebuilds the index.
+        chain.add_sys(second)
+        assert set(chain._index) == {'a.txt', 'b.txt'}
+        assert 'a.txt' in chain
+        (tmp_path / 'first' / 'a.txt').write_text('first')
+        with chain.open_str('a.txt') as f:
+            assert f.read() == 'second'
+        chain.add_sys(first, priority=True)
+        with chain.open_str('a.txt') as f:
+            assert f.read() == 'first'
+
+        # Removed files are searched for again.
+        (tmp_path / 'first' / 'a.txt').unlink()
+        with chain.open_str('a.txt') as f:
+            assert f.read() == 'second'
+        (tmp_path / 'second' / 'a.txt').unlink()
+        assert 'a.txt' not in chain
+        assert 'c.txt' not in chain
+        (tmp_path / 'second' / 'c.txt').write_text('c')
+        assert 'c.txt' not in chain
+        chain.invalidate_index()
+        assert 'c.txt' in chain
+
+
+def test_chain_index_vpk(tmp_path: Path) -> None:
+    """Test indexing a VPK doesn't look up every file."""
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w') as vpk:
+        for i in range(20):
+            vpk.add_file('scripts/file_{}.txt'.format(i), b'data')
+        vpk.add_file('other/file.txt', b'other')
+    vpk_sys = VPKFileSystem(path)
+    chain = FileSystemChain((vpk_sys, 'scripts'), indexed=True)
+    with chain:
+        assert len(chain._index) == 20
+        assert not vpk_sys._ref._index_cache
+        with chain.open_bin('FILE_5.txt') as f:
+            assert f.read() == b'data'
+        assert 'file.txt' not in chain
+        assert len(vpk_sys._ref._index_cache) == 1
+
+
+@pytest.fixture
+def parsed(monkeypatch) -> List[str]:
+    """Record the files which are parsed as text."""
+    files = []
+    orig_parse = Property.parse
+
+    def parse(file, filename='', **kwargs) -> Property:
+        """Record the filename."""
+        files.append(filename)
+        return orig_parse(file, filename, **kwargs)
+
+    monkeypatch.setattr(Property, 'parse', parse)
+    return files
+
+
+def test_prop_cache_invalidate(tmp_path: Path, parsed: List[str]) -> None:
+    """Test cached keyvalues are reparsed only when the file changes."""
+    (tmp_path / 'gameinfo.txt').write_text('"GameInfo" { "game" "First" }')
+    fsys = RawFileSystem(tmp_path)
+    fsys.prop_cache = cache = PropCache()
+    assert fsys.read_prop('gameinfo.txt').find_key('GameInfo')['game'] == 'First'
+    assert len(parsed) == 1
+    assert fsys.read_prop('gameinfo.txt').find_key('GameInfo')['game'] == 'First'
+    assert len(parsed) == 1
+    assert len(cache) == 1
+
+    # Options are part of the key.
+    fsys.read_prop('gameinfo.txt', allow_escapes=False)
+    assert len(parsed) == 2
+    assert len(cache) == 2
+
+    (tmp_path / 'gameinfo.txt').write_text('"GameInfo" { "game" "Second" }')
+    bump_mtime(tmp_path / 'gameinfo.txt')
+    assert fsys.read_prop('gameinfo.txt').find_key('GameInfo')['game'] == 'Second'
+    assert len(parsed) == 3
+    assert fsys.read_prop('gameinfo.txt').find_key('GameInfo')['game'] == 'Second'
+    assert len(parsed) == 3
+
+
+def test_prop_cache_save(tmp_path: Path, parsed: List[str]) -> None:
+    """Test the cache can be saved and loaded, and unused entries removed."""
+    (tmp_path / 'game').mkdir()
+    for name in ['first', 'second', 'third']:
+        (tmp_path / 'game' / (name + '.txt')).write_text('"Root" {{ "name" "{}" }}'.format(name))
+    fsys = RawFileSystem(tmp_path / 'game')
+    fsys.prop_cache = PropCache()
+    for name in ['first', 'second', 'third']:
+        fsys.read_prop(name + '.txt')
+    fsys.read_prop('first.txt', 'latin-1')
+    fsys.prop_cache.save(tmp_path / 'cache.bin')
+    assert len(parsed) == 4
+
+    # The next run only uses some of them.
+    fsys.prop_cache = PropCache()
+    fsys.prop_cache.load(tmp_path / 'cache.bin')
+    assert len(fsys.prop_cache) == 4
+    for name in ['first', 'third']:
+        prop = fsys.read_prop(name + '.txt')
+        assert prop.find_key('Root')['name'] == name
+    assert len(parsed) == 4
+    fsys.prop_cache.prune()
+    assert len(fsys.prop_cache) == 2
+    fsys.prop_cache.save(tmp_path / 'cache.bin')
+
+    fsys.prop_cache = PropCache()
+    fsys.prop_cache.load(tmp_path / 'cache.bin')
+    assert len(fsys.prop_cache) == 2
+    fsys.read_prop('third.txt')
+    assert len(parsed) == 4
+    fsys.read_prop('second.txt')
+    assert len(parsed) == 5
+
+    (tmp_path / 'cache.bin').write_bytes(b'SPRC\x7f')
+    with pytest.raises(ValueError):
+        PropCache().load(tmp_path / 'cache.bin')
+    (tmp_path / 'cache.bin').write_bytes((tmp_path / 'cache.bin').read_bytes()[:4] + b'\x01\xff\xff\x00\x00')
+    with pytest.raises(ValueError):
+        PropCache().load(tmp_path / 'cache.bin')
+
+
+def test_prop_cache_chain(tmp_path: Path, parsed: List[str]) -> None:
+    """Test files read through a chain are cached by the system containing them."""
+    for folder in ['first', 'second']:
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / 'shared.txt').write_text('"Root" {{ "sys" "{}" }}'.format(folder))
+    (tmp_path / 'second' / 'only_second.txt').write_text('"Root" { "sys" "second" }')
+    first = RawFileSystem(tmp_path / 'first')
+    second = RawFileSystem(tmp_path / 'second')
+    for indexed in [False, True]:
+        parsed.clear()
+        chain = FileSystemChain(first, second, indexed=indexed)
+        chain.prop_cache = cache = PropCache()
+        for _ in range(2):
+            assert chain.read_prop('shared.txt').find_key('Root')['sys'] == 'first'
+            assert chain.read_prop('only_second.txt').find_key('Root')['sys'] == 'second'
+        assert len(parsed) == 2
+        # Stored under the child system's path, not the chain.
+        assert parsed[0] == str(tmp_path / 'first') + ':shared.txt'
+
+        # Reading directly from the child uses the same entries.
+        second.prop_cache = cache
+        assert second.read_prop('only_second.txt').find_key('Root')['sys'] == 'second'
+        assert len(parsed) == 2
+
+        # Removing the file from the first system gives the other copy.
+        (tmp_path / 'first' / 'shared.txt').rename(tmp_path / 'shared.bak')
+        chain.invalidate_index()
+        assert chain.read_prop('shared.txt').find_key('Root')['sys'] == 'second'
+        assert len(parsed) == 3
+        (tmp_path / 'shared.bak').rename(tmp_path / 'first' / 'shared.txt')
+        second.prop_cache = None
@@ -0,0 +1,185 @@
+"""Test the model compiler and shared model cache."""
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+from srctools.compiler.mdl_compiler import ModelCache, ModelCompiler
+from srctools.filesys import VirtualFileSystem
+from srctools.game import Game
+from srctools.packlist import PackList
+
+# Writes out a fake model, using the contents of the QC.
+FAKE_STUDIOMDL = '''\
+import sys
+from pathlib import Path
+
+game = Path(sys.argv[sys.argv.index('-game') + 1])
+qc = Path(sys.argv[-1]).read_text()
+name_line, body = qc.split('\\n', 1)
+name = name_line.split('"')[1]
+dest = game / 'models' / name
+dest.parent.mkdir(parents=True, exist_ok=True)
+dest.write_bytes(b'IDST' + bytes(8) + name.encode('ascii').ljust(64, b'\\0') + body.encode('utf8'))
+dest.with_suffix('.vvd').write_bytes(b'IDSV' + body.encode('utf8'))
+'''
+
+GAMEINFO = '''\
+"GameInfo"
+    {
+    "game" "Test"
+    "FileSystem"
+        {
+        "SteamAppId" "1"
+        "SearchPaths"
+            {
+            "Game" "|gameinfo_path|."
+            }
+        }
+    }
+'''
+
+
+@pytest.fixture
+def game(tmp_path: Path, monkeypatch) -> Game:
+    """Create a game folder, and work inside the temporary folder."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'game').mkdir()
+    (tmp_path / 'game' / 'gameinfo.txt').write_text(GAMEINFO)
+    return Game(tmp_path / 'game')
+
+
+@pytest.fixture
+def studiomdl(tmp_path: Path) -> Path:
+    """Create a fake StudioMDL executable."""
+    if sys.platform.startswith('win'):
+        pytest.skip('Requires executable scripts.')
+    path = tmp_path / 'studiomdl'
+    path.write_text('#!{}\n{}'.format(sys.executable, FAKE_STUDIOMDL))
+    path.chmod(0o755)
+    return path
+
+
+def compile_func(key: str, folder: Path, mdl_name: str) -> None:
+    """Write a QC producing different data for each key."""
+    (folder / 'model.qc').write_text('$modelname "{}"\n{}\n'.format(mdl_name, key))
+
+
+def compile_models(
+    game: Game,
+    studiomdl: Path,
+    map_name: str,
+    keys: list,
+    jobs: int,
+) -> Dict[str, Tuple[bytes, bytes]]:
+    """Compile models for each key, and return the MDL and VVD data packed for each."""
+    pack = PackList(VirtualFileSystem({}))
+    with ModelCompiler(game, studiomdl, pack, map_name, 'test', jobs) as compiler:
+        names = {key: compiler.get_model(key, compile_func) for key in keys}
+    result = {}
+    for key, name in names.items():
+        mdl = pack._files[name].data
+        vvd = pack._files[name[:-4] + '.vvd'].data
+        # Remove the name, which is different.
+        result[key] = (mdl[:12] + mdl[76:], vvd)
+    return result
+
+
+def test_parallel_compile(game: Game, studiomdl: Path) -> None:
+    """Test compiling models in parallel produces the same results as one at a time."""
+    keys = ['first', 'second', 'third', 'fourth', 'second', 'fifth']
+    serial = compile_models(game, studiomdl, 'serial', keys, 1)
+    parallel = compile_models(game, studiomdl, 'parallel', keys, 3)
+    assert len(serial) == 5
+    assert parallel == serial
+    assert serial['first'] == (b'IDST' + bytes(8) + b'first\n', b'IDSVfirst\n')
+
+
+def write_model(folder: Path, mdl_name: str, data: bytes) -> None:
+    """Write out a fake compiled model."""
+    folder.mkdir(parents=True, exist_ok=True)
+    internal = 'maps/test/{}.mdl'.format(mdl_name).encode('ascii')
+    (folder / (mdl_name + '.mdl')).write_bytes(b'IDST' + bytes(8) + internal.ljust(64, b'\0') + data)
+    (folder / (mdl_name + '.vvd')).write_bytes(b'IDSV' + data)
+
+
+def test_cache_fetch(tmp_path: Path) -> None:
+    """Test storing and retrieving models from the cache."""
+    cache = ModelCache(tmp_path / 'cache')
+    assert not cache.fetch('ab' * 32, tmp_path / 'dest', 'mdl_0001', 'maps/other/mdl_0001.mdl')
+    assert not (tmp_path / 'dest' / 'mdl_0001.mdl').exists()
+
+    write_model(tmp_path / 'src', 'mdl_1234', b'model data')
+    cache.store('ab' * 32, tmp_path / 'src', 'mdl_1234')
+    assert cache.fetch('ab' * 32, tmp_path / 'dest', 'mdl_0001', 'maps/other/mdl_0001.mdl')
+    mdl = (tmp_path / 'dest' / 'mdl_0001.mdl').read_bytes()
+    # The internal name is changed to match.
+    assert mdl == b'IDST' + bytes(8) + b'maps/other/mdl_0001.mdl'.ljust(64, b'\0') + b'model data'
+    vvd = tmp_path / 'dest' / 'mdl_0001.vvd'
+    assert vvd.read_bytes() == b'IDSVmodel data'
+    # Other files are linked, not copied.
+    assert vvd.samefile(cache._path('ab' * 32, '.vvd'))
+    # The components which weren't compiled aren't present.
+    assert not (tmp_path / 'dest' / 'mdl_0001.phy').exists()
+    assert not cache.fetch('cd' * 32, tmp_path / 'dest', 'mdl_0002', 'maps/other/mdl_0002.mdl')
+
+
+def test_cache_link_fallback(tmp_path: Path, monkeypatch) -> None:
+    """Test files are copied if they can't be hard-linked."""
+    def link(src, dest) -> None:
+        """Pretend the files are on different drives."""
+        raise OSError('Cross-device link')
+
+    cache = ModelCache(tmp_path / 'cache')
+    write_model(tmp_path / 'src', 'mdl_1234', b'model data')
+    cache.store('ab' * 32, tmp_path / 'src', 'mdl_1234')
+    # Replaces any existing file.
+    (tmp_path / 'dest').mkdir()
+    (tmp_path / 'dest' / 'mdl_0001.vvd').write_bytes(b'old')
+    monkeypatch.setattr(os, 'link', link)
+    assert cache.fetch('ab' * 32, tmp_path / 'dest', 'mdl_0001', 'maps/other/mdl_0001.mdl')
+    vvd = tmp_path / 'dest' / 'mdl_0001.vvd'
+    assert vvd.read_bytes() == b'IDSVmodel data'
+    assert not vvd.samefile(cache._path('ab' * 32, '.vvd'))
+
+
+def test_cache_evict(tmp_path: Path) -> None:
+    """Test the least recently used models are removed first."""
+    digests = ['aa' * 32, 'bb' * 32, 'cc' * 32]
+    cache = ModelCache(tmp_path / 'cache')
+    for i, digest in enumerate(digests):
+        write_model(tmp_path / 'src', 'mdl_{}'.format(i), bytes(100 * (i + 1)))
+        cache.store(digest, tmp_path / 'src', 'mdl_{}'.format(i))
+        # Make them progressively newer.
+        os.utime(str(cache._path(digest, '.mdl')), (1000 * (i + 1), 1000 * (i + 1)))
+    sizes = {
+        digest: sum(
+            cache._path(digest, ext).stat().st_size
+            for ext in ['.mdl', '.vvd']
+        ) for digest in digests
+    }
+
+    # Using the oldest makes it the most recent.
+    assert cache.fetch(digests[0], tmp_path / 'dest', 'mdl_0', 'maps/test/mdl_0.mdl')
+    cache.max_size = sum(sizes.values()) - sizes[digests[1]]
+    cache.evict()
+    assert cache._path(digests[0], '.mdl').exists()
+    assert not cache._path(digests[1], '.mdl').exists()
+    assert not cache._path(digests[1], '.vvd').exists()
+    assert cache._path(digests[2], '.mdl').exists()
+
+    # Under the limit, nothing happens.
+    cache.evict()
+    assert cache._path(digests[2], '.mdl').exists()
+    # Then remove the oldest.
+    cache.max_size = 1
+    cache.evict()
+    assert not any((tmp_path / 'cache').glob('*/*'))
+
+    # No limit.
+    cache.max_size = 0
+    cache.store(digests[1], tmp_path / 'src', 'mdl_1')
+    cache.evict()
+    assert cache._path(digests[1], '.mdl').exists()
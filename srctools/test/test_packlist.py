@@ -0,0 +1,243 @@
+"""Test the packlist."""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+
+import pytest
+
+from srctools import Property, packlist
+from srctools.bsp import BSP, BSP_LUMPS
+from srctools.filesys import FileSystemChain, RawFileSystem
+from srctools.packlist import (
+    PackList, FileType,
+    PACK_MANIFEST,
+    _read_dep_cache, _zip_read_raw, _MISSING_KEY,
+)
+from srctools.test.test_bsp import copy_bsp
+from srctools.test.test_filesys import bump_mtime
+
+
+def test_dep_cache_optional(tmp_path: Path) -> None:
+    """Test cached dependencies use the current optional state of the file."""
+    (tmp_path / 'materials').mkdir()
+    (tmp_path / 'materials' / 'a.vmt').write_text(
+        '"LightmappedGeneric" { "$basetexture" "tex/a" }'
+    )
+    fsys = RawFileSystem(tmp_path)
+    cache = tmp_path / 'deps.bin'
+
+    for optional in [True, False, True]:
+        packlist = PackList(fsys)
+        packlist.pack_file('materials/a.vmt', FileType.MATERIAL, optional=optional)
+        packlist.eval_dependencies(1, cache)
+        assert packlist._files['materials/tex/a.vtf'].optional is optional
+        assert ('materials/a.vmt', None) in _read_dep_cache(cache)
+
+
+def test_dep_cache_missing_sources(tmp_path: Path) -> None:
+    """Test files recorded as missing invalidate the cache when added."""
+    fsys = RawFileSystem(tmp_path)
+    packlist = PackList(fsys)
+    sources = [('models/a.vvd', _MISSING_KEY)]
+    with fsys:
+        assert packlist._check_sources(sources)
+        (tmp_path / 'models').mkdir()
+        (tmp_path / 'models' / 'a.vvd').write_bytes(b'IDSV')
+        assert not packlist._check_sources(sources)
+
+
+class FakeModel:
+    """Stands in for a model, using two CDMaterials folders."""
+    def __init__(self, fsys, file) -> None:
+        self.included_models = []
+        self.phys_keyvalues = Property(None, [])
+
+    def iter_texture_paths(self, skins=None):
+        """Each texture could be in either folder."""
+        yield ['materials/first/tex.vmt', 'materials/second/tex.vmt']
+
+    def find_sounds(self):
+        """No sounds are used."""
+        return iter(())
+
+
+def test_dep_cache_cdmaterials(tmp_path: Path, monkeypatch) -> None:
+    """Test moving a model's material between CDMaterials folders invalidates the cache."""
+    monkeypatch.setattr(packlist, 'Model', FakeModel)
+    (tmp_path / 'models').mkdir()
+    (tmp_path / 'models' / 'prop.mdl').write_bytes(b'IDST')
+    (tmp_path / 'materials' / 'first').mkdir(parents=True)
+    (tmp_path / 'materials' / 'second').mkdir()
+    second = tmp_path / 'materials' / 'second' / 'tex.vmt'
+    first = tmp_path / 'materials' / 'first' / 'tex.vmt'
+    second.write_text('"UnlitGeneric" {}')
+    fsys = RawFileSystem(tmp_path)
+    cache = tmp_path / 'deps.bin'
+
+    def packed_materials() -> List[str]:
+        """Evaluate the model's dependencies, and return the materials."""
+        pack = PackList(fsys)
+        pack.pack_file('models/prop.mdl', FileType.MODEL)
+        pack.eval_dependencies(1, cache)
+        return sorted(
+            file.filename for file in pack._files.values()
+            if file.type is FileType.MATERIAL
+        )
+
+    assert packed_materials() == ['materials/second/tex.vmt']
+    assert packed_materials() == ['materials/second/tex.vmt']
+    # The first folder has priority.
+    first.write_text('"UnlitGeneric" {}')
+    assert packed_materials() == ['materials/first/tex.vmt']
+    first.unlink()
+    assert packed_materials() == ['materials/second/tex.vmt']
+    second.unlink()
+    assert packed_materials() == []
+
+
+def test_pack_into_zip_streamed(tmp_path: Path) -> None:
+    """Test packing writes the packfile to a temporary file, not memory."""
+    filename = copy_bsp(tmp_path)
+    with BSP(filename) as orig:
+        with orig.packfile() as zipfile:
+            old_files = {name: zipfile.read(name) for name in zipfile.namelist()}
+    (tmp_path / 'game' / 'scripts').mkdir(parents=True)
+    (tmp_path / 'game' / 'scripts' / 'test.txt').write_text('"Test" {}' * 50)
+    (tmp_path / 'game' / 'sound').mkdir()
+    (tmp_path / 'game' / 'sound' / 'beep.wav').write_bytes(b'RIFF' + bytes(2000))
+    fsys = FileSystemChain(RawFileSystem(tmp_path / 'game'))
+    packlist = PackList(fsys)
+    packlist.pack_file('scripts/test.txt')
+    packlist.pack_file('sound/beep.wav')
+
+    with BSP(filename, lazy=True) as bsp:
+        packlist.pack_into_zip(bsp, compression={'.txt': ZIP_DEFLATED}, jobs=2)
+        pakfile = bsp.lumps[BSP_LUMPS.PAKFILE]
+        assert pakfile._data is None
+        assert pakfile._file is not None
+        bsp.save()
+
+    with BSP(filename) as bsp:
+        with bsp.lumps[BSP_LUMPS.PAKFILE].open_data() as f, ZipFile(f) as zipfile:
+            for name, data in old_files.items():
+                assert zipfile.read(name) == data
+            assert zipfile.read('scripts/test.txt') == b'"Test" {}' * 50
+            assert zipfile.getinfo('scripts/test.txt').compress_type == ZIP_DEFLATED
+            assert zipfile.getinfo('sound/beep.wav').compress_type == ZIP_STORED
+
+
+def read_raw(bsp: BSP) -> Dict[str, Tuple[int, bytes]]:
+    """Read the compression type and compressed data of each file in the packfile."""
+    with bsp.lumps[BSP_LUMPS.PAKFILE].open_data() as f, ZipFile(f) as zipfile:
+        return {
+            info.filename: (info.compress_type, _zip_read_raw(f, info))
+            for info in zipfile.infolist()
+        }
+
+
+def test_pack_raw_copy(tmp_path: Path) -> None:
+    """Test files already in the packfile are copied without recompressing."""
+    filename = copy_bsp(tmp_path)
+    (tmp_path / 'game' / 'scripts').mkdir(parents=True)
+    (tmp_path / 'game' / 'scripts' / 'first.txt').write_text('"First" {}' * 50)
+    (tmp_path / 'game' / 'scripts' / 'second.txt').write_text('"Second" {}' * 50)
+    fsys = FileSystemChain(RawFileSystem(tmp_path / 'game'))
+
+    packlist = PackList(fsys)
+    packlist.pack_file('scripts/first.txt')
+    with BSP(filename, lazy=True) as bsp:
+        packlist.pack_into_zip(bsp, compression={'.txt': ZIP_DEFLATED})
+        bsp.save()
+        first = read_raw(bsp)
+    assert first['scripts/first.txt'][0] == ZIP_DEFLATED
+    assert PACK_MANIFEST not in first
+
+    # Packed with different compression, but existing files are untouched.
+    packlist = PackList(fsys)
+    packlist.pack_file('scripts/second.txt')
+    with BSP(filename, lazy=True) as bsp:
+        packlist.pack_into_zip(bsp)
+        bsp.save()
+        second = read_raw(bsp)
+    assert second['scripts/second.txt'][0] == ZIP_STORED
+    del second['scripts/second.txt']
+    assert second == first
+    with BSP(filename) as bsp, bsp.packfile() as zipfile:
+        assert zipfile.read('scripts/first.txt') == b'"First" {}' * 50
+        assert zipfile.testzip() is None
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_pack_duplicates(tmp_path: Path, monkeypatch, jobs: int) -> None:
+    """Test files with the same contents are only compressed once."""
+    filename = copy_bsp(tmp_path)
+    (tmp_path / 'game' / 'scripts').mkdir(parents=True)
+    for name in ['a', 'b', 'c']:
+        (tmp_path / 'game' / 'scripts' / (name + '.txt')).write_text('"Same" {}' * 50)
+    (tmp_path / 'game' / 'scripts' / 'd.txt').write_text('"Different" {}' * 50)
+    deflated = []
+    orig_deflate = packlist._deflate_file
+
+    def deflate(file):
+        """Record each file which is deflated in parallel."""
+        deflated.append(file)
+        return orig_deflate(file)
+
+    monkeypatch.setattr(packlist, '_deflate_file', deflate)
+    pack = PackList(FileSystemChain(RawFileSystem(tmp_path / 'game')))
+    for name in ['a', 'b', 'c', 'd']:
+        pack.pack_file('scripts/{}.txt'.format(name))
+    with BSP(filename, lazy=True) as bsp:
+        pack.pack_into_zip(bsp, compression={'.txt': ZIP_DEFLATED}, jobs=jobs)
+        files = read_raw(bsp)
+        with bsp.lumps[BSP_LUMPS.PAKFILE].open_data() as f, ZipFile(f) as zipfile:
+            assert zipfile.testzip() is None
+            for name in ['a', 'b', 'c']:
+                assert zipfile.read('scripts/{}.txt'.format(name)) == b'"Same" {}' * 50
+
+    assert len(deflated) == (2 if jobs > 1 else 0)
+    assert files['scripts/a.txt'] == files['scripts/b.txt'] == files['scripts/c.txt']
+    assert files['scripts/a.txt'][0] == ZIP_DEFLATED
+    assert files['scripts/a.txt'] != files['scripts/d.txt']
+
+
+def test_pack_unchanged(tmp_path: Path) -> None:
+    """Test the manifest allows skipping repacking unchanged files."""
+    filename = copy_bsp(tmp_path)
+    manifest = tmp_path / 'manifest.vdf'
+    (tmp_path / 'game' / 'scripts').mkdir(parents=True)
+    script = tmp_path / 'game' / 'scripts' / 'test.txt'
+    script.write_text('"Test" {}')
+    fsys = FileSystemChain(RawFileSystem(tmp_path / 'game'))
+
+    def pack(manifest_file: Optional[Path]) -> bool:
+        """Pack the file, and return if the packfile was rewritten."""
+        packlist = PackList(fsys)
+        packlist.pack_file('scripts/test.txt')
+        with BSP(filename, lazy=True) as bsp:
+            packlist.pack_into_zip(bsp, manifest_file=manifest_file)
+            changed = bsp.lumps[BSP_LUMPS.PAKFILE].dirty
+            bsp.save()
+        return changed
+
+    assert pack(manifest)
+    assert manifest.exists()
+    assert not pack(manifest)
+    # Without the manifest, we can't tell.
+    assert pack(None)
+    assert not pack(manifest)
+
+    script.write_text('"Changed" {}')
+    bump_mtime(script)
+    assert pack(manifest)
+    assert not pack(manifest)
+    # A different map doesn't use the same files.
+    other = copy_bsp(tmp_path, 'other.bsp')
+    with BSP(other, lazy=True) as bsp:
+        packlist = PackList(fsys)
+        packlist.pack_file('scripts/test.txt')
+        packlist.pack_into_zip(bsp, manifest_file=manifest)
+        assert bsp.lumps[BSP_LUMPS.PAKFILE].dirty
+    assert not pack(manifest)
+    with BSP(filename) as bsp, bsp.packfile() as zipfile:
+        assert zipfile.read('scripts/test.txt') == b'"Changed" {}'
@@ -0,0 +1,144 @@
+"""Test propcombine's grouping and model generation."""
+import random
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from srctools import Angle, Matrix, Vec
+from srctools.bsp import StaticProp
+from srctools.compiler import propcombine
+from srctools.compiler.mdl_compiler import ModelCache
+from srctools.test.bench_propcombine import make_props
+
+
+class FakeCompiler:
+    """Records the models requested."""
+    def __init__(self, cache) -> None:
+        self.cache = cache
+        self.requests = []
+
+    def get_model(self, key, compile_func, digest=None) -> str:
+        """Record the request, without compiling."""
+        self.requests.append((key, digest))
+        return 'models/combined.mdl'
+
+
+def test_digest_only_with_cache(tmp_path: Path, monkeypatch) -> None:
+    """Test the digest is only computed if models are being cached."""
+    digests = []
+
+    def compute_digest(prop_pos, has_coll, lookup_model) -> str:
+        """Record the props hashed."""
+        digests.append(prop_pos)
+        return 'digest'
+
+    monkeypatch.setattr(propcombine, 'compute_digest', compute_digest)
+    props = [
+        StaticProp('models/props/rock.mdl', Vec(x, 0, 0), Vec(), 1.0, [1], 0)
+        for x in [0, 64]
+    ]
+    compiler = FakeCompiler(None)
+    prop = propcombine.combine_group(compiler, props, lambda mdl: (None, None))
+    assert prop.origin == Vec(32, 0, 0)
+    assert digests == []
+    assert compiler.requests[0][1] is None
+
+    compiler = FakeCompiler(ModelCache(tmp_path))
+    propcombine.combine_group(compiler, props, lambda mdl: (None, None))
+    assert len(digests) == 1
+    assert compiler.requests[0][1] == 'digest'
+
+
+def brute_force_groups(
+    props: List[StaticProp],
+    rejected: List[StaticProp],
+    dist: float,
+    min_cluster: int,
+) -> Iterator[List[StaticProp]]:
+    """The original pairing, which checks every remaining prop for each cluster."""
+    todo = list(props)
+    while todo:
+        center = todo.pop(0)
+        nearby = sorted(
+            [prop for prop in todo if (center.origin - prop.origin).mag_sq() <= 4 * dist ** 2],
+            key=lambda prop: (center.origin - prop.origin).mag_sq(),
+        )
+        cluster = [center] + nearby[:propcombine.MAX_GROUP]
+        if len(cluster) < min_cluster:
+            rejected.append(center)
+            continue
+        bbox_min, bbox_max = Vec.bbox(prop.origin for prop in cluster)
+        mid = (bbox_min + bbox_max) / 2
+        selected = sorted(
+            [prop for prop in cluster if (mid - prop.origin).mag_sq() <= dist ** 2],
+            key=lambda prop: (mid - prop.origin).mag_sq(),
+        )[:propcombine.MAX_GROUP]
+        todo = [prop for prop in todo if prop not in selected]
+        if center not in selected:
+            rejected.append(center)
+        if len(selected) >= min_cluster:
+            yield selected
+        else:
+            rejected.extend(selected)
+
+
+@pytest.mark.parametrize('dist, min_cluster', [(64, 2), (256, 2), (256, 5)])
+def test_group_props_auto(dist: float, min_cluster: int) -> None:
+    """Test grouping props via the grid produces the same groups as checking every pair."""
+    props = make_props(600, 2048)
+    index = {prop: i for i, prop in enumerate(props)}
+
+    rejected = []  # type: List[StaticProp]
+    groups = [
+        [index[prop] for prop in group]
+        for group in propcombine.group_props_auto({(): props.copy()}, rejected, dist, min_cluster)
+    ]
+    expected_rejected = []  # type: List[StaticProp]
+    expected = [
+        [index[prop] for prop in group]
+        for group in brute_force_groups(props, expected_rejected, dist, min_cluster)
+    ]
+    assert groups == expected
+    assert sorted(map(index.__getitem__, rejected)) == sorted(map(index.__getitem__, expected_rejected))
+    assert len(groups) > 10
+    # Every prop is either grouped or rejected.
+    assert sorted(
+        [i for group in groups for i in group] + list(map(index.__getitem__, rejected))
+    ) == list(range(len(props)))
+
+
+def test_volume_tree() -> None:
+    """Test the tree finds the same volumes as checking each rotated box directly."""
+    rand = random.Random(48)
+    boxes = []
+    volumes = []
+    for i in range(200):
+        origin = Vec(rand.uniform(-1024, 1024), rand.uniform(-1024, 1024), rand.uniform(-256, 256))
+        mat = Matrix.from_angle(Angle(rand.uniform(0, 360), rand.uniform(0, 360), rand.uniform(0, 360)))
+        mins = Vec(rand.uniform(-256, 0), rand.uniform(-256, 0), rand.uniform(-64, 0))
+        maxs = Vec(rand.uniform(0, 256), rand.uniform(0, 256), rand.uniform(0, 64))
+        # Multiple volumes can be part of the same set.
+        boxes.append((origin, mat, mins, maxs, i // 2))
+        volumes.append(propcombine._Volume.from_box(origin, mat, mins, maxs, i // 2))
+    tree = propcombine.VolumeTree(volumes)
+    assert tree.children
+
+    found_any = 0
+    for _ in range(1000):
+        point = Vec(rand.uniform(-1280, 1280), rand.uniform(-1280, 1280), rand.uniform(-320, 320))
+        expected = []
+        for origin, mat, mins, maxs, set_ind in boxes:
+            # Compute the position relative to the box, then compare
+            # with the padding applied to the edges.
+            off = point - origin
+            if all(
+                mins[axis] - 0.15 <= Vec.dot(off, Vec.with_axes(axis, 1) @ mat) <= maxs[axis] + 0.15
+                for axis in 'xyz'
+            ):
+                expected.append(set_ind)
+        assert sorted(tree.find(*point)) == sorted(expected), point
+        if expected:
+            found_any += 1
+    assert found_any > 100
+    assert list(propcombine.VolumeTree([]).find(0, 0, 0)) == []
@@ -1,6 +1,11 @@
+import io
+
 import pytest
 
-from srctools.property_parser import Property, KeyValError, NoKeyError
+from srctools.property_parser import (
+    Property, KeyValError, NoKeyError,
+    PropEvent, PropEventParser,
+)
 from srctools.tokenizer import C_Tokenizer, Py_Tokenizer
 from srctools import property_parser as pp_mod
 
@@ -226,7 +231,128 @@ def test_parse(py_c_token):
 
     # Check export roundtrips.
     assert_tree(parse_result, Property.parse(parse_result.export()))
-    
+
+
+def test_binary_roundtrip() -> None:
+    """Test exporting and parsing the binary format."""
+    buf = io.BytesIO()
+    parse_result.export_binary(buf)
+    buf.seek(0)
+    assert_tree(parse_result, Property.parse_binary(buf))
+
+    buf = io.BytesIO()
+    Property('Leaf', 'välue').export_binary(buf)
+    buf.seek(0)
+    assert_tree(Property('Leaf', 'välue'), Property.parse_binary(buf))
+
+    with pytest.raises(ValueError):
+        Property.parse_binary(io.BytesIO(buf.getvalue()[:-8]))
+    with pytest.raises(ValueError):
+        Property.parse_binary(io.BytesIO(b'"Key" "value"\n'))
+
+
+def test_serialise() -> None:
+    """Test writing text directly to files."""
+    tree = parse_result.copy()
+    tree.append(Property('Quoted "block"', [
+        Property('tab\there', 'new\nline'),
+        Property(None, [Property('Inner', 'välue')]),
+    ]))
+    text = ''.join(tree.export())
+
+    buf = io.StringIO()
+    tree.serialise(buf)
+    assert buf.getvalue() == text
+
+    buf = io.BytesIO()
+    tree.serialise(buf)
+    assert buf.getvalue() == text.encode('utf8')
+
+    buf = io.StringIO()
+    tree.serialise(buf, compact=True)
+    assert '\t' not in buf.getvalue()
+    assert_tree(Property.parse(text), Property.parse(buf.getvalue()))
+
+
+class RecordingFile:
+    """A file-like object, which isn't an io class."""
+    def __init__(self) -> None:
+        self.writes = []
+
+    def write(self, data) -> None:
+        """Record the data."""
+        self.writes.append(data)
+
+
+def test_serialise_batches(monkeypatch) -> None:
+    """Test text is written in batches, including for deeply nested blocks."""
+    monkeypatch.setattr(pp_mod, 'SERIALISE_BATCH', 8)
+    tree = Property('Root', [])
+    block = tree
+    for i in range(20):
+        block.append(Property('Key', str(i)))
+        block.append(Property('Empty', []))
+        new_block = Property('Block{}'.format(i), [])
+        block.append(new_block)
+        block = new_block
+    text = ''.join(tree.export())
+
+    file = RecordingFile()
+    tree.serialise(file)
+    # Anything besides a text file is treated as binary.
+    assert all(isinstance(data, bytes) for data in file.writes)
+    assert b''.join(file.writes) == text.encode('utf8')
+    assert len(file.writes) > 10
+    for data in file.writes:
+        assert data.count(b'\n') <= 9, data
+
+
+def test_parse_events(py_c_token) -> None:
+    """Test the event-based parser, and skipping blocks."""
+    events = PropEventParser(
+        '"Root" { "key" "value"\n'
+        '"Skipped" { "a" "b" "c" { } } "Block" [test]\n { "x" "y" } }\n'
+        '"Disabled" [!test]\n { "k" "v" }\n'
+        '"Other" "value2" [!test]\n',
+        flags={'test': True},
+    )
+    result = []
+    for event, name, value in events:
+        result.append((event, name, value))
+        if name == 'Skipped' and event is PropEvent.BLOCK_START:
+            events.skip_block()
+    assert result == [
+        (PropEvent.BLOCK_START, 'Root', None),
+        (PropEvent.KEYVALUE, 'key', 'value'),
+        (PropEvent.BLOCK_START, 'Skipped', None),
+        (PropEvent.BLOCK_START, 'Block', None),
+        (PropEvent.KEYVALUE, 'x', 'y'),
+        (PropEvent.BLOCK_END, 'Block', None),
+        (PropEvent.BLOCK_END, 'Root', None),
+    ]
+
+    with pytest.raises(KeyValError):
+        list(PropEventParser('"Root" { "key" "value" '))
+    with pytest.raises(KeyValError):
+        list(PropEventParser('"Root" { } }'))
+
+
+def test_parse_filtered(py_c_token) -> None:
+    """Test parsing only specific subtrees matches find_all()."""
+    for keys in [
+        ('Root1', ),
+        ('Root1', 'block'),
+        ('Root1', 'Block', 'bare', 'block'),
+        ('Root2', 'Oneliner'),
+        ('Root2', 'missing'),
+    ]:
+        result = list(Property.parse_filtered(parse_test, *keys))
+        expected = list(parse_result.find_all(*keys))
+        assert len(result) == len(expected)
+        for res_prop, exp_prop in zip(result, expected):
+            assert_tree(exp_prop, res_prop)
+
+
 def test_build():
     """Test the .build() constructor."""
     prop = Property(None, [])
@@ -480,3 +480,30 @@ def test_early_binary_arg(py_c_token):
     """Test that passing bytes values is caught before looping."""
     with pytest.raises(TypeError):
         py_c_token(b'test')
+
+
+def test_binary_buffer(py_c_token):
+    """Test parsing UTF-8 data directly from bytes and other buffers."""
+    data = prop_parse_test.encode('utf8')
+    for buffer in [data, bytearray(data), memoryview(data)]:
+        tok = py_c_token(buffer, '', string_bracket=True, encoding='utf8')
+        check_tokens(tok, prop_parse_tokens)
+
+    # Non-ASCII text, escapes and a BOM should all be handled.
+    text = codecs.BOM_UTF8 + '''\
+"ключ" "знач\\"ение" // Коммент
+  bare_é "a
+b" (ürk)
+'''.encode('utf8')
+    tok = py_c_token(text, '', encoding='UTF-8')
+    check_tokens(tok, [
+        (T.STRING, "ключ"), (T.STRING, 'знач"ение'), T.NEWLINE,
+        (T.STRING, "bare_é"), (T.STRING, "a\nb"), (T.PAREN_ARGS, "ürk"),
+        T.NEWLINE,
+    ])
+    assert tok.line_num == 4
+
+    with pytest.raises(ValueError):
+        py_c_token(b'test', encoding='cp1252')
+    with pytest.raises(TokenSyntaxError):
+        list(py_c_token(b'"bad \xff text"', encoding='utf8'))
@@ -0,0 +1,363 @@
+"""Test the VPK reader and writer."""
+import csv
+import gc
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from srctools.binformat import checksum
+from srctools.scripts import diff as diff_script
+from srctools.vpk import VPK, DiffKind, FileDiff, diff_vpk
+
+
+def write_files(folder: Path, files: Dict[str, bytes]) -> None:
+    """Write out files into a folder."""
+    for name, data in files.items():
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def read_vpk(path: Path) -> Dict[str, bytes]:
+    """Read all the files in a VPK."""
+    with VPK(str(path)) as vpk:
+        return {info.filename: info.read() for info in vpk}
+
+
+def test_update_compact(tmp_path: Path) -> None:
+    """Test updating a VPK, then compacting the leftover space."""
+    src = tmp_path / 'src'
+    files = {
+        'materials/a.vmt': b'"LightmappedGeneric" {}' * 20,
+        'materials/b.vmt': b'"UnlitGeneric" {}' * 50,
+        'models/prop.mdl': bytes(range(256)) * 40,
+        'sound/beep.wav': b'RIFF' + bytes(5000),
+    }
+    write_files(src, files)
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w') as vpk:
+        vpk.add_folder(str(src))
+    assert read_vpk(path) == files
+
+    # Change one, remove one and add one.
+    files['materials/a.vmt'] = b'"VertexLitGeneric" {}' * 30
+    files['scripts/new.txt'] = b'"new" "file"'
+    del files['sound/beep.wav']
+    os.remove(str(src / 'sound' / 'beep.wav'))
+    write_files(src, files)
+
+    with VPK(str(path), mode='a') as vpk:
+        changed = vpk.update_folder(str(src), remove_missing=True)
+        assert sorted(info.filename for info in changed) == [
+            'materials/a.vmt', 'scripts/new.txt',
+        ]
+        assert 'sound/beep.wav' not in vpk
+        free = vpk.free_space()
+        assert sum(free.values()) > 0
+    assert read_vpk(path) == files
+
+    with VPK(str(path), mode='a') as vpk:
+        assert vpk.compact() == sum(free.values())
+        assert not any(vpk.free_space().values())
+        assert all(valid for info, valid in vpk.verify_files())
+    assert read_vpk(path) == files
+    # The data was moved into a new archive.
+    assert sorted(os.listdir(str(tmp_path))) == ['pak01_001.vpk', 'pak01_dir.vpk', 'src']
+
+    # Doing it again has no effect.
+    with VPK(str(path), mode='a') as vpk:
+        assert vpk.compact() == 0
+    assert read_vpk(path) == files
+
+
+def test_compact_failure(tmp_path: Path, monkeypatch) -> None:
+    """Test that if compacting fails, the VPK is left unchanged."""
+    src = tmp_path / 'src'
+    files = {'a.txt': b'a' * 2000, 'b.txt': b'b' * 3000}
+    write_files(src, files)
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w') as vpk:
+        vpk.add_folder(str(src))
+    files['a.txt'] = b'c' * 1000
+    write_files(src, files)
+    with VPK(str(path), mode='a') as vpk:
+        vpk.update_folder(str(src))
+    before = sorted(os.listdir(str(tmp_path)))
+
+    def broken() -> None:
+        """Fail to write the directory."""
+        raise OSError('Disk full')
+
+    with VPK(str(path), mode='a') as vpk:
+        monkeypatch.setattr(vpk, 'write_dirfile', broken)
+        with pytest.raises(OSError):
+            vpk.compact()
+        monkeypatch.undo()
+    assert sorted(os.listdir(str(tmp_path))) == before
+    assert read_vpk(path) == files
+
+
+def test_diff(tmp_path: Path, capsys) -> None:
+    """Test comparing two VPKs, and the diff script's output."""
+    old_path = tmp_path / 'old_dir.vpk'
+    new_path = tmp_path / 'new_dir.vpk'
+    with VPK(str(old_path), mode='w') as vpk:
+        vpk.add_file('scripts/same.txt', b'same')
+        vpk.add_file('scripts/changed.txt', b'old data')
+        vpk.add_file('scripts/bad_crc.txt', b'bad')
+        vpk.add_file('materials/removed.vmt', b'removed')
+    with VPK(str(new_path), mode='w') as vpk:
+        vpk.add_file('scripts/same.txt', b'same')
+        vpk.add_file('scripts/changed.txt', b'new data!')
+        vpk.add_file('models/added.mdl', b'added')
+        # Only the checksum differs, confirming finds the data is the same.
+        vpk.add_file('scripts/bad_crc.txt', b'bad')
+        vpk['scripts/bad_crc.txt'].crc ^= 1
+
+    expected = [
+        FileDiff(DiffKind.REMOVED, 'materials/removed.vmt', 7, 0, checksum(b'removed'), None),
+        FileDiff(DiffKind.ADDED, 'models/added.mdl', 0, 5, None, checksum(b'added')),
+        FileDiff(
+            DiffKind.MODIFIED, 'scripts/changed.txt', 8, 9,
+            checksum(b'old data'), checksum(b'new data!'),
+        ),
+    ]
+    assert diff_vpk(old_path, new_path, confirm=True) == expected
+    expected.insert(2, FileDiff(
+        DiffKind.MODIFIED, 'scripts/bad_crc.txt', 3, 3,
+        checksum(b'bad'), checksum(b'bad') ^ 1,
+    ))
+    assert diff_vpk(old_path, new_path) == expected
+    assert diff_vpk(old_path, old_path) == []
+
+    diff_script.diff_vpk(old_path, new_path, fmt='json')
+    assert json.loads(capsys.readouterr().out) == [
+        {
+            'change': diff.kind.value,
+            'filename': diff.filename,
+            'old_size': diff.old_size,
+            'new_size': diff.new_size,
+            'old_crc': diff_script.fmt_crc(diff.old_crc),
+            'new_crc': diff_script.fmt_crc(diff.new_crc),
+        } for diff in expected
+    ]
+    diff_script.diff_vpk(old_path, new_path, fmt='csv')
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows == [['change', 'filename', 'old_size', 'new_size', 'old_crc', 'new_crc']] + [
+        [
+            diff.kind.value, diff.filename,
+            str(diff.old_size), str(diff.new_size),
+            diff_script.fmt_crc(diff.old_crc) or '',
+            diff_script.fmt_crc(diff.new_crc) or '',
+        ] for diff in expected
+    ]
+    assert diff_script.fmt_crc(0x1234) == '00001234'
+
+
+def test_diff_created(tmp_path: Path, monkeypatch, capsys) -> None:
+    """Test the diff script's output for files which were created or deleted."""
+    (tmp_path / 'pak01_dir.vpk').write_bytes(bytes(100))
+    (tmp_path / 'empty.vpk').write_bytes(b'')
+    exists = str(tmp_path / 'pak01_dir.vpk')
+    missing = str(tmp_path / 'missing.vpk')
+
+    for args, change, old_size, new_size in [
+        ([missing, exists], '+', 0, 100),
+        ([exists, str(tmp_path / 'empty.vpk')], '-', 100, 0),
+    ]:
+        monkeypatch.setattr('sys.argv', ['diff.py'] + args)
+        assert diff_script.main() is None
+        assert capsys.readouterr().out == '{} {}\n'.format(
+            'Create' if change == '+' else 'Delete', args[0],
+        )
+
+        monkeypatch.setattr('sys.argv', ['diff.py', '--json'] + args)
+        assert diff_script.main() is None
+        assert json.loads(capsys.readouterr().out) == [{
+            'change': change,
+            'filename': args[0],
+            'old_size': old_size,
+            'new_size': new_size,
+            'old_crc': None,
+            'new_crc': None,
+        }]
+
+        monkeypatch.setattr('sys.argv', ['diff.py', '--csv'] + args)
+        assert diff_script.main() is None
+        assert list(csv.reader(io.StringIO(capsys.readouterr().out))) == [
+            ['change', 'filename', 'old_size', 'new_size', 'old_crc', 'new_crc'],
+            [change, args[0], str(old_size), str(new_size), '', ''],
+        ]
+
+
+def test_read_many(tmp_path: Path, monkeypatch) -> None:
+    """Test reading many files at once merges nearby reads."""
+    files = {
+        'scripts/{}.txt'.format(i): bytes([i]) * (100 * i + 1)
+        for i in range(1, 40)
+    }
+    files['materials/large.vtf'] = bytes(range(256)) * 2000
+    write_files(tmp_path / 'src', files)
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w', dir_data_limit=16) as vpk:
+        vpk.add_folder(str(tmp_path / 'src'))
+
+    reads = []
+    with VPK(str(path)) as vpk:
+        orig_read = vpk._read_arch
+
+        def read_arch(index: int, offset: int, length: int) -> bytes:
+            """Record each read."""
+            reads.append((index, offset, length))
+            return orig_read(index, offset, length)
+
+        monkeypatch.setattr(vpk, '_read_arch', read_arch)
+        names = sorted(files, reverse=True)
+        result = {info.filename: data for info, data in vpk.read_many(names)}
+        assert result == files
+        # Nearby files are read in one call.
+        assert len(reads) < len(files) / 4
+        reads.clear()
+
+        # Split into multiple reads if the gap is too large.
+        monkeypatch.setattr('srctools.vpk.READ_MERGE_GAP', 0)
+        monkeypatch.setattr('srctools.vpk.READ_MERGE_MAX', 1024)
+        subset = names[::3]
+        result = {info.filename: data for info, data in vpk.read_many(subset)}
+        assert result == {name: files[name] for name in subset}
+        assert len(reads) == len(subset)
+        assert list(vpk.read_many([])) == []
+
+
+def test_close_archives(tmp_path: Path) -> None:
+    """Test archive files are closed by close() or when the VPK is discarded."""
+    write_files(tmp_path / 'src', {'models/prop.mdl': bytes(5000)})
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w') as vpk:
+        vpk.add_folder(str(tmp_path / 'src'))
+
+    vpk = VPK(str(path))
+    assert vpk['models/prop.mdl'].read() == bytes(5000)
+    [handle] = vpk._arch_handles.values()
+    vpk.close()
+    assert handle.closed
+    # Reading again reopens it.
+    assert vpk['models/prop.mdl'].read() == bytes(5000)
+    [handle] = vpk._arch_handles.values()
+    # File infos refer back to the VPK, so a collection is required.
+    del vpk
+    gc.collect()
+    assert handle.closed
+
+
+def arch_sizes(folder: Path) -> Dict[str, int]:
+    """Return the size of each archive file."""
+    return {
+        path.name: path.stat().st_size
+        for path in folder.glob('pak01_[0-9]*.vpk')
+    }
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_add_files(tmp_path: Path, jobs: int) -> None:
+    """Test adding files, splitting them between archives."""
+    files = {
+        'models/prop_{}.mdl'.format(i): bytes([i]) * (1000 + 100 * i)
+        for i in range(20)
+    }
+    # Duplicate data is only stored once.
+    files['models/copy.mdl'] = files['models/prop_5.mdl']
+    files['scripts/small.txt'] = b'small'
+    write_files(tmp_path / 'src', files)
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w', dir_data_limit=16) as vpk:
+        last = vpk.add_files(
+            [(name, str(tmp_path / 'src' / name)) for name in files],
+            arch_limit=8000, jobs=jobs,
+        )
+        assert vpk['models/copy.mdl'].offset == vpk['models/prop_5.mdl'].offset
+        assert vpk['models/copy.mdl'].arch_index == vpk['models/prop_5.mdl'].arch_index
+        # Stored entirely in the directory.
+        assert vpk['scripts/small.txt'].arch_index is None
+        with pytest.raises(FileExistsError):
+            vpk.add_files([('scripts/small.txt', str(tmp_path / 'src' / 'scripts/small.txt'))])
+    assert read_vpk(path) == files
+    sizes = arch_sizes(tmp_path)
+    assert len(sizes) == last + 1
+    assert all(size <= 8000 for size in sizes.values()), sizes
+    assert sum(sizes.values()) == sum(
+        len(data) - 16 for name, data in files.items()
+        if name != 'models/copy.mdl' and len(data) > 16
+    )
+
+
+def test_add_files_existing(tmp_path: Path) -> None:
+    """Test multiple writes skip archives which are already full."""
+    first = {'first/{}.bin'.format(i): bytes([i]) * 3000 for i in range(5)}
+    second = {'second/{}.bin'.format(i): bytes([i + 100]) * 3000 for i in range(5)}
+    write_files(tmp_path / 'src', first)
+    write_files(tmp_path / 'src', second)
+    path = tmp_path / 'pak01_dir.vpk'
+    # Without a limit, this is all written to one archive.
+    with VPK(str(path), mode='w', dir_data_limit=0) as vpk:
+        assert vpk.add_files([(name, str(tmp_path / 'src' / name)) for name in first]) == 0
+    assert arch_sizes(tmp_path) == {'pak01_000.vpk': 15000}
+
+    # The first archive is already larger, so the next one is used.
+    with VPK(str(path), mode='a', dir_data_limit=0) as vpk:
+        last = vpk.add_files(
+            [(name, str(tmp_path / 'src' / name)) for name in second],
+            arch_limit=7000,
+        )
+        assert {vpk[name].arch_index for name in second} == {1, 2, 3}
+    assert last == 3
+    assert arch_sizes(tmp_path) == {
+        'pak01_000.vpk': 15000,
+        'pak01_001.vpk': 6000,
+        'pak01_002.vpk': 6000,
+        'pak01_003.vpk': 3000,
+    }
+    assert read_vpk(path) == {**first, **second}
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_verify_files(tmp_path: Path, monkeypatch, jobs: int) -> None:
+    """Test corrupted files are detected, and progress is reported."""
+    # Check in several batches.
+    monkeypatch.setattr('srctools.vpk.VERIFY_BATCH_SIZE', 4096)
+    files = {
+        'materials/tex_{:02}.vtf'.format(i): bytes(range(i, 256)) * (i + 5)
+        for i in range(40)
+    }
+    write_files(tmp_path / 'src', files)
+    path = tmp_path / 'pak01_dir.vpk'
+    with VPK(str(path), mode='w', dir_data_limit=0) as vpk:
+        vpk.add_folder(str(tmp_path / 'src'), arch_limit=20000)
+
+    with VPK(str(path)) as vpk:
+        assert vpk.verify_all(jobs=jobs)
+        serial = [info.filename for info, valid in vpk.verify_files()]
+        broken = vpk['materials/tex_17.vtf']
+        arch_file = tmp_path / 'pak01_{:03}.vpk'.format(broken.arch_index)
+        offset, arch_len = broken.offset, broken.arch_len
+
+    data = bytearray(arch_file.read_bytes())
+    data[offset + arch_len // 2] ^= 0xFF
+    arch_file.write_bytes(data)
+
+    progress = []
+    with VPK(str(path)) as vpk:
+        results = list(vpk.verify_files(
+            jobs=jobs,
+            progress=lambda done, total: progress.append((done, total)),
+        ))
+        assert not vpk.verify_all(jobs=jobs)
+    # Results are in the same order, and only the corrupted file is invalid.
+    assert [info.filename for info, valid in results] == serial
+    assert sorted(serial) == sorted(files)
+    assert [info.filename for info, valid in results if not valid] == ['materials/tex_17.vtf']
+    assert progress == [(i, len(files)) for i in range(1, len(files) + 1)]
@@ -132,29 +132,42 @@ class Tokenizer:
           If disabled these are parsed as BRACK_OPEN, STRING, BRACK_CLOSE.
         * allow_escapes controls whether \\n-style escapes are expanded.
         * allow_star_comments if enabled allows /* */ comments.
+
+    Data can also be bytes, or another buffer like a memoryview or mmap, if
+    encoding is set to 'utf8' or 'ascii'. The C version reads these directly,
+    only decoding the values of the tokens it produces.
     """
     def __init__(
         self,
-        data: Union[str, Iterable[str]],
+        data: Union[str, Iterable[str], bytes, memoryview],
         filename: Union[str, PathLike]=None,
         error: Type[TokenSyntaxError]=TokenSyntaxError,
         string_bracket: bool=False,
         allow_escapes: bool=True,
         allow_star_comments: bool=False,
+        encoding: Optional[str]=None,
     ) -> None:
-        # Catch passing direct bytes far in advance.
-        if isinstance(data, bytes):
-            raise TypeError(
-                'Cannot parse binary data! Decode to the desired encoding, '
-                'or wrap in io.TextIOWrapper() to decode gradually.'
-            )
-
+        buffer = None  # type: Optional[memoryview]
         if isinstance(data, str):
             self.cur_chunk = data
             self.chunk_iter = iter(())  # type: Iterator[str]
         else:
-            self.cur_chunk = ''
-            self.chunk_iter = iter(data)
+            try:
+                buffer = memoryview(data)  # type: ignore
+            except TypeError:
+                self.cur_chunk = ''
+                self.chunk_iter = iter(data)
+            else:
+                # Catch passing direct bytes far in advance.
+                if encoding is None:
+                    raise TypeError(
+                        'Cannot parse binary data! Pass an encoding for UTF-8 '
+                        'data, decode to the desired encoding, or wrap in '
+                        'io.TextIOWrapper() to decode gradually.'
+                    )
+                _check_buffer_encoding(encoding)
+                self.cur_chunk = ''
+                self.chunk_iter = iter(())
         self.char_index = -1
 
         if filename is not None:
@@ -179,6 +192,12 @@ class Tokenizer:
         self._pushback = None  # type: Optional[Tuple[Token, str]]
         self.line_num = 1
 
+        if buffer is not None:
+            try:
+                self.cur_chunk = str(buffer, 'utf8')
+            except UnicodeDecodeError as exc:
+                raise self.error("Could not decode file!") from exc
+
     def error(self, message: Union[str, Token], *args) -> TokenSyntaxError:
         """Raise a syntax error exception.
 
@@ -318,16 +337,32 @@ class Tokenizer:
                         'instead of two for a comment (//)!'
                     )
                 else:
-                    # Skip to end of line
-                    while True:
-                        next_char = self._next_char()
-                        if next_char == '\n' or next_char is None:
-                            break
+                    # Skip to end of line. Find it directly if it's in
+                    # this chunk.
+                    newline = self.cur_chunk.find('\n', self.char_index + 1)
+                    if newline != -1:
+                        self.char_index = newline
+                    else:
+                        while True:
+                            next_char = self._next_char()
+                            if next_char == '\n' or next_char is None:
+                                break
                     # We want to produce the token for the end character.
                     self.char_index -= 1
 
             # Strings
             elif next_char == '"':
+                # If the string is in this chunk and has no escapes, we
+                # can just slice it out.
+                start = self.char_index + 1
+                end = self.cur_chunk.find('"', start)
+                if end != -1:
+                    value = self.cur_chunk[start:end]
+                    if not self.allow_escapes or '\\' not in value:
+                        self.line_num += value.count('\n')
+                        self.char_index = end
+                        return Token.STRING, value
+
                 value_chars = []  # type: List[str]
                 while True:
                     next_char = self._next_char()
@@ -497,6 +532,15 @@ class Tokenizer:
         return value
 
 
+def _check_buffer_encoding(encoding: str) -> None:
+    """Check this encoding can be read directly from buffers."""
+    if encoding.casefold().replace('-', '').replace('_', '') not in ('utf8', 'ascii'):
+        raise ValueError(
+            'Binary data can only be parsed as UTF-8 or ASCII, '
+            'not "{}"!'.format(encoding)
+        )
+
+
 def escape_text(text: str) -> str:
     r"""Escape special characters and backslashes, so tokenising reproduces them.
 
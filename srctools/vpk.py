@@ -1,15 +1,23 @@
 """Classes for reading and writing Valve's VPK format, version 1."""
 import os
+import mmap
+import hashlib
 import struct
 import operator
+import threading
+import weakref
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 from types import TracebackType
 from typing import (
-    Union, Dict, Optional, List, Tuple, Iterator, BinaryIO, IO,
-    Type,
+    Union, Dict, Optional, List, Tuple, Iterator, Iterable, BinaryIO, IO,
+    Type, Deque, Set, NamedTuple, Callable,
 )
 
-from srctools.binformat import checksum, EMPTY_CHECKSUM, struct_read
+from srctools import AtomicWriter
+from srctools.binformat import checksum, EMPTY_CHECKSUM, struct_read, copy_range
 
 
 VPK_SIG = 0x55aa1234  # First byte of the file..
@@ -17,6 +25,17 @@ DIR_ARCH_INDEX = 0x7fff  # File index used for the _dir file.
 
 FileName = Union[str, Tuple[str, str], Tuple[str, str, str]]
 
+# crc, index_len, arch_ind, offset, arch_len, terminator
+_fmt_dir_entry = struct.Struct('<IHHIIH')
+# Marks hashes which match multiple files in the lazy index.
+_INDEX_COLLISION = -1
+# When reading many files, reads are merged if the gap between files is
+# smaller than this, up to the maximum size.
+READ_MERGE_GAP = 64 * 1024
+READ_MERGE_MAX = 16 * 1024 * 1024
+# Files are checksummed in batches of about this size.
+VERIFY_BATCH_SIZE = 1024 * 1024
+
 
 class OpenModes(Enum):
     """Modes for opening VPK files."""
@@ -30,6 +49,27 @@ class OpenModes(Enum):
         return self.value in 'wa'
 
 
+class DiffKind(Enum):
+    """The kinds of change produced by diff_vpk()."""
+    ADDED = '+'
+    REMOVED = '-'
+    MODIFIED = 'M'
+
+
+class FileDiff(NamedTuple):
+    """A file which differs between two VPKs.
+
+    For added or removed files, the missing side has a size of 0 and a
+    checksum of None.
+    """
+    kind: DiffKind
+    filename: str
+    old_size: int
+    new_size: int
+    old_crc: Optional[int]
+    new_crc: Optional[int]
+
+
 def iter_nullstr(file: BinaryIO) -> Iterator[str]:
     """Read a null-terminated ASCII string from the file.
     
@@ -55,6 +95,24 @@ def iter_nullstr(file: BinaryIO) -> Iterator[str]:
             chars.extend(char)
 
 
+def _read_nullstr(data: Union[bytes, mmap.mmap], pos: int) -> Tuple[Optional[str], int]:
+    """Read a null-terminated ASCII string at a position in the data.
+
+    This returns the string and the position after it. The string is None
+    if it is blank, indicating the end of a section.
+    """
+    end = data.find(b'\x00', pos)
+    if end == -1:
+        raise Exception('Reached EOF without null-terminator in {!r}!'.format(data[pos:pos+64]))
+    string = data[pos:end].decode('ascii')
+    if string == ' ':  # Blank strings are saved as ' '
+        return '', end + 1
+    elif string == '':
+        return None, end + 1
+    else:
+        return string, end + 1
+
+
 def _write_nullstring(file: IO[bytes], string: str) -> None:
     """Write a null-terminated ASCII string back to the file."""
     if string:
@@ -186,10 +244,7 @@ class FileInfo:
             if self.arch_index is None:
                 return self.start_data + self.vpk.footer_data[self.offset: self.offset + self.arch_len]
             else:
-                arch_file = get_arch_filename(self.vpk.file_prefix, self.arch_index)
-                with open(os.path.join(self.vpk.folder, arch_file), 'rb') as data:
-                    data.seek(self.offset)
-                    return self.start_data + data.read(self.arch_len)
+                return self.start_data + self.vpk._read_arch(self.arch_index, self.offset, self.arch_len)
         else:
             return self.start_data
             
@@ -203,13 +258,10 @@ class FileInfo:
                     chk
                  )
             else:
-                arch_file = get_arch_filename(self.vpk.file_prefix, self.arch_index)
-                with open(os.path.join(self.vpk.folder, arch_file), 'rb') as data:
-                    data.seek(self.offset)
-                    chk = checksum(
-                        data.read(self.arch_len),
-                        chk,
-                    )
+                chk = checksum(
+                    self.vpk._read_arch(self.arch_index, self.offset, self.arch_len),
+                    chk,
+                )
         return chk == self.crc
            
     def write(self, data: bytes, arch_index: Optional[int]=None) -> None:
@@ -246,8 +298,79 @@ class FileInfo:
             self.offset = 0
 
 
+def _hash_file(path: str, dir_limit: int) -> Tuple[int, bytes, bytes, bytes]:
+    """Read a file from disk for VPK.add_files().
+
+    This returns the checksum, the hash of the archive portion, the data
+    for the directory and the data for the archive.
+    """
+    with open(path, 'rb') as f:
+        start_data = f.read(dir_limit)
+        arch_data = f.read()
+    return (
+        checksum(arch_data, checksum(start_data)),
+        hashlib.sha1(arch_data).digest(),
+        start_data,
+        arch_data,
+    )
+
+
+def _verify_batch(batch: List[Tuple[FileInfo, bytes]]) -> List[Tuple[FileInfo, bool]]:
+    """Check the checksums for files read by VPK.verify_files()."""
+    return [(info, checksum(data) == info.crc) for info, data in batch]
+
+
+class _ArchiveWriter:
+    """Appends data to a series of archive files.
+
+    Once an archive grows past the limit, the next one is started.
+    """
+    def __init__(self, vpk: 'VPK', arch_index: int, limit: Optional[int]) -> None:
+        self.vpk = vpk
+        self.arch_index = arch_index
+        self.limit = limit
+        self.file = None  # type: Optional[BinaryIO]
+        self.offset = 0
+
+    def write(self, data: bytes) -> Tuple[int, int]:
+        """Write the data, returning the archive index and offset used."""
+        while True:
+            if self.file is None:
+                arch_file = get_arch_filename(self.vpk.file_prefix, self.arch_index)
+                self.file = open(os.path.join(self.vpk.folder, arch_file), 'ab')
+                self.offset = self.file.seek(0, os.SEEK_END)
+            if self.limit is None or self.offset == 0 or self.offset + len(data) <= self.limit:
+                break
+            # Full, including existing archives which are already
+            # past the limit, so move onto the next.
+            self.close()
+            self.arch_index += 1
+        offset = self.offset
+        self.file.write(data)
+        self.offset += len(data)
+        return self.arch_index, offset
+
+    def close(self) -> None:
+        """Close the current archive."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def _close_handles(handles: Dict[int, BinaryIO]) -> None:
+    """Close archive files left open by a VPK."""
+    for handle in handles.values():
+        handle.close()
+    handles.clear()
+
+
 class VPK:
-    """Represents a VPK file set in a directory."""
+    """Represents a VPK file set in a directory.
+
+    Archive files are kept open after reading from them. Use the VPK as a
+    context manager or call close() to release them, otherwise they are
+    only closed when the VPK is garbage collected.
+    """
     def __init__(
         self,
         dir_file,
@@ -255,6 +378,7 @@ class VPK:
         mode: Union[OpenModes, str]='r',
         dir_data_limit: Optional[int]=1024,
         version: int=1,
+        lazy: bool=False,
     ) -> None:
         """Create a VPK file.
         
@@ -267,9 +391,14 @@ class VPK:
             dir_data_limit: The maximum amount of data for files saved to the dir file.
                None = no limit, and 0=save all to a data file.
             version: The desired version if the file is not read.
+            lazy: Only allowed in read mode. If set, the directory file is
+               mapped into memory and indexed, and FileInfo objects are
+               only created when files are looked up. Call close() when done.
         """
         if version not in (1, 2):
             raise ValueError("Invalid version ({}) - must be 1 or 2!".format(version))
+        if lazy and OpenModes(mode) is not OpenModes.READ:
+            raise ValueError("Lazy VPKs can only be opened in read mode!")
 
         self.folder = self.file_prefix = ''
         self.path = dir_file  # Sets the above correctly + checks.
@@ -280,10 +409,26 @@ class VPK:
         self.mode = OpenModes(mode)
         self.dir_limit = dir_data_limit
         
-        self.footer_data = b''
+        self.footer_data = b''  # type: Union[bytes, memoryview]
 
         self.version = version
         self.header_len = 0
+
+        # For lazy VPKs, the mapped directory file and the index of it.
+        # hash(path) -> directory ID << 32 | offset of the filename.
+        self.lazy = lazy
+        self._mmap = None  # type: Optional[mmap.mmap]
+        self._index = {}  # type: Dict[int, int]
+        # Files with colliding hashes are stored by the full path instead.
+        self._index_collisions = {}  # type: Dict[str, int]
+        self._index_dirs = []  # type: List[Tuple[str, str]]
+        self._index_cache = {}  # type: Dict[str, FileInfo]
+
+        # Open handles to each archive file, used for reading. If close()
+        # isn't called, these are closed when the VPK is garbage collected.
+        self._arch_handles = {}  # type: Dict[int, BinaryIO]
+        self._arch_lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _close_handles, self._arch_handles)
         
         self.load_dirfile()
         
@@ -330,6 +475,10 @@ class VPK:
             else:
                 raise  # In read mode, don't overwrite and error when reading.
 
+        if self.lazy:
+            self._load_index(dirfile)
+            return
+
         with dirfile:
             vpk_sig, version, tree_length = struct_read('<III', dirfile)
             
@@ -337,7 +486,7 @@ class VPK:
                 raise ValueError('Bad VPK directory signature!')
             
             if version not in (1, 2):
-                raise ValueError("Bad VPK version {}!".format(self.version))
+                raise ValueError("Bad VPK version {}!".format(version))
 
             self.version = version
 
@@ -391,6 +540,226 @@ class VPK:
 
             self.footer_data = dirfile.read()
 
+    def _load_index(self, dirfile: BinaryIO) -> None:
+        """Map the directory file into memory, then index the files."""
+        self.close()
+        with dirfile:
+            data = self._mmap = mmap.mmap(dirfile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        vpk_sig, version, tree_length = struct.unpack_from('<III', data, 0)
+        if vpk_sig != VPK_SIG:
+            raise ValueError('Bad VPK directory signature!')
+        if version not in (1, 2):
+            raise ValueError("Bad VPK version {}!".format(version))
+        self.version = version
+        pos = 12
+        if version >= 2:
+            pos += 16  # Data size, ext/dir MD5 sizes, signature size.
+        self.header_len = pos + tree_length
+
+        index = self._index
+        collisions = self._index_collisions
+        dirs = self._index_dirs
+        index.clear()
+        collisions.clear()
+        dirs.clear()
+        self._index_cache.clear()
+
+        entry_size = _fmt_dir_entry.size
+        find = data.find
+        unpack_len = struct.Struct('<H').unpack_from
+        # These are in a tree of extension, directory, file. '' terminates a part.
+        while pos < self.header_len:
+            ext, pos = _read_nullstr(data, pos)
+            if ext is None:
+                break
+            while True:
+                directory, pos = _read_nullstr(data, pos)
+                if directory is None:
+                    break
+                dir_id = len(dirs) << 32
+                dirs.append((ext, directory))
+                # Precompute the joined parts, so only the filename needs decoding.
+                prefix = directory + '/' if directory else ''
+                suffix = '.' + ext if ext else ''
+                while True:
+                    name_pos = pos
+                    end = find(b'\x00', pos)
+                    if end == -1:
+                        raise Exception('Reached EOF without null-terminator!')
+                    elif end == pos:
+                        pos += 1
+                        break
+                    file = data[pos:end].decode('ascii')
+                    if file == ' ':
+                        file = ''
+                    [index_len] = unpack_len(data, end + 5)
+                    pos = end + 1 + entry_size + index_len
+
+                    path = prefix + file + suffix
+                    key = hash(path)
+                    if key in index:
+                        other = index[key]
+                        if other != _INDEX_COLLISION:
+                            # Move the existing file to the collisions dict.
+                            collisions[self._read_entry(other).filename] = other
+                            index[key] = _INDEX_COLLISION
+                        collisions[path] = dir_id | name_pos
+                    else:
+                        index[key] = dir_id | name_pos
+
+        self.footer_data = memoryview(data)[self.header_len:]
+
+    def _read_entry(self, packed: int) -> FileInfo:
+        """Create the FileInfo for a packed position in the index."""
+        ext, directory = self._index_dirs[packed >> 32]
+        file, pos = _read_nullstr(self._mmap, packed & 0xFFFFFFFF)
+        crc, index_len, arch_ind, offset, arch_len, end = _fmt_dir_entry.unpack_from(self._mmap, pos)
+        pos += _fmt_dir_entry.size
+        if arch_ind == DIR_ARCH_INDEX:
+            arch_ind = None
+        if arch_len == 0:
+            offset = 0
+        if end != 0xffff:
+            raise Exception('"{}" has bad terminator! {}'.format(
+                _join_file_parts(directory, file, ext),
+                (crc, index_len, arch_ind, offset, arch_len, end),
+            ))
+        return FileInfo(
+            self,
+            directory,
+            file or '',
+            ext,
+            crc=crc,
+            offset=offset,
+            start_data=self._mmap[pos:pos + index_len],
+            arch_len=arch_len,
+            arch_index=arch_ind,
+        )
+
+    def _lookup(self, path: str) -> Optional[FileInfo]:
+        """Find a file in the lazy index, or return None."""
+        try:
+            return self._index_cache[path]
+        except KeyError:
+            pass
+        packed = self._index.get(hash(path))
+        if packed == _INDEX_COLLISION:
+            packed = self._index_collisions.get(path)
+        if packed is None:
+            return None
+        info = self._read_entry(packed)
+        if info.filename != path:
+            return None  # Different file with the same hash.
+        self._index_cache[path] = info
+        return info
+
+    def _iter_index(self) -> Iterator[FileInfo]:
+        """Yield all the files in the lazy index."""
+        for path in self.filenames():
+            yield self._lookup(path)
+
+    def _arch_handle(self, index: int) -> BinaryIO:
+        """Get the open handle for an archive file."""
+        try:
+            return self._arch_handles[index]
+        except KeyError:
+            pass
+        with self._arch_lock:
+            try:
+                return self._arch_handles[index]
+            except KeyError:
+                arch_file = get_arch_filename(self.file_prefix, index)
+                # Unbuffered, so data appended by FileInfo.write() is seen.
+                handle = self._arch_handles[index] = open(
+                    os.path.join(self.folder, arch_file), 'rb', buffering=0,
+                )
+                return handle
+
+    def _read_arch(self, index: int, offset: int, length: int) -> bytes:
+        """Read data from an archive file."""
+        handle = self._arch_handle(index)
+        if hasattr(os, 'pread'):
+            data = os.pread(handle.fileno(), length, offset)
+            # This might return less than requested.
+            while len(data) < length:
+                more = os.pread(handle.fileno(), length - len(data), offset + len(data))
+                if not more:
+                    break
+                data += more
+            return data
+        else:
+            # Seeking changes the shared handle, so prevent other reads.
+            with self._arch_lock:
+                handle.seek(offset)
+                data = handle.read(length)
+                while len(data) < length:
+                    more = handle.read(length - len(data))
+                    if not more:
+                        break
+                    data += more
+                return data
+
+    def read_many(self, names: Iterable[FileName]) -> Iterator[Tuple[FileInfo, bytes]]:
+        """Read the contents of many files at once.
+
+        This yields each file along with its data, in the order they are
+        stored in the archives. Nearby files are read in a single call.
+        """
+        # Archive index -> files in that archive.
+        by_arch = {}  # type: Dict[Optional[int], List[FileInfo]]
+        for name in names:
+            info = self[name]
+            arch = info.arch_index if info.arch_len else None
+            by_arch.setdefault(arch, []).append(info)
+
+        # Data in the directory is already in memory.
+        for info in by_arch.pop(None, ()):
+            yield info, info.read()
+
+        for arch_index, infos in sorted(by_arch.items()):
+            infos.sort(key=operator.attrgetter('offset'))
+            run = []  # type: List[FileInfo]
+            run_start = run_end = 0
+            for info in infos + [None]:
+                if run and (
+                    info is None or
+                    info.offset - run_end > READ_MERGE_GAP or
+                    info.offset + info.arch_len - run_start > READ_MERGE_MAX
+                ):
+                    # Read this run in one go, then split it up.
+                    block = self._read_arch(arch_index, run_start, run_end - run_start)
+                    for run_info in run:
+                        off = run_info.offset - run_start
+                        yield run_info, run_info.start_data + block[off:off + run_info.arch_len]
+                    run.clear()
+                if info is None:
+                    break
+                if not run:
+                    run_start = info.offset
+                    run_end = info.offset + info.arch_len
+                run.append(info)
+                run_end = max(run_end, info.offset + info.arch_len)
+
+    def _close_archives(self) -> None:
+        """Close the open archive files."""
+        with self._arch_lock:
+            _close_handles(self._arch_handles)
+
+    def close(self) -> None:
+        """Close the open archive files, and release the mapped directory file.
+
+        For lazy VPKs, files with data in the directory file can no longer
+        be read.
+        """
+        self._close_archives()
+        if isinstance(self.footer_data, memoryview):
+            # Leave the released view, so reading raises an error.
+            self.footer_data.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
     def write_dirfile(self) -> None:
         """Write the directory file with the changes.
         
@@ -403,7 +772,8 @@ class VPK:
         
         # We don't know how big the directory section is, so we first write the directory,
         # then come back and overwrite the length value.
-        with open(self.path, 'wb') as file:
+        # Write to a temporary file, so the old directory remains if this fails.
+        with AtomicWriter(self.path, is_bytes=True) as file:
             file.write(struct.pack('<III', VPK_SIG, self.version, 0))
             header_len = file.tell()
             key_getter = operator.itemgetter(0)
@@ -457,6 +827,7 @@ class VPK:
         """When exiting a context sucessfully, the index will be saved."""
         if exc_type is None and self.mode.writable:
             self.write_dirfile()
+        self.close()
        
     def __getitem__(self, item: FileName) -> FileInfo:
         """Get the FileInfo object for a file.
@@ -467,6 +838,14 @@ class VPK:
             vpk['folders', 'name', 'ext']
         """
         path, filename, ext = _get_file_parts(item)
+
+        if self.lazy:
+            info = self._lookup(_join_file_parts(path, filename, ext))
+            if info is not None:
+                return info
+            raise KeyError('No file "{}"!'.format(
+                _join_file_parts(path, filename, ext)
+            ))
         
         try:
             return self._fileinfo[ext][path][filename]
@@ -498,6 +877,9 @@ class VPK:
                 
     def __iter__(self) -> Iterator[FileInfo]:
         """Yield all FileInfo objects."""
+        if self.lazy:
+            yield from self._iter_index()
+            return
         for ext, folders in self._fileinfo.items():
             for folder, files in folders.items():
                 for file, info in files.items():
@@ -505,6 +887,14 @@ class VPK:
                     
     def filenames(self) -> Iterator[str]:
         """Yield all filenames in this VPK."""
+        if self.lazy:
+            for packed in self._index.values():
+                if packed != _INDEX_COLLISION:
+                    ext, directory = self._index_dirs[packed >> 32]
+                    file, pos = _read_nullstr(self._mmap, packed & 0xFFFFFFFF)
+                    yield _join_file_parts(directory, file or '', ext)
+            yield from self._index_collisions
+            return
         for ext, folders in self._fileinfo.items():
             for folder, files in folders.items():
                 for file, info in files.items():
@@ -512,6 +902,11 @@ class VPK:
 
     def __len__(self) -> int:
         """Returns the number of files we have."""
+        if self.lazy:
+            return len(self._index_collisions) + sum(
+                1 for packed in self._index.values()
+                if packed != _INDEX_COLLISION
+            )
         count = 0
         for folders in self._fileinfo.values():
             for files in folders.values():
@@ -522,6 +917,9 @@ class VPK:
         """Check if the specified filename is present in the VPK."""
         path, filename, ext = _get_file_parts(item)
 
+        if self.lazy:
+            return self._lookup(_join_file_parts(path, filename, ext)) is not None
+
         try:
             return filename in self._fileinfo[ext][path]
         except KeyError:
@@ -529,12 +927,10 @@ class VPK:
 
     def extract_all(self, dest_dir: str) -> None:
         """Extract the contents of this VPK to a directory."""
-        for ext, folders in self._fileinfo.items():
-            for folder, files in folders.items():
-                os.makedirs(os.path.join(dest_dir, folder), exist_ok=True)
-                for file, info in files.items():
-                    with open(os.path.join(dest_dir, info.filename), 'wb') as f:
-                        f.write(info.read())
+        for info, data in self.read_many(self.filenames()):
+            os.makedirs(os.path.join(dest_dir, info.dir), exist_ok=True)
+            with open(os.path.join(dest_dir, info.filename), 'wb') as f:
+                f.write(data)
 
     def new_file(self, filename: FileName, root: Optional[str] = None) -> FileInfo:
         """Create the given file, making it empty by default.
@@ -590,16 +986,310 @@ class VPK:
         """
         self.new_file(filename, root).write(data, arch_index)
 
-    def add_folder(self, folder: str, prefix: str='') -> None:
+    def add_files(
+        self,
+        files: Iterable[Tuple[FileName, str]],
+        arch_index: int = 0,
+        arch_limit: Optional[int] = None,
+        jobs: int = 1,
+    ) -> int:
+        """Add many files from disk to the VPK at once.
+
+        files is an iterable of (VPK filename, path on disk) pairs.
+        Data is written starting at the given archive. If arch_limit is set,
+        once an archive reaches that many bytes the next archive is used.
+        If jobs is greater than 1, files are read and checksummed in that
+        many threads (0 uses all CPUs). Files with identical data are only
+        stored once.
+
+        The index of the last archive written to is returned.
+        FileExistsError will be raised if a file is already present.
+        """
+        self._check_writable()
+        writer = _ArchiveWriter(self, arch_index, arch_limit)
+        self._write_files(
+            ((self.new_file(filename), path) for filename, path in files),
+            writer, jobs,
+        )
+        return writer.arch_index
+
+    def _write_files(
+        self,
+        files: Iterable[Tuple[FileInfo, str]],
+        writer: _ArchiveWriter,
+        jobs: int,
+    ) -> List[FileInfo]:
+        """Write files from disk into the archives.
+
+        Files which already have the same size and checksum are skipped,
+        the others are returned.
+        """
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        executor = ThreadPoolExecutor(jobs) if jobs > 1 else None
+        changed = []  # type: List[FileInfo]
+        # Archive data hash -> archive index and offset.
+        written = {}  # type: Dict[bytes, Tuple[int, int]]
+        # Files being read. We limit how many can be waiting.
+        pending = deque()  # type: Deque[Tuple[FileInfo, Future]]
+        try:
+            for info, path in files:
+                if executor is None:
+                    result = _hash_file(path, self.dir_limit)
+                    if self._write_hashed(info, result, writer, written):
+                        changed.append(info)
+                    continue
+                if len(pending) >= 2 * jobs:
+                    info_done, future = pending.popleft()
+                    if self._write_hashed(info_done, future.result(), writer, written):
+                        changed.append(info_done)
+                pending.append((info, executor.submit(_hash_file, path, self.dir_limit)))
+            while pending:
+                info, future = pending.popleft()
+                if self._write_hashed(info, future.result(), writer, written):
+                    changed.append(info)
+        finally:
+            writer.close()
+            if executor is not None:
+                executor.shutdown()
+        return changed
+
+    @staticmethod
+    def _write_hashed(
+        info: FileInfo,
+        result: Tuple[int, bytes, bytes, bytes],
+        writer: _ArchiveWriter,
+        written: Dict[bytes, Tuple[int, int]],
+    ) -> bool:
+        """Write a file produced by _hash_file() into the archives.
+
+        If the file is unchanged, False is returned.
+        """
+        crc, sha, start_data, arch_data = result
+        if (
+            crc == info.crc and
+            len(start_data) + len(arch_data) == len(info.start_data) + info.arch_len
+        ):
+            return False
+        info.crc = crc
+        info.start_data = start_data
+        info.arch_len = len(arch_data)
+        if not arch_data:
+            info.arch_index = None
+            info.offset = 0
+            return True
+        try:
+            info.arch_index, info.offset = written[sha]
+        except KeyError:
+            info.arch_index, info.offset = written[sha] = writer.write(arch_data)
+        return True
+
+    def add_folder(
+        self,
+        folder: str,
+        prefix: str='',
+        arch_limit: Optional[int] = None,
+        jobs: int = 1,
+    ) -> int:
         """Write all files in a folder to the VPK. 
         
         If prefix is set, the folders will be written to that subfolder.
+        Files are written starting at archive 0, see add_files() for the
+        other parameters.
         """
         self._check_writable()
 
         if prefix:
             prefix = prefix.replace('\\', '/')
-        
+
+        return self.add_files(
+            self._walk_folder(folder, prefix),
+            arch_limit=arch_limit,
+            jobs=jobs,
+        )
+
+    def update_folder(
+        self,
+        folder: str,
+        prefix: str='',
+        arch_index: Optional[int] = None,
+        arch_limit: Optional[int] = None,
+        jobs: int = 1,
+        remove_missing: bool = False,
+    ) -> List[FileInfo]:
+        """Update the VPK to match the contents of a folder.
+
+        Only files which are new or differ in size or checksum are written,
+        these are returned. Data is appended starting at the given archive,
+        or the last one currently used. See add_files() for the other
+        parameters. If remove_missing is set, files in the VPK under the
+        prefix which are not in the folder are deleted.
+
+        The old data for changed or deleted files is left in the archives,
+        see free_space() and compact().
+        """
+        self._check_writable()
+
+        if prefix:
+            prefix = prefix.replace('\\', '/')
+        if arch_index is None:
+            arch_index = max((
+                info.arch_index for info in self
+                if info.arch_len and info.arch_index is not None
+            ), default=0)
+
+        seen = set()  # type: Set[str]
+
+        def get_files() -> Iterator[Tuple[FileInfo, str]]:
+            """Find or create the files to check."""
+            for filename, path in self._walk_folder(folder, prefix):
+                try:
+                    info = self[filename]
+                except KeyError:
+                    info = self.new_file(filename)
+                seen.add(info.filename)
+                yield info, path
+
+        changed = self._write_files(
+            get_files(),
+            _ArchiveWriter(self, arch_index, arch_limit),
+            jobs,
+        )
+
+        if remove_missing:
+            prefix = prefix.strip('/')
+            for info in list(self):
+                if (
+                    info.filename not in seen and
+                    (not prefix or info.filename.startswith(prefix + '/'))
+                ):
+                    del self[info.filename]
+        return changed
+
+    def _archive_usage(self) -> Dict[int, Tuple[List[Tuple[int, int]], List[FileInfo]]]:
+        """Find the data used in each archive file.
+
+        For each archive index, this produces the sorted (start, end)
+        sections which contain data, and the files stored there.
+        Archives which exist but are completely unused are included.
+        """
+        usage = {}  # type: Dict[int, Tuple[List[Tuple[int, int]], List[FileInfo]]]
+        arch_prefix = self.file_prefix + '_'
+        for filename in os.listdir(self.folder):
+            index = filename[len(arch_prefix):-4]
+            if (
+                filename.startswith(arch_prefix) and filename.endswith('.vpk')
+                and index.isdigit()
+            ):
+                usage[int(index)] = ([], [])
+
+        ranges = {}  # type: Dict[int, List[Tuple[int, int]]]
+        for info in self:
+            if info.arch_len and info.arch_index is not None:
+                ranges.setdefault(info.arch_index, []).append(
+                    (info.offset, info.offset + info.arch_len)
+                )
+                usage.setdefault(info.arch_index, ([], []))[1].append(info)
+
+        for index, arch_ranges in ranges.items():
+            sections = usage[index][0]
+            # Merge overlapping ranges, so shared data is kept once.
+            for start, end in sorted(arch_ranges):
+                if sections and start <= sections[-1][1]:
+                    if end > sections[-1][1]:
+                        sections[-1] = (sections[-1][0], end)
+                else:
+                    sections.append((start, end))
+        return usage
+
+    def free_space(self) -> Dict[int, int]:
+        """Compute the number of unused bytes in each archive file.
+
+        Space is left behind when files are changed or deleted, compact()
+        removes it.
+        """
+        free = {}  # type: Dict[int, int]
+        for index, (sections, infos) in self._archive_usage().items():
+            try:
+                size = os.path.getsize(os.path.join(
+                    self.folder,
+                    get_arch_filename(self.file_prefix, index),
+                ))
+            except FileNotFoundError:
+                size = 0
+            free[index] = size - sum(end - start for start, end in sections)
+        return free
+
+    def compact(self) -> int:
+        """Rewrite the archives to remove unused space.
+
+        The used data in each archive with free space is copied into a new
+        archive, then the directory file is rewritten to refer to those.
+        Only then are the old archives deleted, along with those containing
+        no files. If this fails partway through, the VPK is left unchanged.
+        Nothing else should be using the VPK while this runs.
+        The number of bytes freed is returned.
+        """
+        self._check_writable()
+        self._close_archives()
+        freed = 0
+        usage = self._archive_usage()
+        next_index = max(usage, default=-1) + 1
+        # Archives to remove after the directory is written.
+        old_paths = []  # type: List[str]
+        new_paths = []  # type: List[str]
+        # The file, and its new archive index and offset.
+        moves = []  # type: List[Tuple[FileInfo, int, int]]
+        try:
+            for index, free in sorted(self.free_space().items()):
+                if free <= 0:
+                    continue
+                freed += free
+                sections, infos = usage[index]
+                path = os.path.join(self.folder, get_arch_filename(self.file_prefix, index))
+                old_paths.append(path)
+                if not infos:
+                    continue
+                new_path = os.path.join(self.folder, get_arch_filename(self.file_prefix, next_index))
+                new_paths.append(new_path)
+                new_starts = []  # type: List[int]
+                with open(path, 'rb') as src, open(new_path, 'xb') as dest:
+                    for start, end in sections:
+                        new_starts.append(dest.tell())
+                        copy_range(src, dest, start, end - start)
+                starts = [start for start, end in sections]
+                for info in infos:
+                    sect = bisect_right(starts, info.offset) - 1
+                    moves.append((info, next_index, new_starts[sect] + info.offset - starts[sect]))
+                next_index += 1
+
+            old_locs = [(info, info.arch_index, info.offset) for info, _, _ in moves]
+            for info, arch_index, offset in moves:
+                info.arch_index = arch_index
+                info.offset = offset
+            try:
+                self.write_dirfile()
+            except BaseException:
+                for info, arch_index, offset in old_locs:
+                    info.arch_index = arch_index
+                    info.offset = offset
+                raise
+        except BaseException:
+            for new_path in new_paths:
+                try:
+                    os.remove(new_path)
+                except FileNotFoundError:
+                    pass
+            raise
+
+        # The directory no longer refers to these.
+        for path in old_paths:
+            os.remove(path)
+        return freed
+
+    @staticmethod
+    def _walk_folder(folder: str, prefix: str) -> Iterator[Tuple[Tuple[str, str], str]]:
+        """Yield the VPK and disk paths for every file in a folder."""
         for subfolder, _, filenames, in os.walk(folder):
             # Prefix + subfolder relative to the folder.
             # normpath removes '.' and similar values from the beginning
@@ -610,12 +1300,189 @@ class VPK:
                 )
             )
             for filename in filenames:
-                with open(os.path.join(subfolder, filename), 'rb') as f:
-                    self.add_file((vpk_path, filename), f.read())
+                yield (vpk_path, filename), os.path.join(subfolder, filename)
                     
-    def verify_all(self) -> bool:
-        """Check all files have a correct checksum."""
-        return all(file.verify() for file in self)
+    def verify_files(
+        self,
+        names: Optional[Iterable[FileName]] = None,
+        jobs: int = 1,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[Tuple[FileInfo, bool]]:
+        """Check the checksums of many files, or all files by default.
+
+        This yields each file along with whether it is correct, in the order
+        they are stored in the archives. Data is read in large sequential
+        blocks, and if jobs is greater than 1 checksums are computed in that
+        many threads (0 uses all CPUs). If set, progress is called with the
+        number of files checked so far and the total after each file.
+        """
+        if names is None:
+            names = self.filenames()
+        if progress is None:
+            yield from self._verify_files(names, jobs)
+            return
+        names = list(names)
+        total = len(names)
+        for done, (info, valid) in enumerate(self._verify_files(names, jobs), 1):
+            progress(done, total)
+            yield info, valid
+
+    def _verify_files(
+        self,
+        names: Iterable[FileName],
+        jobs: int,
+    ) -> Iterator[Tuple[FileInfo, bool]]:
+        """Implement verify_files()."""
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+        if jobs <= 1:
+            for info, data in self.read_many(names):
+                yield info, checksum(data) == info.crc
+            return
+
+        executor = ThreadPoolExecutor(jobs)
+        # Batches of files being checked. We limit how many can be waiting.
+        pending = deque()  # type: Deque[Future]
+        batch = []  # type: List[Tuple[FileInfo, bytes]]
+        batch_size = 0
+        try:
+            for info, data in self.read_many(names):
+                batch.append((info, data))
+                batch_size += len(data)
+                if batch_size < VERIFY_BATCH_SIZE:
+                    continue
+                if len(pending) >= 2 * jobs:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_verify_batch, batch))
+                batch = []
+                batch_size = 0
+            if batch:
+                pending.append(executor.submit(_verify_batch, batch))
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown()
+
+    def verify_all(
+        self,
+        jobs: int = 1,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """Check all files have a correct checksum.
+
+        See verify_files() for the parameters.
+        """
+        return all(valid for info, valid in self.verify_files(jobs=jobs, progress=progress))
+
+
+def _read_dir_entries(path: str) -> List[Tuple[str, int, int]]:
+    """Read the name, checksum and size of every file in a directory VPK.
+
+    This skips creating FileInfo objects, for comparing VPKs quickly.
+    """
+    with open(path, 'rb') as f:
+        vpk_sig, version, tree_length = struct_read('<III', f)
+        if vpk_sig != VPK_SIG:
+            raise ValueError('Bad VPK directory signature!')
+        if version not in (1, 2):
+            raise ValueError("Bad VPK version {}!".format(version))
+        if version >= 2:
+            f.read(16)  # Data size, ext/dir MD5 sizes, signature size.
+        data = f.read(tree_length)
+
+    entries = []  # type: List[Tuple[str, int, int]]
+    entry_size = _fmt_dir_entry.size
+    find = data.find
+    unpack_entry = _fmt_dir_entry.unpack_from
+    pos = 0
+    # These are in a tree of extension, directory, file. '' terminates a part.
+    while pos < len(data):
+        ext, pos = _read_nullstr(data, pos)
+        if ext is None:
+            break
+        while True:
+            directory, pos = _read_nullstr(data, pos)
+            if directory is None:
+                break
+            prefix = directory + '/' if directory else ''
+            suffix = '.' + ext if ext else ''
+            while True:
+                end = find(b'\x00', pos)
+                if end == -1:
+                    raise Exception('Reached EOF without null-terminator!')
+                elif end == pos:
+                    pos += 1
+                    break
+                file = data[pos:end].decode('ascii')
+                if file == ' ':
+                    file = ''
+                crc, index_len, _, _, arch_len, _ = unpack_entry(data, end + 1)
+                pos = end + 1 + entry_size + index_len
+                entries.append((prefix + file + suffix, crc, index_len + arch_len))
+    return entries
+
+
+def diff_vpk(
+    old_path: Union[str, 'os.PathLike[str]'],
+    new_path: Union[str, 'os.PathLike[str]'],
+    confirm: bool = False,
+) -> List[FileDiff]:
+    """Compare the files in two VPKs, given the paths to the directory files.
+
+    Files are compared by size and checksum, producing a list sorted by
+    filename. If confirm is set, the contents of modified files are read
+    and compared by hash, discarding those which are actually identical.
+    """
+    old_path = os.fspath(old_path)
+    new_path = os.fspath(new_path)
+    old_files = _read_dir_entries(old_path)
+    new_files = _read_dir_entries(new_path)
+    old_files.sort()
+    new_files.sort()
+
+    diffs = []  # type: List[FileDiff]
+    old_ind = new_ind = 0
+    old_count = len(old_files)
+    new_count = len(new_files)
+    # Merge the sorted lists, matching up identical filenames.
+    while old_ind < old_count and new_ind < new_count:
+        old_name, old_crc, old_size = old_files[old_ind]
+        new_name, new_crc, new_size = new_files[new_ind]
+        if old_name == new_name:
+            if old_crc != new_crc or old_size != new_size:
+                diffs.append(FileDiff(
+                    DiffKind.MODIFIED, new_name,
+                    old_size, new_size, old_crc, new_crc,
+                ))
+            old_ind += 1
+            new_ind += 1
+        elif old_name < new_name:
+            diffs.append(FileDiff(DiffKind.REMOVED, old_name, old_size, 0, old_crc, None))
+            old_ind += 1
+        else:
+            diffs.append(FileDiff(DiffKind.ADDED, new_name, 0, new_size, None, new_crc))
+            new_ind += 1
+    for old_name, old_crc, old_size in old_files[old_ind:]:
+        diffs.append(FileDiff(DiffKind.REMOVED, old_name, old_size, 0, old_crc, None))
+    for new_name, new_crc, new_size in new_files[new_ind:]:
+        diffs.append(FileDiff(DiffKind.ADDED, new_name, 0, new_size, None, new_crc))
+
+    if confirm:
+        modified = [diff.filename for diff in diffs if diff.kind is DiffKind.MODIFIED]
+        if modified:
+            with VPK(old_path, lazy=True) as old_vpk, VPK(new_path, lazy=True) as new_vpk:
+                old_hashes = {
+                    info.filename: hashlib.sha1(data).digest()
+                    for info, data in old_vpk.read_many(modified)
+                }
+                identical = {
+                    info.filename
+                    for info, data in new_vpk.read_many(modified)
+                    if hashlib.sha1(data).digest() == old_hashes[info.filename]
+                }
+            if identical:
+                diffs = [diff for diff in diffs if diff.filename not in identical]
+    return diffs
 
 
 def script_write(args: List[str]) -> None:
@@ -640,24 +1507,19 @@ def script_write(args: List[str]) -> None:
             print(f'removing existing "{filename}"')
             os.remove(os.path.join(vpk_folder, filename))
     
+    def print_files() -> Iterator[Tuple[Tuple[str, str], str]]:
+        """Print each file as it's added."""
+        for (vpk_path, filename), path in VPK._walk_folder(folder, ''):
+            print(vpk_path + '/' + filename)
+            yield (vpk_path, filename), path
+
     with VPK(vpk_name_base + '_dir.vpk', mode='w') as vpk:
-        arch_filename = get_arch_filename(vpk_name_base, current_arch)
-    
-        for subfolder, _, filenames, in os.walk(folder):
-            # normpath removes '.' and similar values from the beginning
-            vpk_path = os.path.normpath(os.path.relpath(subfolder, folder))
-            print(vpk_path + '/')
-            for filename in filenames:
-                print('\t' + filename)
-                with open(os.path.join(subfolder, filename), 'rb') as f:
-                    vpk.add_file(
-                        (vpk_path, filename), 
-                        f.read(), 
-                        arch_index=current_arch,
-                    )
-                if os.path.exists(arch_filename) and os.stat(arch_filename).st_size > arch_len:
-                    current_arch += 1
-                    arch_filename = get_arch_filename(vpk_name_base, current_arch)
+        vpk.add_files(
+            print_files(),
+            arch_index=current_arch,
+            arch_limit=arch_len,
+            jobs=0,
+        )
                 
                 
 if __name__ == '__main__':